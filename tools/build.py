@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Site Build
+
+Writes the deployable site to dist/ (same layout as the repository):
+- HTML pages: critical CSS inlined and stylesheets deferred (critical_css.py),
+  then minified (minify.py: <pre>, JSON-LD and attribute quoting kept)
+- CSS and JS: minified; with --prune-css, unused CSS rules removed first
+  (prune_css.py)
+- SVG: minified (svg_optimizer.py); JSON: compacted
+- Everything else (images, PDFs, ...): copied
+- Then assets get content-hashed names and references follow
+  (fingerprint.py; asset-manifest.json lists the mapping)
+
+Only SITE_PATHS are deployed: the pages, style.css, script.js and
+images/. Everything else in the repository (tools/, workflows/,
+assets/originals/, assets/docs/, notes and stray files) stays out, as do
+hidden files, Markdown files and generated .gz/.br siblings.
+
+Files are processed in parallel across a process pool; dist/ is rebuilt
+from scratch on every run. The validators work on the output:
+
+    python tools/check_site.py dist/ --no-external
+
+Usage:
+    python tools/build.py
+    python tools/build.py --no-critical --no-fingerprint --jobs 1
+    python tools/build.py --prune-css --output-dir /tmp/site
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from check_site import DEFAULT_PAGES, default_pages
+from critical_css import FOLD_SECTIONS, FoldIndex, inline_critical, page_inputs
+from fingerprint import fingerprint_tree
+from fingerprint import print_results as print_fingerprint
+from html_engine import parse_document
+from manifest import PROJECT_ROOT, manifest_key
+from minify import minify_css, minify_html, minify_js
+from optimize_images import format_size
+from prune_css import SAFELIST_FILE, index_pages, load_safelist, prune_css
+from svg_optimizer import optimize_bytes
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / 'dist'
+
+# What gets deployed (globs from the project root); add new site files here
+SITE_PATHS = DEFAULT_PAGES + ['style.css', 'script.js', 'images']
+
+# Files under SITE_PATHS that aren't part of the site
+EXCLUDED_FILES = ['*.md', '*.jsonl', '*.py', '*.sh', '*.gz', '*.br', '*.pruned.css', 'image-manifest.json']
+
+# What happens to each file type (anything else is copied)
+KINDS = {
+    '.html': 'html', '.htm': 'html',
+    '.css': 'css',
+    '.js': 'js', '.mjs': 'js',
+    '.svg': 'svg',
+    '.json': 'json', '.webmanifest': 'json'
+}
+
+
+def find_site_files(root: Path, output_dir: Path) -> list:
+    """
+    Every deployable file: SITE_PATHS under root, directories walked.
+    Hidden files and directories, the output directory and
+    EXCLUDED_FILES are skipped.
+    """
+    files = []
+
+    def add(path: Path):
+        if (path not in files and not path.name.startswith('.')
+                and not any(fnmatch.fnmatch(path.name, pattern) for pattern in EXCLUDED_FILES)):
+            files.append(path)
+
+    for pattern in SITE_PATHS:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file():
+                add(path)
+                continue
+            for current, dirs, names in os.walk(path):
+                current = Path(current)
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.') and (current / d).resolve() != output_dir)
+                for name in sorted(names):
+                    add(current / name)
+    return files
+
+
+def build_html(path: Path, critical: bool, fold_sections: int) -> str:
+    """A page with its critical CSS inlined (if asked), minified."""
+    html = None
+    if critical:
+        index = FoldIndex(fold_sections)
+        parse_document(path).replay(index)
+        for script in page_inputs(path, index):
+            if script.suffix.lower() == '.js':
+                index.add_script(script.read_text(encoding='utf-8', errors='replace'))
+        html, _ = inline_critical(path, index)
+    return minify_html(html if html is not None else path.read_text(encoding='utf-8'))
+
+
+def build_file(
+    path: Path,
+    root: Path = PROJECT_ROOT,
+    output_dir: Path = DEFAULT_OUTPUT_DIR,
+    critical: bool = True,
+    fold_sections: int = FOLD_SECTIONS,
+    css_index=None
+) -> dict:
+    """
+    Process one file into output_dir (runs in pool workers).
+
+    Returns {'input', 'kind', 'original_size', 'size'}. Never raises: a
+    failure is returned as {'input', 'error'}.
+    """
+    key = path.relative_to(root).as_posix()
+    target = output_dir / key
+    kind = KINDS.get(path.suffix.lower(), 'copy')
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if kind == 'copy':
+            shutil.copy2(path, target)
+        elif kind == 'svg':
+            target.write_bytes(optimize_bytes(path.read_bytes()))
+        elif kind == 'html':
+            target.write_text(build_html(path, critical, fold_sections), encoding='utf-8')
+        else:
+            text = path.read_text(encoding='utf-8')
+            if kind == 'css':
+                if css_index is not None:
+                    text = prune_css(text, css_index[0], css_index[1])['css']
+                text = minify_css(text)
+            elif kind == 'js':
+                text = minify_js(text)
+            else:
+                text = json.dumps(json.loads(text), separators=(',', ':'), ensure_ascii=False)
+            target.write_text(text, encoding='utf-8')
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        return {'input': key, 'error': str(e)}
+    return {'input': key, 'kind': kind, 'original_size': path.stat().st_size, 'size': target.stat().st_size}
+
+
+def build_site(files: list, jobs: int = None, **settings) -> list:
+    """Build many files across a process pool; results follow input order."""
+    jobs = jobs or os.cpu_count() or 1
+    job = partial(build_file, **settings)
+    if jobs <= 1 or len(files) <= 1:
+        return [job(path) for path in files]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+        return list(pool.map(job, files, chunksize=8))
+
+
+def print_results(results: list, output_dir: Path, wall_time: float, critical: bool, verbose: bool = False):
+    """Per-file table for processed files, per-kind totals and the grand total."""
+    done = [stats for stats in results if 'error' not in stats]
+    failed = [stats for stats in results if 'error' in stats]
+
+    print(f"\n{'='*60}")
+    print(f"BUILD ({len(results)} files -> {output_dir})")
+    print('='*60)
+    print(f"  {'File':38} {'Original':>10} {'Built':>10} {'Saved':>6}")
+    for stats in done:
+        if stats['kind'] == 'copy' and not verbose:
+            continue
+        name = stats['input'] if len(stats['input']) <= 38 else '...' + stats['input'][-35:]
+        saved = 1 - stats['size'] / stats['original_size'] if stats['original_size'] else 0
+        print(f"  {name:38} {format_size(stats['original_size']):>10} {format_size(stats['size']):>10} {saved:>6.0%}")
+
+    for stats in failed:
+        print(f"  [ERROR] {stats['input']}: {stats['error']}")
+
+    print(f"\n{'='*60}")
+    print("SUMMARY")
+    print('='*60)
+    for kind in ['html', 'css', 'js', 'svg', 'json', 'copy']:
+        group = [stats for stats in done if stats['kind'] == kind]
+        if group:
+            original = sum(stats['original_size'] for stats in group)
+            size = sum(stats['size'] for stats in group)
+            label = 'copied' if kind == 'copy' else kind
+            print(f"  {label:7} {len(group):>4} files  {format_size(original):>10} -> {format_size(size):>10}")
+    original = sum(stats['original_size'] for stats in done)
+    size = sum(stats['size'] for stats in done)
+    if original:
+        change = f"saved {format_size(original - size)}" if size <= original else f"added {format_size(size - original)}"
+        print(f"  {'Total':7} {len(done):>4} files  {format_size(original):>10} -> {format_size(size):>10} "
+              f"({change}, {1 - size / original:.0%})")
+    if critical:
+        print("  (pages grow by the critical CSS they inline; style.css no longer blocks their first paint)")
+    if failed:
+        print(f"  Failed: {len(failed)}")
+    print(f"  Time: {wall_time:.1f}s")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build the minified, deployable site into dist/'
+    )
+    parser.add_argument('--output-dir', '-o', type=Path, default=DEFAULT_OUTPUT_DIR,
+                       help=f'Build directory, emptied first (default: {manifest_key(DEFAULT_OUTPUT_DIR)}/)')
+    parser.add_argument('--critical', action=argparse.BooleanOptionalAction, default=True,
+                       help='Inline critical CSS and defer stylesheets in pages (default: on)')
+    parser.add_argument('--fold-sections', type=int, default=FOLD_SECTIONS,
+                       help=f'<section>s counted as above the fold (default: {FOLD_SECTIONS})')
+    parser.add_argument('--prune-css', action=argparse.BooleanOptionalAction, default=False,
+                       help=f'Remove CSS rules no page uses, see {manifest_key(SAFELIST_FILE)} (default: off)')
+    parser.add_argument('--fingerprint', action=argparse.BooleanOptionalAction, default=True,
+                       help='Rename assets to name.<hash>.ext and rewrite references (default: on)')
+    parser.add_argument('--keep-originals', action=argparse.BooleanOptionalAction, default=True,
+                       help='With --fingerprint, keep the unhashed files too (default: on)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Parallel worker processes (default: CPU count)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='List copied files too')
+
+    args = parser.parse_args()
+
+    # The output directory is deleted before each build: only dist/ inside
+    # the project, and elsewhere only an empty directory or a previous build
+    output_dir = args.output_dir.resolve()
+    if PROJECT_ROOT.is_relative_to(output_dir):
+        print(f"ERROR: --output-dir {args.output_dir} contains the site; it would be wiped")
+        sys.exit(1)
+    if output_dir.is_relative_to(PROJECT_ROOT) and output_dir != DEFAULT_OUTPUT_DIR.resolve():
+        print(f"ERROR: --output-dir {args.output_dir} is inside the project; use "
+              f"{manifest_key(DEFAULT_OUTPUT_DIR)}/ or a directory outside it")
+        sys.exit(1)
+    if output_dir.is_dir() and any(output_dir.iterdir()) and not (output_dir / 'index.html').is_file():
+        print(f"ERROR: --output-dir {args.output_dir} isn't empty and doesn't hold a previous build; "
+              f"it would be wiped")
+        sys.exit(1)
+
+    css_index = None
+    if args.prune_css:
+        try:
+            safelist = load_safelist(SAFELIST_FILE)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Can't read safelist from {SAFELIST_FILE}: {e}")
+            sys.exit(1)
+        index, _ = index_pages(default_pages(), safelist)
+        css_index = (index, safelist.get('patterns', []))
+
+    start = time.perf_counter()
+    files = find_site_files(PROJECT_ROOT, output_dir)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    results = build_site(
+        files, args.jobs, root=PROJECT_ROOT, output_dir=output_dir,
+        critical=args.critical, fold_sections=args.fold_sections, css_index=css_index
+    )
+    failed = any('error' in stats for stats in results)
+
+    fingerprints = None
+    if args.fingerprint and not failed:
+        fingerprints = fingerprint_tree(output_dir, args.keep_originals)
+    wall_time = time.perf_counter() - start
+
+    print_results(results, output_dir, wall_time, args.critical, args.verbose)
+    if fingerprints:
+        print_fingerprint(fingerprints, args.keep_originals)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
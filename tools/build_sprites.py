@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Tool Logo Bundler
+
+Packs the toolbox marquee logos (images/tools/) into two files, so the
+page makes a few requests instead of one per logo:
+- SVG logos become <symbol>s in one sprite, drawn with <svg><use>
+- Raster logos are drawn into one atlas image, shown with CSS offsets
+
+Outputs go to .tmp/tools-bundle/ (git-ignored, never deployed), so a
+trial run leaves the site untouched:
+- tools-sprite.svg      Symbol sprite (inlined in the page by default)
+- tools-atlas.png       Atlas, plus WebP/AVIF copies where smaller
+- tools-atlas.css       Atlas classes (background offsets)
+- tools-bundle.html     Markup to paste into the page, one snippet per logo
+- tools-bundle.json     Manifest: which logo is where, and its markup
+
+Each SVG's ids and classes are prefixed with its name, so gradients,
+clip paths and <style> rules of different exports can't collide. Each
+logo is drawn in the box its <img> gets on the page: 140x80, or less where
+a .tool-logo[data-logo="<name>"] rule in style.css sets max-width /
+max-height. Atlas cells are that box at 2x, with the logo contained and
+centered like object-fit: contain. Alt text comes from the page, and the
+markup keeps class="tool-logo" and data-logo="<name>" so the per-logo
+rules (sizes, filters) still apply.
+
+To switch the page over, write the bundle into the site instead
+(--output images/tools/bundle) so the markup's URLs point there, commit
+it with the page change, and drop the replaced <img>s.
+
+Usage:
+    python tools/build_sprites.py
+    python tools/build_sprites.py --no-inline      # <use> the sprite file (1 cached request)
+    python tools/build_sprites.py --output images/tools/bundle   # When switching the page over
+    python tools/build_sprites.py --source images/tools --page index.html --stylesheet style.css
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from html_engine import Analyzer, parse_document
+from manifest import PROJECT_ROOT, manifest_key
+from optimize_images import (
+    choose_png_encoding, downscale, draft_for, encode_alternatives,
+    format_size, modern_formats, normalize_image
+)
+from prune_css import COMMENT, DEFAULT_CSS, split_selectors, split_statements
+from svg_optimizer import SVG_NS, XLINK_NS, local_name, optimize_svg
+
+SOURCE_DIR = PROJECT_ROOT / 'images' / 'tools'
+OUTPUT_DIR = PROJECT_ROOT / '.tmp' / 'tools-bundle'
+DEFAULT_PAGE = PROJECT_ROOT / 'index.html'
+
+RASTER_FORMATS = ['.png', '.jpg', '.jpeg', '.webp', '.avif', '.gif']
+SYMBOL_PREFIX = 'tool-'  # Symbol ids: tool-<name>
+ATLAS_CLASS = 'tool-atlas'  # Atlas classes: tool-atlas tool-atlas-<name>
+LOGO_BOX = (140, 80)  # <img width height> of .tool-logo in index.html
+ATLAS_SCALE = 2  # Atlas cells are drawn at 2x for high-DPI screens
+QUALITY = 85
+
+# Root <svg> attributes that size the image; the symbol's viewBox replaces them
+SIZING_ATTRIBUTES = {'width', 'height', 'viewBox', 'x', 'y', 'id', 'class', 'version'}
+
+# url(#id) references in attributes and CSS
+URL_REFERENCE = re.compile(r'url\(\s*(["\']?)#([^"\')\s]+)\1\s*\)')
+
+# Per-logo rules in style.css, and the box limits they set
+LOGO_SELECTOR = re.compile(r'\.tool-logo\[data-logo=(["\']?)([\w-]+)\1\]')
+BOX_PROPERTY = re.compile(r'(?:^|;)\s*max-(width|height)\s*:\s*([\d.]+)px')
+
+# Hidden without display:none, which stops gradients and clip paths inside from rendering
+SPRITE_STYLE = 'position:absolute;width:0;height:0;overflow:hidden'
+
+
+class ToolLogoFinder(Analyzer):
+    """Alt text of each .tool-logo <img>, by project-relative src."""
+
+    def __init__(self, page: Path):
+        self.base = page.parent
+        self.alts = {}
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag != 'img' or 'tool-logo' not in (attrs.get('class') or '').split() or not attrs.get('src'):
+            return
+        key = manifest_key(self.base / attrs['src'])
+        if not self.alts.get(key):  # The marquee's duplicate set has alt=""
+            self.alts[key] = attrs.get('alt') or ''
+
+
+def logo_name(path: Path) -> str:
+    """Lowercase, hyphenated name used in ids and class names."""
+    return re.sub(r'[^a-z0-9]+', '-', path.stem.lower()).strip('-')
+
+
+def logo_boxes(css: str, box: tuple = LOGO_BOX) -> dict:
+    """
+    {name: (width, height)} for logos whose top-level .tool-logo[data-logo]
+    rule shrinks the default box (max-width / max-height in px).
+    """
+    css = COMMENT.sub(lambda m: m.group(1) or ' ', css)
+    boxes = {}
+    for prelude, start, end, _ in split_statements(css, 0, len(css)):
+        if start is None or prelude.strip().startswith('@'):
+            continue
+        limits = dict(BOX_PROPERTY.findall(css[start:end]))
+        if not limits:
+            continue
+        for selector in split_selectors(prelude):
+            match = LOGO_SELECTOR.fullmatch(selector)
+            if match:
+                width, height = boxes.get(match.group(2), box)
+                boxes[match.group(2)] = (min(width, round(float(limits.get('width', width)))),
+                                         min(height, round(float(limits.get('height', height)))))
+    return boxes
+
+
+def find_logos(source_dir: Path) -> tuple:
+    """Top-level (SVG files, raster files) in the source directory."""
+    files = sorted(path for path in source_dir.iterdir() if path.is_file())
+    svgs = [path for path in files if path.suffix.lower() == '.svg']
+    rasters = [path for path in files if path.suffix.lower() in RASTER_FORMATS]
+    return svgs, rasters
+
+
+def scope_svg(root, prefix: str) -> list:
+    """
+    Prefix every id and class in an SVG so it can share a document with
+    other logos. url(#id), href="#id" and <style> selectors follow.
+    Returns the style selectors that would still match outside the logo.
+    """
+    ids = {element.get('id') for element in root.iter() if element.get('id')}
+    classes = set()
+    for element in root.iter():
+        classes.update((element.get('class') or '').split())
+
+    def rename_urls(value: str) -> str:
+        return URL_REFERENCE.sub(
+            lambda m: f'url(#{prefix}{m.group(2)})' if m.group(2) in ids else m.group(0), value
+        )
+
+    def rename_selector(selector: str) -> str:
+        return re.sub(
+            r'([.#])(-?[_a-zA-Z][\w-]*)',
+            lambda m: m.group(1) + prefix + m.group(2)
+            if m.group(2) in (classes if m.group(1) == '.' else ids) else m.group(0),
+            selector
+        )
+
+    unscoped = []
+    for element in root.iter():
+        for attr, value in list(element.attrib.items()):
+            if attr == 'id':
+                value = prefix + value
+            elif attr == 'class':
+                value = ' '.join(prefix + name for name in value.split())
+            elif local_name(attr)[1] == 'href' and value.startswith('#') and value[1:] in ids:
+                value = '#' + prefix + value[1:]
+            else:
+                value = rename_urls(value)
+            element.set(attr, value)
+
+        if local_name(element.tag)[1] == 'style' and element.text:
+            rules = []
+            for selectors, body in re.findall(r'([^{}]*)(\{[^{}]*\})', element.text):
+                selectors = rename_selector(selectors)
+                unscoped += [
+                    selector.strip() for selector in selectors.split(',')
+                    if selector.strip() and not selector.strip().startswith(('.' + prefix, '#' + prefix))
+                ]
+                rules.append(selectors + rename_urls(body))
+            element.text = ''.join(rules)
+    return unscoped
+
+
+def view_box(root) -> str:
+    """The SVG's viewBox, or one made from its width/height (None if neither)."""
+    if root.get('viewBox'):
+        return root.get('viewBox')
+    sizes = [re.fullmatch(r'([\d.]+)(px)?', (root.get(attr) or '').strip()) for attr in ('width', 'height')]
+    if all(sizes):
+        return f'0 0 {sizes[0].group(1)} {sizes[1].group(1)}'
+    return None
+
+
+def build_symbol(path: Path) -> tuple:
+    """
+    Turn an SVG logo into a <symbol>; returns (symbol, unscoped selectors).
+
+    Raises ValueError if the file isn't an SVG or has no size to scale from.
+    """
+    root = ET.fromstring(optimize_svg(path.read_text(encoding='utf-8')))
+    box = view_box(root)
+    if box is None:
+        raise ValueError('no viewBox or width/height')
+
+    name = logo_name(path)
+    root.attrib.pop('class', None)  # Classes for the site that exported it
+    unscoped = scope_svg(root, f'{name}-')
+
+    symbol = ET.Element(f'{{{SVG_NS}}}symbol', {'id': SYMBOL_PREFIX + name, 'viewBox': box})
+    for attr, value in root.attrib.items():
+        if attr not in SIZING_ATTRIBUTES:
+            symbol.set(attr, value)
+    if 'currentColor' in ET.tostring(root, encoding='unicode') and 'color' not in symbol.attrib:
+        # As an <img>, currentColor was the default text colour, not the page's
+        symbol.set('color', '#000')
+    symbol.extend(root)
+    return symbol, unscoped
+
+
+def serialize_svg(element) -> str:
+    ET.register_namespace('', SVG_NS)
+    ET.register_namespace('xlink', XLINK_NS)
+    return ET.tostring(element, encoding='unicode').replace(' />', '/>')
+
+
+def build_sprite(paths: list) -> tuple:
+    """
+    Collect SVG logos into one hidden <svg> of symbols.
+
+    Returns (sprite markup, names bundled, {file name: error or warning}).
+    """
+    sprite = ET.Element(f'{{{SVG_NS}}}svg', {'aria-hidden': 'true', 'style': SPRITE_STYLE})
+    names = []
+    problems = {}
+    for path in paths:
+        try:
+            symbol, unscoped = build_symbol(path)
+        except (ET.ParseError, ValueError, OSError) as e:
+            problems[path.name] = f"[ERROR] {e} (kept as a separate file)"
+            continue
+        if unscoped:
+            problems[path.name] = f"[WARN]  style selectors apply page-wide: {', '.join(unscoped)}"
+        sprite.append(symbol)
+        names.append(logo_name(path))
+    return serialize_svg(sprite), names, problems
+
+
+def build_atlas(paths: list, boxes: dict = None) -> tuple:
+    """
+    Draw raster logos into a grid, one cell per logo.
+
+    A logo's cell is its box (boxes[name], default LOGO_BOX) x ATLAS_SCALE,
+    at the top left of a grid slot sized for the largest box; the logo is
+    scaled to fit the cell and centered, like object-fit: contain.
+    Returns (atlas image, cells, columns, rows) with cells as
+    [{'name', 'source', 'box', 'left', 'top', 'width', 'height'}] in atlas pixels.
+    """
+    boxes = boxes or {}
+    cell_boxes = [boxes.get(logo_name(path), LOGO_BOX) for path in paths]
+    slot_width = max(box[0] for box in cell_boxes) * ATLAS_SCALE
+    slot_height = max(box[1] for box in cell_boxes) * ATLAS_SCALE
+    columns = math.ceil(math.sqrt(len(paths)))
+    rows = math.ceil(len(paths) / columns)
+    atlas = Image.new('RGBA', (columns * slot_width, rows * slot_height), (0, 0, 0, 0))
+
+    cells = []
+    for index, (path, box) in enumerate(zip(paths, cell_boxes)):
+        cell_width, cell_height = box[0] * ATLAS_SCALE, box[1] * ATLAS_SCALE
+        cell_left, cell_top = index % columns * slot_width, index // columns * slot_height
+        with Image.open(path) as img:
+            width, height = img.size
+            scale = min(cell_width / width, cell_height / height)
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            img, _ = normalize_image(draft_for(img, size) if scale < 1 else img)
+            img = img.convert('RGBA')
+            img = downscale(img, size) if scale < 1 else img.resize(size, Image.Resampling.LANCZOS)
+
+        atlas.paste(img, (cell_left + (cell_width - size[0]) // 2, cell_top + (cell_height - size[1]) // 2))
+        cells.append({'name': logo_name(path), 'source': manifest_key(path), 'box': list(box),
+                      'left': cell_left, 'top': cell_top, 'width': cell_width, 'height': cell_height})
+    return atlas, cells, columns, rows
+
+
+def write_atlas(atlas, output_path: Path, formats: list = (), quality: int = QUALITY) -> dict:
+    """Save the atlas as the smallest equivalent PNG plus smaller modern copies."""
+    png = choose_png_encoding(atlas, quality)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(png['data'])
+    return {
+        'path': manifest_key(output_path),
+        'bytes': output_path.stat().st_size,
+        'encoding': png['encoding'],
+        'alternatives': encode_alternatives(atlas, output_path, quality, formats)
+    }
+
+
+def percent(offset: int, cell: int, total: int) -> str:
+    """background-position percentage of a cell at `offset` (pixels) in an atlas `total` wide."""
+    return f"{offset * 100 / (total - cell):.4g}%" if total > cell else '0%'
+
+
+def atlas_css(cells: list, size: tuple, atlas: dict) -> str:
+    """
+    Stylesheet for the atlas classes (URLs relative to the stylesheet).
+    Sizes and offsets are percentages, so a cell still lines up when
+    the page's max-width / max-height shrink the logo.
+    """
+    url = Path(atlas['path']).name
+    lines = [
+        '/* Generated by tools/build_sprites.py - do not edit */',
+        f'.{ATLAS_CLASS} {{',
+        '    display: block;',
+        f'    background: url("{url}") no-repeat;',
+    ]
+    if atlas['alternatives']:
+        sources = [f'url("{Path(alt["path"]).name}") type("{alt["type"]}")' for alt in atlas['alternatives']]
+        sources.append(f'url("{url}") type("image/png")')
+        lines.append(f"    background-image: image-set({', '.join(sources)});")
+    lines += ['}', '']
+    for cell in cells:
+        lines += [
+            f".{ATLAS_CLASS}-{cell['name']} {{",
+            f"    width: {cell['box'][0]}px;",
+            f"    aspect-ratio: {cell['box'][0]} / {cell['box'][1]};",
+            f"    background-size: {size[0] * 100 / cell['width']:.4g}% {size[1] * 100 / cell['height']:.4g}%;",
+            f"    background-position: {percent(cell['left'], cell['width'], size[0])} "
+            f"{percent(cell['top'], cell['height'], size[1])};",
+            '}'
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def escape_attribute(value: str) -> str:
+    return value.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;')
+
+
+def symbol_markup(name: str, alt: str, sprite_href: str = '', box: tuple = LOGO_BOX) -> str:
+    """<svg> drawing a sprite symbol in the same box as the <img> it replaces."""
+    label = f' role="img" aria-label="{escape_attribute(alt)}"' if alt else ' aria-hidden="true"'
+    return (f'<svg class="tool-logo" data-logo="{name}" width="{box[0]}" height="{box[1]}"{label}>'
+            f'<use href="{sprite_href}#{SYMBOL_PREFIX}{name}"/></svg>')
+
+
+def atlas_markup(name: str, alt: str) -> str:
+    """<span> showing one atlas cell."""
+    label = f' role="img" aria-label="{escape_attribute(alt)}"' if alt else ' aria-hidden="true"'
+    return f'<span class="tool-logo {ATLAS_CLASS} {ATLAS_CLASS}-{name}" data-logo="{name}"{label}></span>'
+
+
+def page_href(path: Path, page: Path) -> str:
+    """URL of a file as referenced from the page."""
+    return Path(os.path.relpath(path, page.parent)).as_posix()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pack tool logos into one SVG sprite and one raster atlas'
+    )
+    parser.add_argument('--source', type=Path, default=SOURCE_DIR,
+                       help=f'Logo directory (default: {manifest_key(SOURCE_DIR)})')
+    parser.add_argument('--output', type=Path, default=OUTPUT_DIR,
+                       help=f'Bundle directory (default: {manifest_key(OUTPUT_DIR)}/)')
+    parser.add_argument('--page', type=Path, default=DEFAULT_PAGE,
+                       help=f'Page that shows the logos, for alt text and URLs (default: {manifest_key(DEFAULT_PAGE)})')
+    parser.add_argument('--stylesheet', type=Path, default=DEFAULT_CSS,
+                       help=f'Stylesheet with the per-logo size rules (default: {manifest_key(DEFAULT_CSS)})')
+    parser.add_argument('--inline', action=argparse.BooleanOptionalAction, default=True,
+                       help='Inline the sprite in the page instead of referencing the file (default: on)')
+    parser.add_argument('--modern', action=argparse.BooleanOptionalAction, default=True,
+                       help='Also encode the atlas as WebP/AVIF where smaller (default: on)')
+    parser.add_argument('--quality', '-q', type=int, default=QUALITY,
+                       help=f'Atlas quality for lossy copies (default: {QUALITY})')
+
+    args = parser.parse_args()
+    output_dir = args.output
+
+    if not args.source.is_dir():
+        print(f"ERROR: Logo directory not found: {args.source}")
+        sys.exit(1)
+
+    alts = {}
+    if args.page.exists():
+        finder = ToolLogoFinder(args.page)
+        parse_document(args.page).replay(finder)
+        alts = finder.alts
+    else:
+        print(f"[WARN] Page not found: {args.page} (alt text falls back to file names)")
+
+    boxes = {}
+    if args.stylesheet.exists():
+        boxes = logo_boxes(args.stylesheet.read_text(encoding='utf-8'))
+    else:
+        print(f"[WARN] Stylesheet not found: {args.stylesheet} (every logo gets the {LOGO_BOX[0]}x{LOGO_BOX[1]} box)")
+
+    svgs, rasters = find_logos(args.source)
+    if rasters and not PIL_AVAILABLE:
+        print("[WARN] Pillow not installed: raster logos stay separate files (pip install Pillow)")
+        rasters = []
+    if not svgs and not rasters:
+        print(f"ERROR: No logos found in: {args.source}")
+        sys.exit(1)
+
+    def alt_for(path: Path) -> str:
+        return alts.get(manifest_key(path)) or path.stem.replace('-', ' ').title()
+
+    logos = []
+    written = []
+    report = {'sprite': None, 'atlas': None}
+
+    sprite_path = output_dir / 'tools-sprite.svg'
+    markup_head = []
+    if svgs:
+        sprite, names, problems = build_sprite(svgs)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        sprite_path.write_text(sprite, encoding='utf-8')
+        written.append(sprite_path)
+        sprite_href = '' if args.inline else page_href(sprite_path, args.page)
+        for path in svgs:
+            if logo_name(path) not in names:
+                continue
+            logos.append({
+                'source': manifest_key(path), 'bytes': path.stat().st_size, 'type': 'symbol',
+                'id': SYMBOL_PREFIX + logo_name(path),
+                'markup': symbol_markup(logo_name(path), alt_for(path), sprite_href,
+                                        boxes.get(logo_name(path), LOGO_BOX))
+            })
+        report['sprite'] = {
+            'path': manifest_key(sprite_path), 'bytes': sprite_path.stat().st_size,
+            'inline': args.inline, 'problems': problems
+        }
+        if args.inline:
+            markup_head += ['<!-- Once, before the first logo (inline sprite) -->', sprite]
+
+    if rasters:
+        atlas, cells, columns, rows = build_atlas(rasters, boxes)
+        atlas_path = output_dir / 'tools-atlas.png'
+        formats = modern_formats() if args.modern else []
+        report['atlas'] = write_atlas(atlas, atlas_path, formats, args.quality)
+        css_path = output_dir / 'tools-atlas.css'
+        css_path.write_text(atlas_css(cells, atlas.size, report['atlas']), encoding='utf-8')
+        report['atlas'].update({'columns': columns, 'rows': rows,
+                                'css': manifest_key(css_path), 'css_bytes': css_path.stat().st_size})
+        written += [atlas_path, css_path] + [PROJECT_ROOT / alt['path'] for alt in report['atlas']['alternatives']]
+        for path, cell in zip(rasters, cells):
+            logos.append({
+                'source': cell['source'], 'bytes': path.stat().st_size, 'type': 'atlas',
+                'class': f"{ATLAS_CLASS}-{cell['name']}",
+                'markup': atlas_markup(cell['name'], alt_for(path))
+            })
+        markup_head = ['<!-- In <head> -->',
+                       f'<link rel="stylesheet" href="{page_href(css_path, args.page)}">'] + markup_head
+
+    # Markup snippets, in the order the page lists the logos
+    order = list(alts)
+    logos.sort(key=lambda logo: (order.index(logo['source']) if logo['source'] in order else len(order),
+                                 logo['source']))
+    markup_lines = ['<!-- Generated by tools/build_sprites.py: paste into the page -->'] + markup_head
+    markup_lines.append('<!-- In place of each <img class="tool-logo"> (both marquee sets) -->')
+    for logo in logos:
+        markup_lines += [f"<!-- {logo['source']} -->", logo['markup']]
+    markup_path = output_dir / 'tools-bundle.html'
+    markup_path.write_text('\n'.join(markup_lines) + '\n', encoding='utf-8')
+
+    manifest_path = output_dir / 'tools-bundle.json'
+    manifest_path.write_text(json.dumps(dict(report, logos=logos), indent=2) + '\n', encoding='utf-8')
+    written += [markup_path, manifest_path]
+
+    # Report: one request per logo file before; sprite, atlas and CSS after
+    before_requests = len(logos)
+    before_bytes = sum(logo['bytes'] for logo in logos)
+    after_requests = 0
+    after_bytes = 0
+    html_bytes = 0
+    if report['sprite']:
+        if args.inline:
+            html_bytes = report['sprite']['bytes']
+        else:
+            after_requests += 1
+            after_bytes += report['sprite']['bytes']
+    if report['atlas']:
+        atlas_bytes = min([report['atlas']['bytes']] + [alt['bytes'] for alt in report['atlas']['alternatives']])
+        after_requests += 2
+        after_bytes += atlas_bytes + report['atlas']['css_bytes']
+
+    print(f"\n{'='*60}")
+    print("TOOL LOGO BUNDLE")
+    print('='*60)
+    for name, problem in (report['sprite'] or {}).get('problems', {}).items():
+        print(f"  {problem.split(' ', 1)[0]:7} {name}: {problem.split(' ', 1)[1].strip()}")
+    if report['sprite']:
+        symbols = sum(1 for logo in logos if logo['type'] == 'symbol')
+        where = 'inline in the page' if args.inline else 'one file'
+        print(f"  Sprite: {symbols} SVG logos, {format_size(report['sprite']['bytes'])} ({where})")
+    if report['atlas']:
+        atlas = report['atlas']
+        copies = ''.join(f", {alt['type'].split('/')[1]} {format_size(alt['bytes'])}" for alt in atlas['alternatives'])
+        print(f"  Atlas:  {len(rasters)} raster logos, {atlas['columns']}x{atlas['rows']} cells, "
+              f"PNG ({atlas['encoding']}) {format_size(atlas['bytes'])}{copies}")
+
+    print(f"\n  Before: {before_requests} requests, {format_size(before_bytes)}")
+    print(f"  After:  {after_requests} requests, {format_size(after_bytes)}"
+          + (f" + {format_size(html_bytes)} of inline sprite in the page" if html_bytes else ''))
+    print(f"\n  Output: {manifest_key(output_dir)}/ ({len(written)} files)")
+    print(f"  Markup: {manifest_key(markup_path)}")
+    print('='*60)
+
+    sys.exit(1 if any(problem.startswith('[ERROR]') for problem in
+                      (report['sprite'] or {}).get('problems', {}).values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Page Weight Budget Checker
+
+Adds up every local file a page loads and compares the totals with the
+per-page budgets in tools/budgets.json:
+- the HTML itself (inline <style>/<script> included)
+- stylesheets, plus the images and fonts their url()s and @imports pull in
+- scripts
+- images: <img>, inline style url()s and, for srcset and <picture>, the
+  largest candidate of the first source (what a high-DPI screen fetches)
+- icons, preloads and the web app manifest
+
+A file a page loads several times (e.g. the toolbox marquee's duplicate
+logos) is counted once. External files (e.g. Google Fonts) can't be
+sized offline: they are listed, not counted. Sizes are bytes on disk,
+before HTTP compression.
+
+Exits with code 1 if any page is over budget, listing its assets.
+
+Usage:
+    python tools/check_budget.py
+    python tools/check_budget.py index.html projects/*.html
+    python tools/check_budget.py --verbose           # Breakdown for every page
+    python tools/check_budget.py --config my-budgets.json
+"""
+
+import argparse
+import fnmatch
+import json
+import re
+import sys
+from pathlib import Path
+
+from check_links import LinkExtractor, categorize_link, resolve_internal
+from check_site import DEFAULT_PAGES, default_pages
+from html_engine import find_html_files, parse_document
+from manifest import manifest_key
+from optimize_images import format_size, parse_size
+
+CONFIG_FILE = Path(__file__).parent / 'budgets.json'
+
+# Asset categories by extension (anything else is 'other')
+CATEGORIES = {
+    '.html': 'html', '.htm': 'html',
+    '.css': 'css',
+    '.js': 'js', '.mjs': 'js',
+    '.jpg': 'images', '.jpeg': 'images', '.png': 'images', '.gif': 'images',
+    '.webp': 'images', '.avif': 'images', '.svg': 'images', '.ico': 'images',
+    '.woff2': 'fonts', '.woff': 'fonts', '.ttf': 'fonts', '.otf': 'fonts'
+}
+BUDGET_KEYS = ['total', 'html', 'css', 'js', 'images', 'fonts', 'other']
+
+# <link rel> values that make the browser download the file
+DOWNLOADED_RELS = {'stylesheet', 'icon', 'shortcut', 'apple-touch-icon', 'preload', 'modulepreload', 'manifest'}
+
+# url() values; quoted ones may contain ')' (e.g. a data: URI with its own url())
+CSS_URL = re.compile(r'url\(\s*(?:"([^"]*)"|\'([^\']*)\'|([^"\')\s]*))\s*\)')
+CSS_IMPORT = re.compile(r'@import\s+(["\'])([^"\']+)\1')
+
+
+class AssetExtractor(LinkExtractor):
+    """
+    LinkExtractor plus the downloads link checking doesn't need: srcset
+    and <picture> candidates, and url()s in style attributes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.picture = None  # srcset values of the <source>s in the current <picture>
+
+    def handle_starttag(self, tag, attrs):
+        attrs_dict = dict(attrs)
+        if tag == 'picture':
+            self.picture = []
+        elif tag == 'source' and self.picture is not None and attrs_dict.get('srcset'):
+            self.picture.append(attrs_dict['srcset'])
+
+        start = len(self.links)
+        super().handle_starttag(tag, attrs)
+
+        if tag == 'img':
+            # The browser fetches one candidate: the first <source> wins over the <img>
+            srcset = self.picture[0] if self.picture else attrs_dict.get('srcset')
+            if srcset:
+                link = {'type': 'image', 'url': largest_candidate(srcset)}
+                images = [i for i in range(start, len(self.links)) if self.links[i]['type'] == 'image']
+                if images:
+                    self.links[images[0]] = link
+                else:
+                    self.links.append(link)
+
+        for url in css_urls(attrs_dict.get('style') or ''):
+            self.links.append({'type': 'style', 'url': url})
+
+    def handle_endtag(self, tag):
+        if tag == 'picture':
+            self.picture = None
+
+
+def largest_candidate(srcset: str) -> str:
+    """URL of the srcset candidate with the largest w or x descriptor."""
+    candidates = []
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        descriptor = parts[1] if len(parts) > 1 else '1x'
+        try:
+            size = float(descriptor[:-1])
+        except ValueError:
+            size = 0
+        candidates.append((size, parts[0]))
+    return max(candidates)[1] if candidates else ''
+
+
+def css_urls(css: str) -> list:
+    """The url() values in a stylesheet or style attribute."""
+    return [''.join(groups) for groups in CSS_URL.findall(css)]
+
+
+def is_download(link: dict) -> bool:
+    """True for links the browser fetches while loading the page."""
+    if link['type'] in ('anchor', 'srcset'):
+        return False  # srcset: AssetExtractor adds the one candidate that is fetched
+    if link['type'] == 'link':
+        return bool(set(link.get('rel', '').lower().split()) & DOWNLOADED_RELS)
+    return True
+
+
+def category_of(path: Path) -> str:
+    return CATEGORIES.get(path.suffix.lower(), 'other')
+
+
+def stylesheet_assets(path: Path, seen: set) -> tuple:
+    """
+    Local files a stylesheet pulls in (url() and @import, recursively),
+    and the external URLs it references. `seen` guards against loops.
+    """
+    local, external = [], []
+    try:
+        css = path.read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return local, external
+
+    urls = css_urls(css) + [url for _, url in CSS_IMPORT.findall(css)]
+    for url in urls:
+        category = categorize_link(url)
+        if category == 'external':
+            external.append(url)
+        elif category == 'internal':
+            target = resolve_internal(url, path)
+            if target not in seen:
+                seen.add(target)
+                local.append(target)
+                if target.suffix.lower() == '.css':
+                    nested_local, nested_external = stylesheet_assets(target, seen)
+                    local += nested_local
+                    external += nested_external
+    return local, external
+
+
+def page_assets(page: Path) -> dict:
+    """
+    Every file a page loads: {'assets': [{'path', 'category', 'bytes'}],
+    'missing': [paths], 'external': [urls]}. Each file appears once.
+    """
+    extractor = AssetExtractor()
+    parse_document(page).replay(extractor)
+
+    page = page.resolve()
+    seen = {page}
+    paths = [page]
+    external = []
+    for link in extractor.links:
+        if not is_download(link):
+            continue
+        category = categorize_link(link['url'])
+        if category == 'external':
+            external.append(link['url'])
+            continue
+        if category != 'internal':
+            continue  # data: URIs are already part of the page's bytes
+
+        target = resolve_internal(link['url'], page)
+        if target in seen:
+            continue
+        seen.add(target)
+        paths.append(target)
+        if target.suffix.lower() == '.css':
+            css_local, css_external = stylesheet_assets(target, seen)
+            paths += css_local
+            external += css_external
+
+    assets, missing = [], []
+    for path in paths:
+        if path.is_file():
+            assets.append({'path': manifest_key(path), 'category': category_of(path), 'bytes': path.stat().st_size})
+        else:
+            missing.append(manifest_key(path))
+    return {'assets': assets, 'missing': missing, 'external': sorted(set(external))}
+
+
+def load_budgets(path: Path) -> dict:
+    """
+    Read the budget config: {"default": {...}, "pages": {"glob": {...}}}.
+
+    Budgets are sizes like "500KB" keyed by BUDGET_KEYS. Page globs are
+    matched against project-relative paths; every matching entry applies,
+    in file order, over the defaults.
+    """
+    config = json.loads(path.read_text(encoding='utf-8'))
+    for section in [config.get('default', {})] + list(config.get('pages', {}).values()):
+        for key, value in section.items():
+            if key not in BUDGET_KEYS:
+                raise ValueError(f"Unknown budget '{key}' (expected one of: {', '.join(BUDGET_KEYS)})")
+            section[key] = parse_size(str(value))
+    return config
+
+
+def budget_for(page: Path, config: dict) -> dict:
+    """Budgets applying to a page (defaults overridden by matching page globs)."""
+    key = manifest_key(page)
+    budget = dict(config.get('default', {}))
+    for pattern, overrides in config.get('pages', {}).items():
+        if fnmatch.fnmatch(key, pattern):
+            budget.update(overrides)
+    return budget
+
+
+def check_page(page: Path, config: dict) -> dict:
+    """Weigh a page and compare it with its budget."""
+    result = page_assets(page)
+    totals = {key: 0 for key in BUDGET_KEYS}
+    for asset in result['assets']:
+        totals[asset['category']] += asset['bytes']
+        totals['total'] += asset['bytes']
+
+    budget = budget_for(page, config)
+    result.update({
+        'page': manifest_key(page),
+        'totals': totals,
+        'budget': budget,
+        'over': [key for key in BUDGET_KEYS if key in budget and totals[key] > budget[key]]
+    })
+    return result
+
+
+def print_breakdown(result: dict):
+    """List a page's assets, largest first."""
+    for asset in sorted(result['assets'], key=lambda asset: -asset['bytes']):
+        flag = '!' if asset['category'] in result['over'] else ' '
+        print(f"     {flag} {format_size(asset['bytes']):>10}  {asset['category']:7} {asset['path']}")
+    for path in result['missing']:
+        print(f"       {'missing':>10}  {category_of(Path(path)):7} {path}")
+    for url in result['external']:
+        print(f"       {'external':>10}  {'':7} {url[:70]}")
+
+
+def print_results(results: list, verbose: bool = False):
+    """Print each page's weight against its budget."""
+    print(f"\n{'='*60}")
+    print("PAGE WEIGHT BUDGETS")
+    print('='*60)
+
+    for result in results:
+        totals, budget = result['totals'], result['budget']
+        label = '[ERROR]' if result['over'] else '[OK]   '
+        limit = f" / {format_size(budget['total'])}" if 'total' in budget else ''
+        print(f"\n  {label} {result['page']}: {format_size(totals['total'])}{limit} "
+              f"({len(result['assets'])} files)")
+
+        parts = []
+        for key in BUDGET_KEYS[1:]:
+            if totals[key] or key in budget:
+                part = f"{key} {format_size(totals[key])}"
+                if key in budget:
+                    part += f"/{format_size(budget[key])}"
+                parts.append(part + (' OVER' if key in result['over'] else ''))
+        print(f"          {', '.join(parts)}")
+        if result['external']:
+            print(f"          + {len(result['external'])} external file(s), not counted")
+        if result['missing']:
+            print(f"          [WARN]  {len(result['missing'])} referenced file(s) not found")
+
+        if result['over'] or verbose:
+            print_breakdown(result)
+
+    over = [result for result in results if result['over']]
+    print(f"\n{'='*60}")
+    print("SUMMARY")
+    print('='*60)
+    print(f"  Pages: {len(results)}")
+    print(f"  Over budget: {len(over)}")
+    if over:
+        print(f"\n  STATUS: FAILED")
+    else:
+        print(f"\n  STATUS: PASSED")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check the weight of each page against its budget'
+    )
+    parser.add_argument('files', nargs='*', metavar='file',
+                       help=f"HTML pages, directories or globs (default: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--config', type=Path, default=CONFIG_FILE,
+                       help=f'Budget config (default: {manifest_key(CONFIG_FILE)})')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='List the assets of every page, not only pages over budget')
+
+    args = parser.parse_args()
+
+    try:
+        config = load_budgets(args.config)
+    except (OSError, ValueError, argparse.ArgumentTypeError) as e:
+        print(f"ERROR: Can't read budgets from {args.config}: {e}")
+        sys.exit(1)
+
+    pages = find_html_files(args.files) if args.files else default_pages()
+    for page in pages:
+        if not page.exists():
+            print(f"ERROR: File not found: {page}")
+            sys.exit(1)
+
+    results = [check_page(page, config) for page in pages]
+    print_results(results, args.verbose)
+
+    sys.exit(1 if any(result['over'] for result in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
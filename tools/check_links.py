@@ -6,19 +6,32 @@ Validates all links in HTML files.
 
 Usage:
     python tools/check_links.py index.html
+    python tools/check_links.py index.html projects/*.html
+    python tools/check_links.py index.html --crawl
     python tools/check_links.py index.html --external-only
     python tools/check_links.py index.html --timeout 10
+    python tools/check_links.py index.html --jobs 16 --per-host 2
+    python tools/check_links.py index.html --no-cache
+    python tools/check_links.py index.html --max-age ok=3600 --max-age error=0
+    python tools/check_links.py --changed-only --crawl
 
 Requirements (optional, for external link checking):
     pip install requests
 """
 
 import argparse
-import re
+import json
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from html.parser import HTMLParser
-from urllib.parse import urlparse, urljoin
+from urllib.parse import unquote, urlparse, urljoin, urlsplit, urlunsplit
+
+from html_engine import display_path, parse_document
+from manifest import Manifest, changed_files
 
 try:
     import requests
@@ -26,17 +39,40 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+# Concurrency defaults for external checks
+DEFAULT_JOBS = 8      # Worker threads across all hosts
+PER_HOST_LIMIT = 2    # Simultaneous requests to any single host
+
+# External result cache (shared by pre-commit, validate.yml and deploy.yml runs)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TOOL_SOURCES = [__file__, Path(__file__).parent / 'html_engine.py']  # Manifest version
+CACHE_FILE = PROJECT_ROOT / '.tmp' / 'link_cache.json'
+CACHE_TTL = {         # Seconds a result stays fresh, per status
+    'ok': 24 * 3600,
+    'warning': 3600,
+    'error': 300
+}
+VALIDATED_MAX_AGE = 30 * 24 * 3600  # Entries with ETag/Last-Modified are kept for revalidation this long
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
 
 class LinkExtractor(HTMLParser):
-    """Extract all links from HTML."""
+    """Extract all links, plus the fragment targets they can point at, from HTML."""
 
     def __init__(self):
         super().__init__()
         self.links = []
+        self.anchors = set()  # id values, and name values of <a> elements
 
     def handle_starttag(self, tag, attrs):
         attrs_dict = dict(attrs)
 
+        # Index fragment targets in the same pass
+        if attrs_dict.get('id'):
+            self.anchors.add(attrs_dict['id'])
+        if tag == 'a' and attrs_dict.get('name'):
+            self.anchors.add(attrs_dict['name'])
+
         if tag == 'a' and 'href' in attrs_dict:
             self.links.append({
                 'type': 'anchor',
@@ -55,7 +91,8 @@ class LinkExtractor(HTMLParser):
                 return
             self.links.append({
                 'type': 'link',
-                'url': attrs_dict['href']
+                'url': attrs_dict['href'],
+                'rel': rel
             })
         elif tag == 'script' and 'src' in attrs_dict:
             self.links.append({
@@ -63,13 +100,31 @@ class LinkExtractor(HTMLParser):
                 'url': attrs_dict['src']
             })
 
+        # Every srcset candidate can be fetched (which one depends on the screen)
+        if tag in ('img', 'source') and attrs_dict.get('srcset'):
+            self.links += [{'type': 'srcset', 'url': url} for url in srcset_urls(attrs_dict['srcset'])]
+
+
+def srcset_urls(srcset: str) -> list:
+    """The candidate URLs of a srcset attribute."""
+    return [candidate.split()[0] for candidate in srcset.split(',') if candidate.split()]
+
+
+def extract_page(filepath: Path) -> LinkExtractor:
+    """Run a LinkExtractor over an HTML file's shared parse."""
+    extractor = LinkExtractor()
+    parse_document(filepath).replay(extractor)
+    return extractor
+
+
+def extract_anchors(filepath: Path) -> set:
+    """Extract the id/name values an HTML file's fragments can point at."""
+    return extract_page(filepath).anchors
+
 
 def extract_links(filepath: Path) -> list:
     """Extract all links from an HTML file."""
-    content = filepath.read_text(encoding='utf-8')
-    extractor = LinkExtractor()
-    extractor.feed(content)
-    return extractor.links
+    return extract_page(filepath).links
 
 
 def categorize_link(url: str) -> str:
@@ -113,8 +168,14 @@ def check_internal_link(url: str, base_path: Path) -> dict:
         return {'status': 'error', 'message': f'File not found: {url}'}
 
 
-def check_external_link(url: str, timeout: int = 5) -> dict:
-    """Check if an external link is reachable."""
+def check_external_link(url: str, timeout: int = 5, validators: dict = None) -> dict:
+    """
+    Check if an external link is reachable.
+
+    `validators` (an ETag and/or Last-Modified from a previous check) turn
+    the request into a conditional one; a 304 counts as OK. Validators sent
+    back by the server are returned under the 'validators' key.
+    """
     if not REQUESTS_AVAILABLE:
         return {'status': 'skipped', 'message': 'requests library not installed'}
 
@@ -122,16 +183,33 @@ def check_external_link(url: str, timeout: int = 5) -> dict:
     if url.startswith('//'):
         url = 'https:' + url
 
+    headers = {'User-Agent': 'Mozilla/5.0 (Link Checker)'}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
     try:
         response = requests.head(
             url,
             timeout=timeout,
             allow_redirects=True,
-            headers={'User-Agent': 'Mozilla/5.0 (Link Checker)'}
+            headers=headers
         )
 
         if response.status_code < 400:
-            return {'status': 'ok', 'message': f'HTTP {response.status_code}'}
+            result = {'status': 'ok', 'message': f'HTTP {response.status_code}'}
+            fresh = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            if response.status_code == 304:
+                result['message'] = 'HTTP 304 (not modified)'
+                fresh = {key: fresh[key] or (validators or {}).get(key) for key in fresh}
+            if any(fresh.values()):
+                result['validators'] = fresh
+            return result
         elif response.status_code in (403, 405):
             # Many sites block automated HEAD requests — treat as warning
             return {'status': 'warning', 'message': f'HTTP {response.status_code} (likely bot protection)'}
@@ -144,104 +222,422 @@ def check_external_link(url: str, timeout: int = 5) -> dict:
         return {'status': 'error', 'message': str(e)[:50]}
 
 
-def check_anchor(anchor: str, content: str) -> dict:
-    """Check if an anchor target exists in the document."""
-    anchor_id = anchor[1:]  # Remove # prefix
+def normalize_url(url: str) -> str:
+    """Normalize an external URL for use as a cache key."""
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc += f':{parts.port}'
+    # Fragments never reach the server, so they don't change the result
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+class LinkCache:
+    """
+    On-disk cache of external link results, keyed by normalized URL.
+
+    Fresh entries are returned as-is. Stale entries that carry an ETag or
+    Last-Modified are revalidated with a conditional request instead of
+    being dropped, for up to VALIDATED_MAX_AGE since their last check;
+    after that (e.g. a link no longer on the site) they are dropped too.
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, ttl: dict = None):
+        self.path = path
+        self.ttl = {**CACHE_TTL, **(ttl or {})}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.entries = {}
+
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                self.entries = {}  # Corrupt cache: start over
+
+    def get(self, url: str):
+        """Return a fresh cached result, or None (counted as hit/miss)."""
+        entry = self.entries.get(normalize_url(url))
+        if entry:
+            age = time.time() - entry['checked']
+            if age < self.ttl.get(entry['status'], 0):
+                self.hits += 1
+                return {'status': entry['status'], 'message': f"{entry['message']} (cached)"}
+        self.misses += 1
+        return None
+
+    def validators(self, url: str):
+        """Return stored ETag/Last-Modified for a conditional re-check."""
+        entry = self.entries.get(normalize_url(url))
+        if entry and entry['status'] == 'ok' and time.time() - entry['checked'] < VALIDATED_MAX_AGE:
+            return entry.get('validators')
+        return None
+
+    def store(self, url: str, result: dict):
+        """Record a fresh check result."""
+        if result['status'] == 'skipped':
+            return  # Nothing was actually checked
+        if result['message'].startswith('HTTP 304'):
+            self.revalidated += 1
+        self.entries[normalize_url(url)] = {
+            'status': result['status'],
+            'message': result['message'],
+            'checked': time.time(),
+            'validators': result.get('validators')
+        }
+
+    def save(self):
+        """Write the cache back to disk, dropping entries too old to be useful."""
+        now = time.time()
+        keep_for = max(self.ttl.values())
+        self.entries = {
+            key: entry for key, entry in self.entries.items()
+            if now - entry['checked'] < (max(keep_for, VALIDATED_MAX_AGE) if entry.get('validators') else keep_for)
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True), encoding='utf-8')
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated}
+
+
+def host_key(url: str) -> str:
+    """Return the host an external URL points at (used for per-host limits)."""
+    if url.startswith('//'):
+        url = 'https:' + url
+    return urlparse(url).netloc.lower()
+
 
-    # Look for id="anchor" or name="anchor"
-    if re.search(rf'id=["\']?{re.escape(anchor_id)}["\']?', content):
+def check_external_links(
+    urls: list,
+    timeout: int = 5,
+    jobs: int = DEFAULT_JOBS,
+    per_host: int = PER_HOST_LIMIT,
+    cache: LinkCache = None
+) -> dict:
+    """
+    Check many external links, in parallel when jobs > 1.
+
+    Each host has its own queue, and a URL is only handed to the pool
+    when its host has fewer than `per_host` requests in flight, so a busy
+    host never ties up workers that other hosts could use. Fresh results from
+    `cache` are reused without a request. Returns a dict mapping each URL
+    to its result, in the same order as `urls`.
+    """
+    # Cache lookups and stores stay on this thread; workers only do I/O
+    cached = {url: cache.get(url) if cache else None for url in urls}
+    pending = [url for url in urls if cached[url] is None]
+    validators = {url: cache.validators(url) if cache else None for url in pending}
+
+    if jobs <= 1 or len(pending) <= 1:
+        checks = [check_external_link(url, timeout, validators[url]) for url in pending]
+    else:
+        queues = {}
+        for url in dict.fromkeys(pending):
+            queues.setdefault(host_key(url), deque()).append(url)
+        finished = {}
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            running = {}  # Future -> (host, url)
+
+            def submit(host):
+                url = queues[host].popleft()
+                running[pool.submit(check_external_link, url, timeout, validators[url])] = (host, url)
+
+            # Up to per_host requests per host to start with, hosts interleaved
+            for _ in range(max(per_host, 1)):
+                for host in queues:
+                    if queues[host]:
+                        submit(host)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, url = running.pop(future)
+                    finished[url] = future.result()
+                    if queues[host]:
+                        submit(host)
+
+        checks = [finished[url] for url in pending]
+
+    for url, result in zip(pending, checks):
+        if cache:
+            cache.store(url, result)
+        result.pop('validators', None)
+        cached[url] = result
+
+    return cached
+
+
+def check_anchor(anchor: str, anchors: set) -> dict:
+    """Check if an anchor target exists in a document's id/name index."""
+    anchor_id = unquote(anchor.partition('#')[2])
+
+    # "#" and "#top" scroll to the top of the page even without a target
+    if anchor_id in anchors:
         return {'status': 'ok', 'message': 'Anchor found'}
-    if re.search(rf'name=["\']?{re.escape(anchor_id)}["\']?', content):
-        return {'status': 'ok', 'message': 'Anchor found (name attribute)'}
+    if anchor_id == '' or anchor_id.lower() == 'top':
+        return {'status': 'ok', 'message': 'Top of page'}
 
     return {'status': 'error', 'message': f'Anchor not found: {anchor_id}'}
 
 
-def check_all_links(
-    filepath: Path,
+def record_result(results: dict, result: dict):
+    """File a checked link under ok/warnings/skipped/errors by its status."""
+    bucket = {
+        'ok': 'ok',
+        'warning': 'warnings',
+        'skipped': 'skipped'
+    }.get(result['status'], 'errors')
+    results[bucket].append(result)
+
+
+def resolve_internal(url: str, page: Path) -> Path:
+    """Resolve an internal link to the local file it points at."""
+    path = url.split('?')[0].split('#')[0].lstrip('/')
+    if not path:
+        return page
+    return (page.parent / path).resolve()
+
+
+def link_target(url: str, category: str, page: Path) -> tuple:
+    """
+    Key identifying what a link points at.
+
+    Two links with the same key need only one check, even when they are
+    written differently or appear on different pages: "#about" on
+    index.html and "../index.html#about" elsewhere share a key.
+    """
+    if category == 'external':
+        return ('external', normalize_url(url))
+    if category == 'internal':
+        return ('internal', resolve_internal(url, page), url.partition('#')[2])
+    if category == 'anchor':
+        return ('internal', page, url[1:])
+    return (category, url)
+
+
+def crawl_root(pages: list) -> Path:
+    """
+    Directory a crawl from `pages` stays inside: the project root for
+    pages in the project (so projects/x.html reaches ../index.html),
+    otherwise the pages' common directory.
+    """
+    pages = [Path(page).resolve() for page in pages]
+    if all(page.is_relative_to(PROJECT_ROOT) for page in pages):
+        return PROJECT_ROOT
+    return Path(os.path.commonpath([page.parent for page in pages]))
+
+
+def check_site(
+    pages: list,
+    follow: bool = False,
     check_external: bool = True,
-    timeout: int = 5
+    timeout: int = 5,
+    jobs: int = DEFAULT_JOBS,
+    per_host: int = PER_HOST_LIMIT,
+    cache: LinkCache = None,
+    manifest: Manifest = None,
+    root: Path = None
 ) -> dict:
-    """Check all links in an HTML file."""
-
-    content = filepath.read_text(encoding='utf-8')
-    links = extract_links(filepath)
-
-    results = {
-        'total': len(links),
-        'ok': [],
-        'errors': [],
-        'warnings': [],
-        'skipped': []
-    }
-
-    seen = set()  # Track unique URLs
-
-    for link in links:
-        url = link['url']
-
-        # Skip duplicates
-        if url in seen:
+    """
+    Check links across one or more HTML pages.
+
+    Every page is parsed exactly once and every unique target is checked
+    exactly once, however many pages reference it. Fragments, including
+    cross-page ones, are looked up in the target page's id index. With
+    follow=True, internal .html links are crawled, staying inside `root`
+    (default: crawl_root(pages)), so the whole site reachable from `pages`
+    is covered, even from a subpage. Each result lists the pages that
+    reference it.
+
+    With a `manifest`, pages that are unchanged since the last run (along
+    with the files they link to) reuse their stored links and local
+    results without being parsed. External links always go through
+    check_external_links(), which has its own `cache`.
+    """
+    queue = deque(page.resolve() for page in pages)
+    site_root = root.resolve() if root else crawl_root(queue)
+    anchors = {}     # Page -> id/name index; crawled pages first, in crawl order
+    targets = {}     # link_target() key -> result, in discovery order
+    page_links = {}  # Re-analyzed page -> [(url, link_target() key)], for the manifest
+    total = 0
+
+    while queue:
+        page = queue.popleft()
+        if page in anchors:
             continue
-        seen.add(url)
-
-        category = categorize_link(url)
-        result = {'url': url, 'type': link['type'], 'category': category}
 
-        if category == 'empty':
+        stored = manifest.lookup(page) if manifest else None
+        if stored:
+            links = stored['links']
+            anchors[page] = set(stored['anchors'])
+        else:
+            extractor = extract_page(page)
+            links = extractor.links
+            anchors[page] = extractor.anchors
+            page_links[page] = []
+
+        for link in links:
+            total += 1
+            url = link['url']
+            category = categorize_link(url)
+            key = link_target(url, category, page)
+
+            result = targets.get(key)
+            if result is None:
+                result = targets[key] = {
+                    'url': url,
+                    'type': link['type'],
+                    'category': category,
+                    'page': page,
+                    'pages': []
+                }
+                if stored and url in stored['results']:
+                    result.update(stored['results'][url])
+            if not stored:
+                page_links[page].append((url, key))
+            if display_path(page) not in result['pages']:
+                result['pages'].append(display_path(page))
+
+            if follow and category == 'internal':
+                target = key[1]
+                if (target.suffix.lower() in ('.html', '.htm') and target.is_file()
+                        and target not in anchors and target.is_relative_to(site_root)):
+                    queue.append(target)
+
+    crawled = list(anchors)
+
+    def page_anchors(path: Path) -> set:
+        # Pages outside the crawl are parsed once, on first fragment lookup
+        if path not in anchors:
+            anchors[path] = extract_anchors(path)
+        return anchors[path]
+
+    external = []  # External results to fill in after the (parallel) checks
+
+    for key, result in targets.items():
+        url = result['url']
+        category = result['category']
+        page = result.pop('page')
+
+        if 'status' in result:
+            pass  # Reused from the manifest
+
+        elif category == 'empty':
             result['status'] = 'warning'
             result['message'] = 'Empty URL'
-            results['warnings'].append(result)
 
         elif category == 'anchor':
-            check = check_anchor(url, content)
-            result.update(check)
-            if check['status'] == 'ok':
-                results['ok'].append(result)
-            else:
-                results['errors'].append(result)
+            result.update(check_anchor(url, page_anchors(page)))
 
         elif category == 'mailto' or category == 'tel':
             result['status'] = 'ok'
             result['message'] = f'{category.capitalize()} link'
-            results['ok'].append(result)
 
         elif category == 'javascript' or category == 'data':
             result['status'] = 'skipped'
             result['message'] = f'{category.capitalize()} URI'
-            results['skipped'].append(result)
 
         elif category == 'internal':
-            check = check_internal_link(url, filepath)
-            result.update(check)
-            if check['status'] == 'ok':
-                results['ok'].append(result)
-            else:
-                results['errors'].append(result)
+            result.update(check_internal_link(url, page))
+            target, fragment = key[1], key[2]
+            if (fragment and result['status'] == 'ok' and target.is_file()
+                    and target.suffix.lower() in ('.html', '.htm')):
+                result.update(check_anchor(url, page_anchors(target)))
 
         elif category == 'external':
             if check_external:
-                check = check_external_link(url, timeout)
-                result.update(check)
-                if check['status'] == 'ok':
-                    results['ok'].append(result)
-                elif check['status'] == 'warning':
-                    results['warnings'].append(result)
-                elif check['status'] == 'skipped':
-                    results['skipped'].append(result)
-                else:
-                    results['errors'].append(result)
+                external.append(result)
             else:
                 result['status'] = 'skipped'
                 result['message'] = 'External check disabled'
-                results['skipped'].append(result)
+
+    if external:
+        checks = check_external_links(
+            [result['url'] for result in external],
+            timeout=timeout,
+            jobs=jobs,
+            per_host=per_host,
+            cache=cache
+        )
+        for result in external:
+            result.update(checks[result['url']])
+
+    if manifest:
+        for page, links in page_links.items():
+            record_page(manifest, page, links, anchors[page], targets)
+
+    results = {
+        'total': total,
+        'pages': [display_path(page) for page in crawled],
+        'ok': [],
+        'errors': [],
+        'warnings': [],
+        'skipped': []
+    }
+
+    # Bucket in discovery order so the report never depends on scheduling
+    for result in targets.values():
+        record_result(results, result)
 
     return results
 
 
+def record_page(manifest: Manifest, page: Path, links: list, anchors: set, targets: dict):
+    """Store a re-analyzed page's links, ids and local results in the manifest."""
+    needs = []  # Linked files: only their existence matters
+    reads = []  # Pages holding a #fragment target: their ids matter
+    local = {}
+
+    for url, key in links:
+        if key[0] == 'external':
+            continue  # Covered by LinkCache, which expires on its own schedule
+        result = targets[key]
+        local[url] = {'status': result['status'], 'message': result['message']}
+        if key[0] == 'internal' and key[1] != page:
+            (reads if key[2] else needs).append(key[1])
+
+    manifest.record(
+        page,
+        {
+            'links': [{'url': url, 'type': targets[key]['type']} for url, key in links],
+            'anchors': sorted(anchors),
+            'results': local
+        },
+        needs=needs,
+        reads=reads
+    )
+
+
+def check_all_links(
+    filepath: Path,
+    check_external: bool = True,
+    timeout: int = 5,
+    jobs: int = DEFAULT_JOBS,
+    per_host: int = PER_HOST_LIMIT,
+    cache: LinkCache = None
+) -> dict:
+    """Check all links in an HTML file."""
+    return check_site(
+        [filepath],
+        check_external=check_external,
+        timeout=timeout,
+        jobs=jobs,
+        per_host=per_host,
+        cache=cache
+    )
+
+
 def print_results(results: dict, verbose: bool = False):
     """Print link check results."""
 
+    # Only name the referencing pages when more than one page was checked
+    multi_page = len(results.get('pages', [])) > 1
+
     print(f"\n{'='*60}")
     print("LINK CHECK RESULTS")
     print('='*60)
@@ -253,6 +649,8 @@ def print_results(results: dict, verbose: bool = False):
         for item in results['errors']:
             print(f"  [ERROR] {item['url'][:50]}")
             print(f"          {item['message']}")
+            if multi_page:
+                print(f"          in: {', '.join(item['pages'])}")
 
     # Warnings
     if results['warnings']:
@@ -261,6 +659,8 @@ def print_results(results: dict, verbose: bool = False):
         for item in results['warnings']:
             print(f"  [WARN]  {item['url'][:50]}")
             print(f"          {item['message']}")
+            if multi_page:
+                print(f"          in: {', '.join(item['pages'])}")
 
     # OK links (only in verbose mode)
     if verbose and results['ok']:
@@ -280,12 +680,22 @@ def print_results(results: dict, verbose: bool = False):
     print(f"\n{'='*60}")
     print("SUMMARY")
     print('='*60)
+    if multi_page:
+        print(f"  Pages: {len(results['pages'])}")
     print(f"  Total links: {results['total']}")
     print(f"  Unique checked: {len(results['ok']) + len(results['errors']) + len(results['warnings'])}")
     print(f"  OK: {len(results['ok'])}")
     print(f"  Errors: {len(results['errors'])}")
     print(f"  Warnings: {len(results['warnings'])}")
     print(f"  Skipped: {len(results['skipped'])}")
+    if 'cache' in results:
+        cache = results['cache']
+        print(f"  Cache: {cache['hits']} hit(s), {cache['misses']} miss(es), "
+              f"{cache['revalidated']} revalidated")
+    if 'manifest' in results:
+        manifest = results['manifest']
+        print(f"  Incremental: {manifest['hits']} page(s) unchanged, "
+              f"{manifest['misses']} re-analyzed")
 
     if not results['errors']:
         print(f"\n  STATUS: PASSED")
@@ -294,39 +704,116 @@ def print_results(results: dict, verbose: bool = False):
     print('='*60)
 
 
+def parse_max_age(values: list) -> dict:
+    """Parse --max-age values ('3600' for OK results, or 'status=seconds')."""
+    ttl = {}
+    for value in values or []:
+        status, _, seconds = value.rpartition('=')
+        status = status or 'ok'
+        if status not in CACHE_TTL:
+            raise argparse.ArgumentTypeError(
+                f"Unknown status '{status}' (expected one of: {', '.join(CACHE_TTL)})"
+            )
+        try:
+            ttl[status] = int(seconds)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid --max-age seconds: {seconds}")
+    return ttl
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description='Check all links in an HTML file'
+        description='Check all links in one or more HTML files'
     )
-    parser.add_argument('file', type=Path, help='HTML file to check')
+    parser.add_argument('files', type=Path, nargs='*', metavar='file',
+                       help='HTML file(s) to check (crawl roots with --crawl)')
+    parser.add_argument('--crawl', action='store_true',
+                       help='Follow internal .html links and check the whole site')
+    parser.add_argument('--root', type=Path, default=None,
+                       help="Directory --crawl stays inside (default: the project root, "
+                            "or the files' common directory outside it)")
     parser.add_argument('--no-external', action='store_true',
                        help='Skip external link checks')
     parser.add_argument('--external-only', action='store_true',
                        help='Only check external links')
     parser.add_argument('--timeout', '-t', type=int, default=5,
                        help='Timeout for external requests (default: 5s)')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                       help=f'Parallel external checks, 1 = serial (default: {DEFAULT_JOBS})')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT,
+                       help=f'Max simultaneous requests per host (default: {PER_HOST_LIMIT})')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=True,
+                       help=f'Reuse recent external results from {CACHE_FILE.relative_to(PROJECT_ROOT)} (default: on)')
+    parser.add_argument('--max-age', action='append', metavar='[STATUS=]SECONDS',
+                       help='Cache lifetime; bare seconds apply to OK results, '
+                            'or set ok=, warning=, error= individually (repeatable)')
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=True,
+                       help='Reuse local results for pages unchanged since the last run (default: on)')
+    parser.add_argument('--changed-only', action='store_true',
+                       help='Check only pages staged in git, plus pages depending on staged files')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Show all links including OK ones')
 
     args = parser.parse_args()
 
-    if not args.file.exists():
-        print(f"ERROR: File not found: {args.file}")
-        sys.exit(1)
-
-    print(f"\nChecking links in: {args.file}")
+    try:
+        ttl = parse_max_age(args.max_age)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    if args.changed_only and args.files:
+        parser.error('--changed-only takes its files from git; do not list files')
+    if not args.changed_only and not args.files:
+        parser.error('at least one file is required')
+
+    manifest = None
+    if args.incremental or args.changed_only:
+        manifest = Manifest('check_links', sources=TOOL_SOURCES)
+
+    if args.changed_only:
+        args.files = changed_files(manifest)
+        if not args.files:
+            print("\nNo staged HTML changes (or dependents) to check.")
+            sys.exit(0)
+    if not args.incremental:
+        manifest = None
+
+    for file in args.files:
+        if not file.exists():
+            print(f"ERROR: File not found: {file}")
+            sys.exit(1)
+
+    if args.crawl:
+        print(f"\nCrawling site from: {', '.join(str(file) for file in args.files)}")
+    else:
+        print(f"\nChecking links in: {', '.join(str(file) for file in args.files)}")
 
     if not REQUESTS_AVAILABLE and not args.no_external:
         print("\nNote: 'requests' library not installed.")
         print("External links will be skipped.")
         print("Install with: pip install requests")
 
-    results = check_all_links(
-        args.file,
+    cache = LinkCache(ttl=ttl) if args.cache and not args.no_external else None
+
+    results = check_site(
+        args.files,
+        follow=args.crawl,
         check_external=not args.no_external,
-        timeout=args.timeout
+        timeout=args.timeout,
+        jobs=args.jobs,
+        per_host=args.per_host,
+        cache=cache,
+        manifest=manifest,
+        root=args.root
     )
 
+    if cache:
+        cache.save()
+        results['cache'] = cache.stats()
+    if manifest:
+        manifest.save()
+        results['manifest'] = manifest.stats()
+
     print_results(results, args.verbose)
 
     # Exit with error code if there are errors
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Site Checker
+
+Runs every page check in one process, parsing each page once:
+- HTML structure and accessibility (validate_html.HTMLValidator)
+- Image dimensions and srcset candidates (validate_html.ImageAnalyzer)
+- Links and anchors, deduplicated across pages (check_links.check_site)
+
+Usage:
+    python tools/check_site.py
+    python tools/check_site.py --no-external
+    python tools/check_site.py index.html projects/*.html --verbose
+    python tools/check_site.py --changed-only --no-external
+
+Requirements (optional, for external link checking):
+    pip install requests
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from check_links import (
+    CACHE_FILE, DEFAULT_JOBS, PER_HOST_LIMIT, PROJECT_ROOT, REQUESTS_AVAILABLE,
+    TOOL_SOURCES as LINK_SOURCES, LinkCache, check_site, parse_max_age,
+    print_results as print_link_results
+)
+from html_engine import find_html_files
+from manifest import Manifest, changed_files
+from validate_html import TOOL_SOURCES as VALIDATION_SOURCES, print_report, validate_files
+
+# Pages checked when none are given
+DEFAULT_PAGES = ['index.html', 'privacy-policy.html', 'projects/*.html', 'services/*.html']
+
+
+def default_pages() -> list:
+    """Expand DEFAULT_PAGES against the project root."""
+    pages = []
+    for pattern in DEFAULT_PAGES:
+        pages.extend(sorted(PROJECT_ROOT.glob(pattern)))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Validate pages and check links across the site in one pass'
+    )
+    parser.add_argument('files', nargs='*', metavar='file',
+                       help=f"HTML pages, directories or globs (default: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--crawl', action='store_true',
+                       help='Also follow internal .html links to pages not listed')
+    parser.add_argument('--root', type=Path, default=None,
+                       help="Directory --crawl stays inside (default: the project root, "
+                            "or the pages' common directory outside it)")
+    parser.add_argument('--no-external', action='store_true',
+                       help='Skip external link checks')
+    parser.add_argument('--timeout', '-t', type=int, default=5,
+                       help='Timeout for external requests (default: 5s)')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                       help=f'Parallel external checks, 1 = serial (default: {DEFAULT_JOBS})')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT,
+                       help=f'Max simultaneous requests per host (default: {PER_HOST_LIMIT})')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=True,
+                       help=f'Reuse recent external results from {CACHE_FILE.relative_to(PROJECT_ROOT)} (default: on)')
+    parser.add_argument('--max-age', action='append', metavar='[STATUS=]SECONDS',
+                       help='External cache lifetime (see check_links.py --help)')
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=True,
+                       help='Reuse results for pages unchanged since the last run (default: on)')
+    parser.add_argument('--changed-only', action='store_true',
+                       help='Check only pages staged in git, plus pages depending on staged files')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Show info messages and OK links')
+
+    args = parser.parse_args()
+
+    try:
+        ttl = parse_max_age(args.max_age)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    if args.changed_only and args.files:
+        parser.error('--changed-only takes its files from git; do not list files')
+
+    validation_manifest = link_manifest = None
+    if args.incremental or args.changed_only:
+        validation_manifest = Manifest('validate_html', sources=VALIDATION_SOURCES)
+        link_manifest = Manifest('check_links', sources=LINK_SOURCES)
+
+    if args.changed_only:
+        pages = changed_files(validation_manifest)
+        pages += [page for page in changed_files(link_manifest) if page not in pages]
+        if not pages:
+            print("\nNo staged HTML changes (or dependents) to check.")
+            sys.exit(0)
+    else:
+        pages = find_html_files(args.files) if args.files else default_pages()
+    if not args.incremental:
+        validation_manifest = link_manifest = None
+
+    for page in pages:
+        if not page.exists():
+            print(f"ERROR: File not found: {page}")
+            sys.exit(1)
+
+    print(f"\nChecking {len(pages)} page(s)")
+
+    if not REQUESTS_AVAILABLE and not args.no_external:
+        print("\nNote: 'requests' library not installed.")
+        print("External links will be skipped.")
+        print("Install with: pip install requests")
+
+    # Validate in this process: the link check below reuses the same parses
+    validation = validate_files(pages, jobs=1, manifest=validation_manifest)
+
+    cache = LinkCache(ttl=ttl) if args.cache and not args.no_external else None
+
+    links = check_site(
+        pages,
+        follow=args.crawl,
+        check_external=not args.no_external,
+        timeout=args.timeout,
+        jobs=args.jobs,
+        per_host=args.per_host,
+        cache=cache,
+        manifest=link_manifest,
+        root=args.root
+    )
+
+    if cache:
+        cache.save()
+        links['cache'] = cache.stats()
+    if link_manifest:
+        validation_manifest.save()
+        link_manifest.save()
+        links['manifest'] = link_manifest.stats()
+
+    print_report(validation, args.verbose)
+    print_link_results(links, args.verbose)
+
+    failed_pages = [page for page, results in validation.items() if results['errors']]
+
+    print(f"\n{'='*60}")
+    print("SITE SUMMARY")
+    print('='*60)
+    print(f"  Pages validated: {len(validation)} ({len(failed_pages)} failed)")
+    print(f"  Link errors: {len(links['errors'])}")
+
+    if failed_pages or links['errors']:
+        print(f"\n  STATUS: FAILED")
+    else:
+        print(f"\n  STATUS: PASSED")
+    print('='*60)
+
+    # Exit with error code if there are errors
+    sys.exit(1 if failed_pages or links['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
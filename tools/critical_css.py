@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Critical CSS Inliner
+
+Writes a copy of each page with the CSS its first screen needs inlined in
+a <style> block, and its stylesheets loaded without blocking rendering:
+
+    <style>/* rules for the header, nav and hero */</style>
+    <link rel="preload" href="style.css" as="style" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link rel="stylesheet" href="style.css"></noscript>
+
+"Above the fold" is everything in the page up to the end of its first
+<section> (--fold-sections): the skip link, loading overlay, header, nav
+and hero on index.html, the project header and first section on project
+pages. The critical rules are the page's stylesheet pruned to what those
+elements (and the classes script.js adds to them) can match, using the
+same selector matching as prune_css.py, so @media variants, :root
+variables and @font-face rules come along.
+
+External stylesheets (Google Fonts) are deferred too, unless
+--no-defer-external; their display=swap shows fallback text meanwhile.
+
+Pages are rebuilt only when the page, one of its stylesheets or scripts,
+or the settings changed (content-hash cache in .tmp/critical_css.json).
+
+Usage:
+    python tools/critical_css.py                     # All pages -> dist/
+    python tools/critical_css.py index.html --output-dir /tmp/site
+    python tools/critical_css.py --fold-sections 2   # Treat two sections as above the fold
+"""
+
+import argparse
+import os
+import posixpath
+import re
+import sys
+import time
+from pathlib import Path
+
+import minify
+import prune_css
+from check_budget import CSS_URL
+from check_links import categorize_link, resolve_internal
+from check_site import DEFAULT_PAGES, default_pages
+from html_engine import find_html_files, parse_document
+from manifest import PROJECT_ROOT, BuildCache, hash_file, manifest_key
+from minify import minify_css
+from optimize_images import format_size
+from prune_css import SelectorIndex
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / 'dist'
+FOLD_SECTIONS = 1  # <section>s counted as above the fold
+
+# <link> tags; quoted attribute values may contain '>' (e.g. inline SVG favicons)
+LINK_TAG = re.compile(r'<link\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.IGNORECASE)
+TAG_ATTRIBUTE = re.compile(r'([\w:-]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+REL_STYLESHEET = re.compile(r'\brel\s*=\s*(["\']?)stylesheet\1', re.IGNORECASE)
+
+DEFER_ONLOAD = "this.onload=null;this.rel='stylesheet'"
+
+
+class FoldIndex(SelectorIndex):
+    """
+    SelectorIndex of the elements above the fold, plus every local script
+    the page loads (scripts usually sit at the end of <body>).
+    """
+
+    def __init__(self, fold_sections: int = FOLD_SECTIONS):
+        super().__init__()
+        self.fold_sections = fold_sections
+        self.sections = 0
+        self.section_depth = 0
+        self.past_fold = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'section' and self.section_depth == 0 and self.sections >= self.fold_sections:
+            self.past_fold = True
+        if tag == 'section':
+            self.section_depth += 1
+
+        if not self.past_fold:
+            super().handle_starttag(tag, attrs)
+        elif tag == 'script':
+            src = dict(attrs).get('src')
+            if src and categorize_link(src) == 'internal':
+                self.scripts.append(src)
+
+    def handle_endtag(self, tag):
+        if tag == 'section' and self.section_depth:
+            self.section_depth -= 1
+            if self.section_depth == 0:
+                self.sections += 1
+
+
+def tag_attributes(tag: str) -> dict:
+    """Attributes of a start tag's source text (names lowercased)."""
+    body = re.sub(r'^<\w+|/?>$', '', tag)
+    return {name.lower(): ''.join(values) for name, *values in TAG_ATTRIBUTE.findall(body)}
+
+
+def head_stylesheets(html: str) -> list:
+    """(match, href) for each <link rel="stylesheet"> in <head>."""
+    head_end = html.lower().find('</head>')
+    links = []
+    for match in LINK_TAG.finditer(html, 0, head_end if head_end != -1 else len(html)):
+        attrs = tag_attributes(match.group(0))
+        if attrs.get('rel', '').lower() == 'stylesheet' and attrs.get('href'):
+            links.append((match, attrs['href']))
+    return links
+
+
+def defer_link(tag: str, indent: str) -> str:
+    """A stylesheet <link> rewritten to preload and apply on load (plain link in <noscript>)."""
+    preload = REL_STYLESHEET.sub(f'rel="preload" as="style" onload="{DEFER_ONLOAD}"', tag, count=1)
+    return f'{preload}\n{indent}<noscript>{tag}</noscript>'
+
+
+def rebase_urls(css: str, stylesheet: Path, page: Path) -> str:
+    """Rewrite relative url()s so they still resolve once inlined in `page`."""
+    prefix = Path(os.path.relpath(stylesheet.parent, page.parent)).as_posix()
+    if prefix == '.':
+        return css
+
+    def rebase(match):
+        url = ''.join(group or '' for group in match.groups())
+        if categorize_link(url) != 'internal' or url.startswith('/'):
+            return match.group(0)
+        return f'url("{posixpath.normpath(posixpath.join(prefix, url))}")'
+
+    return CSS_URL.sub(rebase, css)
+
+
+def indent_before(html: str, offset: int) -> str:
+    """Whitespace between the start of the line and `offset`."""
+    line_start = html.rfind('\n', 0, offset) + 1
+    prefix = html[line_start:offset]
+    return prefix if not prefix.strip() else ''
+
+
+def inline_critical(page: Path, index: FoldIndex, defer_external: bool = True) -> tuple:
+    """
+    Rewrite a page with its critical CSS inlined and its stylesheets deferred.
+
+    `index` must already have replayed the page. Returns (html, stats);
+    html is None if the page links no local stylesheet.
+    """
+    html = page.read_text(encoding='utf-8')
+    links = head_stylesheets(html)
+    local = [(match, href) for match, href in links if categorize_link(href) == 'internal']
+    if not local:
+        return None, {'page': manifest_key(page), 'skipped': 'no local stylesheet'}
+
+    critical, stylesheet_bytes, rules, kept = [], 0, 0, 0
+    for _, href in local:
+        stylesheet = resolve_internal(href, page)
+        if not stylesheet.is_file():
+            continue
+        css = stylesheet.read_text(encoding='utf-8')
+        pruned = prune_css.prune_css(css, index)
+        stylesheet_bytes += len(css.encode('utf-8'))
+        rules += pruned['rules']
+        kept += pruned['rules'] - len(pruned['removed'])
+        critical.append(minify_css(rebase_urls(pruned['css'], stylesheet, page)))
+    style = '<style>' + '\n'.join(critical).replace('</', '<\\/') + '</style>'
+
+    # Rewrite from the end so earlier offsets stay valid
+    deferred = 0
+    first_local = local[0][0]
+    for match, href in reversed(links):
+        if categorize_link(href) != 'internal' and not defer_external:
+            continue
+        indent = indent_before(html, match.start())
+        replacement = defer_link(match.group(0), indent)
+        if match is first_local:
+            replacement = f'{style}\n{indent}{replacement}'
+        html = html[:match.start()] + replacement + html[match.end():]
+        deferred += 1
+
+    critical_bytes = len(style.encode('utf-8'))
+    return html, {
+        'page': manifest_key(page),
+        'rules': rules,
+        'critical_rules': kept,
+        'critical_bytes': critical_bytes,
+        'stylesheet_bytes': stylesheet_bytes,
+        'deferred': deferred
+    }
+
+
+def page_inputs(page: Path, index: FoldIndex) -> list:
+    """Local stylesheets and scripts a page's critical CSS depends on."""
+    html = page.read_text(encoding='utf-8')
+    inputs = [resolve_internal(href, page) for _, href in head_stylesheets(html)
+              if categorize_link(href) == 'internal']
+    inputs += [resolve_internal(src, page) for src in index.scripts]
+    return [path for path in inputs if path.is_file()]
+
+
+def build_page(page: Path, output: Path, fold_sections: int, defer_external: bool,
+               cache: BuildCache = None) -> dict:
+    """Write one page's critical-CSS version to `output`, reusing the cache when possible."""
+    index = FoldIndex(fold_sections)
+    parse_document(page).replay(index)
+    inputs = page_inputs(page, index)
+
+    if cache:
+        key = cache.key(page, inputs={manifest_key(path): hash_file(path) for path in inputs},
+                        fold_sections=fold_sections, defer_external=defer_external)
+        stored = cache.lookup(output, key)
+        if stored is not None:
+            return dict(stored, cached=True)
+
+    for path in inputs:
+        if path.suffix.lower() == '.js':
+            index.add_script(path.read_text(encoding='utf-8', errors='replace'))
+
+    html, stats = inline_critical(page, index, defer_external)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if html is None:
+        output.write_bytes(page.read_bytes())  # Copied unchanged so the output has every page
+    else:
+        output.write_text(html, encoding='utf-8')
+    stats['html_bytes'] = page.stat().st_size
+    stats['output_bytes'] = output.stat().st_size
+
+    if cache:
+        cache.record(output, key, stats)
+    return stats
+
+
+def print_results(results: list, output_dir: Path, wall_time: float):
+    """Print the critical CSS size for each page."""
+    cached = sum(1 for stats in results if stats.get('cached'))
+
+    print(f"\n{'='*60}")
+    print(f"CRITICAL CSS ({len(results)} pages, {cached} cached)")
+    print('='*60)
+    print(f"  {'Page':34} {'Critical':>9} {'Rules':>9} {'HTML':>19}")
+    for stats in results:
+        name = stats['page'] if len(stats['page']) <= 34 else '...' + stats['page'][-31:]
+        if 'skipped' in stats:
+            print(f"  {name:34} [SKIP] {stats['skipped']}")
+            continue
+        share = stats['critical_bytes'] / stats['stylesheet_bytes'] if stats['stylesheet_bytes'] else 0
+        print(f"  {name:34} {format_size(stats['critical_bytes']):>9} "
+              f"{stats['critical_rules']:>4}/{stats['rules']:<4} "
+              f"{format_size(stats['html_bytes']):>8} -> {format_size(stats['output_bytes']):<8}"
+              f"  ({share:.0%} of CSS, {stats['deferred']} deferred)")
+
+    print(f"\n  Output: {output_dir}")
+    print(f"  Time: {wall_time:.1f}s")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inline each page\'s above-the-fold CSS and defer its stylesheets'
+    )
+    parser.add_argument('files', nargs='*', metavar='file',
+                       help=f"HTML pages, directories or globs (default: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--output-dir', '-o', type=Path, default=DEFAULT_OUTPUT_DIR,
+                       help=f'Where rewritten pages go, same layout as the site (default: {manifest_key(DEFAULT_OUTPUT_DIR)}/)')
+    parser.add_argument('--fold-sections', type=int, default=FOLD_SECTIONS,
+                       help=f'<section>s counted as above the fold (default: {FOLD_SECTIONS})')
+    parser.add_argument('--defer-external', action=argparse.BooleanOptionalAction, default=True,
+                       help='Also defer external stylesheets such as Google Fonts (default: on)')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=True,
+                       help='Skip pages whose page, CSS and scripts are unchanged (default: on)')
+
+    args = parser.parse_args()
+
+    pages = find_html_files(args.files) if args.files else default_pages()
+    for page in pages:
+        if not page.exists():
+            print(f"ERROR: File not found: {page}")
+            sys.exit(1)
+
+    output_dir = args.output_dir.resolve()
+    if output_dir == PROJECT_ROOT:
+        print("ERROR: --output-dir is the site itself; pages would be overwritten")
+        sys.exit(1)
+
+    cache = BuildCache('critical_css', sources=[__file__, prune_css.__file__, minify.__file__]) if args.cache else None
+
+    start = time.perf_counter()
+    results = [
+        build_page(page, output_dir / manifest_key(page), args.fold_sections, args.defer_external, cache)
+        for page in pages
+    ]
+    wall_time = time.perf_counter() - start
+
+    if cache:
+        cache.save()
+
+    print_results(results, output_dir, wall_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Asset Fingerprinting
+
+Gives every static asset of a built site (dist/) a content-hashed name,
+style.css -> style.3f2a9c1b.css, and points every reference at it, so the
+host can serve assets with `Cache-Control: public, max-age=31536000, immutable`:
+a changed file gets a new name instead of a stale cache hit.
+
+References rewritten:
+- HTML: src, href and srcset values that LinkExtractor (check_links.py)
+  reports as links, so the rewrite and the link checker agree on what a
+  reference is; url()s in <style> blocks and style attributes; URL strings
+  in JSON-LD blocks
+- CSS: url() and @import. A stylesheet is hashed after its references are
+  rewritten, so a changed image also renames the stylesheet using it.
+
+Pages keep their names (they are what visitors type). The original assets
+stay next to the hashed copies by default, for references nothing here can
+rewrite (og:image meta tags, paths built in scripts); pass
+--no-keep-originals to remove them. The mapping is written to
+asset-manifest.json at the top of the tree.
+
+build.py runs this on dist/ (--no-fingerprint to skip).
+
+Usage:
+    python tools/fingerprint.py dist/
+    python tools/fingerprint.py /tmp/site --no-keep-originals
+"""
+
+import argparse
+import html
+import json
+import posixpath
+import re
+import sys
+from pathlib import Path
+
+from check_budget import CSS_IMPORT, CSS_URL
+from check_links import categorize_link, extract_links, resolve_internal, srcset_urls
+from manifest import hash_bytes
+
+HASH_LENGTH = 8
+MANIFEST_NAME = 'asset-manifest.json'
+
+FINGERPRINTED_EXTENSIONS = {
+    '.css', '.js', '.mjs',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico',
+    '.woff2', '.woff', '.ttf', '.otf'
+}
+
+# Blocks whose content isn't markup, and start tags (quoted values may contain '>')
+QUOTED = r'(?:[^>"\']|"[^"]*"|\'[^\']*\')*'
+HTML_PART = re.compile(
+    r'(?P<comment><!--[\s\S]*?-->)'
+    r'|(?P<block>(?P<open><(?P<block_tag>script|style)\b' + QUOTED + r'>)(?P<content>[\s\S]*?)(?P<close></(?P=block_tag)\s*>))'
+    r'|(?P<tag><[a-zA-Z][\w:-]*' + QUOTED + r'>)',
+    re.IGNORECASE
+)
+ATTRIBUTE = re.compile(r'(\s)([\w:-]+)(\s*=\s*)(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+JSON_LD_TYPE = re.compile(r'\stype\s*=\s*["\']?application/ld\+json', re.IGNORECASE)
+URL_ATTRIBUTES = {'src', 'href'}
+
+
+def hashed_name(path: Path, data: bytes) -> str:
+    """style.css -> style.<hash>.css"""
+    return f'{path.stem}.{hash_bytes(data)[:HASH_LENGTH]}{path.suffix}'
+
+
+def rewrite_url(url: str, base: Path, renamed: dict) -> str:
+    """
+    The URL pointing at the hashed copy of what `url` (relative to the
+    file `base`) points at; other URLs are returned unchanged.
+    """
+    if categorize_link(url) != 'internal':
+        return url
+    target = resolve_internal(url, base)
+    if target not in renamed:
+        return url
+    path, rest = re.match(r'([^?#]*)(.*)', url).groups()
+    return posixpath.join(posixpath.dirname(path), renamed[target].name) + rest
+
+
+class Rewriter:
+    """Rewrites references inside one file and counts them."""
+
+    def __init__(self, base: Path, renamed: dict, references: set = None):
+        self.base = base
+        self.renamed = renamed
+        self.references = references  # For HTML: the URLs LinkExtractor found
+        self.count = 0
+
+    def url(self, url: str) -> str:
+        new = rewrite_url(url, self.base, self.renamed)
+        if new != url:
+            self.count += 1
+        return new
+
+    def css(self, css: str) -> str:
+        """Rewrite url() and @import targets."""
+        def replace(match, url):
+            new = self.url(url)
+            return match.group(0) if new == url else match.group(0).replace(url, new, 1)
+
+        css = CSS_URL.sub(lambda m: replace(m, ''.join(group or '' for group in m.groups())), css)
+        return CSS_IMPORT.sub(lambda m: replace(m, m.group(2)), css)
+
+    def json_value(self, value):
+        """Rewrite URL strings anywhere in a parsed JSON document."""
+        if isinstance(value, dict):
+            return {key: self.json_value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.json_value(item) for item in value]
+        if isinstance(value, str):
+            return self.url(value)
+        return value
+
+    def json_ld(self, text: str) -> str:
+        """Rewrite a JSON-LD block; left as written if nothing in it changes."""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return text
+        before = self.count
+        data = self.json_value(data)
+        if self.count == before:
+            return text
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+
+    def attribute(self, match) -> str:
+        space, name, equals = match.group(1), match.group(2).lower(), match.group(3)
+        raw = next(value for value in match.groups()[3:] if value is not None)
+        value = html.unescape(raw)
+
+        if name in URL_ATTRIBUTES and value in self.references:
+            new = self.url(value)
+        elif name == 'srcset':
+            new = value
+            for url in srcset_urls(value):
+                if url in self.references:
+                    new = new.replace(url, self.url(url), 1)
+        elif name == 'style':
+            new = self.css(value)
+        else:
+            return match.group(0)
+
+        if new == value:
+            return match.group(0)
+        quote = '"' if match.group(4) is not None else "'" if match.group(5) is not None else ''
+        return f'{space}{match.group(2)}{equals}{quote}{html.escape(new, quote=False)}{quote}'
+
+    def tag(self, tag: str) -> str:
+        return ATTRIBUTE.sub(self.attribute, tag)
+
+    def html(self, text: str) -> str:
+        """Rewrite a page's references."""
+        def replace(match):
+            if match.group('comment'):
+                return match.group(0)
+            if match.group('tag'):
+                return self.tag(match.group('tag'))
+            open_tag = self.tag(match.group('open'))
+            content = match.group('content')
+            if match.group('block_tag').lower() == 'style':
+                content = self.css(content)
+            elif JSON_LD_TYPE.search(open_tag):
+                content = self.json_ld(content)
+            return open_tag + content + match.group('close')
+
+        return HTML_PART.sub(replace, text)
+
+
+def find_files(root: Path) -> list:
+    """Every file under root, hidden directories and files skipped."""
+    return sorted(
+        path for path in root.rglob('*')
+        if path.is_file() and not any(part.startswith('.') for part in path.relative_to(root).parts)
+    )
+
+
+def fingerprint_tree(root: Path, keep_originals: bool = True) -> dict:
+    """
+    Fingerprint every asset under root and rewrite references to them.
+
+    Returns {'assets', 'references', 'files', 'manifest'}. Raises
+    ValueError if the tree was already fingerprinted.
+    """
+    root = root.resolve()
+    manifest_path = root / MANIFEST_NAME
+    if manifest_path.exists():
+        raise ValueError(f"{root} is already fingerprinted ({MANIFEST_NAME} exists); rebuild it first")
+
+    files = find_files(root)
+    assets = [path for path in files if path.suffix.lower() in FINGERPRINTED_EXTENSIONS]
+    stylesheets = {path for path in assets if path.suffix.lower() == '.css'}
+    renamed = {}
+    references = 0
+
+    for path in assets:
+        if path not in stylesheets:
+            data = path.read_bytes()
+            renamed[path] = path.with_name(hashed_name(path, data))
+            renamed[path].write_bytes(data)
+
+    # Stylesheets after what they reference (imported stylesheets first)
+    visiting = set()
+
+    def fingerprint_stylesheet(path: Path):
+        nonlocal references
+        if path in renamed or path in visiting:
+            return
+        visiting.add(path)
+        css = path.read_text(encoding='utf-8')
+        for url in [''.join(groups) for groups in CSS_URL.findall(css)] + [url for _, url in CSS_IMPORT.findall(css)]:
+            if categorize_link(url) == 'internal' and resolve_internal(url, path) in stylesheets:
+                fingerprint_stylesheet(resolve_internal(url, path))
+        rewriter = Rewriter(path, renamed)
+        data = rewriter.css(css).encode('utf-8')
+        references += rewriter.count
+        renamed[path] = path.with_name(hashed_name(path, data))
+        renamed[path].write_bytes(data)
+
+    for path in sorted(stylesheets):
+        fingerprint_stylesheet(path)
+
+    pages = [path for path in files if path.suffix.lower() in ('.html', '.htm')]
+    for page in pages:
+        rewriter = Rewriter(page, renamed, {link['url'] for link in extract_links(page)})
+        text = page.read_text(encoding='utf-8')
+        rewritten = rewriter.html(text)
+        if rewritten != text:
+            page.write_text(rewritten, encoding='utf-8')
+        references += rewriter.count
+
+    if not keep_originals:
+        for path in renamed:
+            path.unlink()
+
+    mapping = {
+        path.relative_to(root).as_posix(): hashed.relative_to(root).as_posix()
+        for path, hashed in sorted(renamed.items())
+    }
+    manifest_path.write_text(json.dumps(mapping, indent=2) + '\n', encoding='utf-8')
+    return {'assets': len(renamed), 'references': references, 'files': len(pages), 'manifest': manifest_path}
+
+
+def print_results(stats: dict, keep_originals: bool):
+    print(f"\n{'='*60}")
+    print("FINGERPRINTING")
+    print('='*60)
+    print(f"  Assets: {stats['assets']} renamed to name.<hash>.ext"
+          f"{' (originals kept)' if keep_originals else ''}")
+    print(f"  References rewritten: {stats['references']} (in {stats['files']} pages and the stylesheets)")
+    print(f"  Manifest: {stats['manifest']}")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Give the assets of a built site content-hashed names and rewrite references'
+    )
+    parser.add_argument('root', type=Path, help='Built site directory (e.g. dist/)')
+    parser.add_argument('--keep-originals', action=argparse.BooleanOptionalAction, default=True,
+                       help='Keep the unhashed files for references that cannot be rewritten (default: on)')
+
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"ERROR: Directory not found: {args.root}")
+        sys.exit(1)
+
+    try:
+        stats = fingerprint_tree(args.root, args.keep_originals)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    print_results(stats, args.keep_originals)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Page Generator (partials)
+
+Keeps the blocks every page shares (header/nav, footer) in one place,
+partials/, and writes them into the pages. Pages stay plain HTML that
+works without a build: the generated block sits between two markers and
+is replaced on every run.
+
+    <!-- include: header.html -->
+    ...generated, don't edit here...
+    <!-- end include -->
+
+Partials may use per-page variables:
+- {{ root }}  relative prefix to the site root: '' or '../'
+- {{ home }}  link to the home page: '' on index.html (so '#about' stays
+              on the page), otherwise '{{ root }}index.html'
+- {{ page }}  the page's path from the site root, e.g. projects/kuration-ai.html
+- anything given on the marker: <!-- include: header.html active="work" -->
+A partial can include another one with a bare <!-- include: name.html -->
+line. Generated lines are indented like the marker.
+
+Incremental: .tmp/generate_pages.json records each page's hash and the
+partials it reads, so a page is regenerated only when it or one of its
+partials changed (a footer edit regenerates exactly the pages using it).
+
+Usage:
+    python tools/generate_pages.py                   # All pages
+    python tools/generate_pages.py projects/*.html
+    python tools/generate_pages.py --check           # Exit 1 if a page is out of date (CI)
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from check_site import DEFAULT_PAGES, default_pages
+from html_engine import find_html_files
+from manifest import PROJECT_ROOT, Manifest, manifest_key
+
+PARTIALS_DIR = PROJECT_ROOT / 'partials'
+
+# A generated region in a page, and an include line in a partial
+MARKER = r'<!--\s*include:\s*([\w./-]+)((?:\s+[\w-]+="[^"]*")*)\s*-->'
+REGION = re.compile(r'^([ \t]*)' + MARKER + r'[ \t]*\n(.*?)^([ \t]*)<!--\s*end include\s*-->', re.M | re.S)
+DIRECTIVE = re.compile(r'^([ \t]*)' + MARKER + r'[ \t]*$', re.M)
+MARKER_ATTRIBUTE = re.compile(r'([\w-]+)="([^"]*)"')
+VARIABLE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+def page_variables(page: Path) -> dict:
+    """Variables every page gets: root, home and page."""
+    key = page.resolve().relative_to(PROJECT_ROOT).as_posix()
+    root = '../' * key.count('/')
+    return {'root': root, 'home': '' if key == 'index.html' else f'{root}index.html', 'page': key}
+
+
+def indent(text: str, prefix: str) -> str:
+    return ''.join(prefix + line if line.strip() else line for line in text.splitlines(True))
+
+
+def render_partial(name: str, variables: dict, used: list, stack: tuple = ()) -> str:
+    """
+    A partial with its includes expanded and variables filled in.
+
+    Every partial file read is appended to `used`. Raises ValueError for a
+    missing partial, an include cycle or an unknown variable.
+    """
+    path = PARTIALS_DIR / name
+    if name in stack:
+        raise ValueError(f"include cycle: {' -> '.join(stack + (name,))}")
+    if not path.is_file():
+        raise ValueError(f"partial not found: {manifest_key(path)}")
+    if path not in used:
+        used.append(path)
+    text = path.read_text(encoding='utf-8')
+
+    def expand(match):
+        nested = dict(variables, **dict(MARKER_ATTRIBUTE.findall(match.group(3))))
+        rendered = render_partial(match.group(2), nested, used, stack + (name,))
+        return indent(rendered, match.group(1)).rstrip('\n')
+
+    text = DIRECTIVE.sub(expand, text)
+
+    def fill(match):
+        if match.group(1) not in variables:
+            raise ValueError(f"{name}: unknown variable '{{{{ {match.group(1)} }}}}'")
+        return variables[match.group(1)]
+
+    return VARIABLE.sub(fill, text)
+
+
+def generate(html: str, variables: dict) -> tuple:
+    """Refill every include region; returns (html, partials read, region count)."""
+    used = []
+    count = 0
+
+    def refill(match):
+        nonlocal count
+        count += 1
+        marker_indent, name, attributes = match.group(1), match.group(2), match.group(3)
+        local = dict(variables, **dict(MARKER_ATTRIBUTE.findall(attributes)))
+        rendered = indent(render_partial(name, local, used), marker_indent).rstrip('\n')
+        start = match.group(0)[:match.start(4) - match.start(0)]
+        return f"{start}{rendered}\n{match.group(5)}<!-- end include -->"
+
+    return REGION.sub(refill, html), used, count
+
+
+def generate_page(page: Path, manifest: Manifest = None, write: bool = True) -> dict:
+    """
+    Regenerate one page's include regions.
+
+    Returns {'page', 'regions', 'changed', 'cached'} or {'page', 'error'}.
+    With write=False the page is only compared ('changed' = out of date).
+    """
+    key = manifest_key(page)
+    if manifest:
+        stored = manifest.lookup(page)
+        if stored is not None:
+            return dict(stored, page=key, changed=False, cached=True)
+
+    html = page.read_text(encoding='utf-8')
+    try:
+        generated, used, regions = generate(html, page_variables(page))
+    except ValueError as e:
+        return {'page': key, 'error': str(e)}
+
+    changed = generated != html
+    if changed and write:
+        page.write_text(generated, encoding='utf-8')
+        if manifest:
+            manifest.refresh(page)
+    if manifest and (write or not changed):
+        manifest.record(page, {'regions': regions}, reads=used)
+    return {'page': key, 'regions': regions, 'changed': changed, 'cached': False}
+
+
+def print_results(results: list, check: bool, wall_time: float):
+    """Print what was regenerated (or, with --check, what is out of date)."""
+    print(f"\n{'='*60}")
+    print(f"PAGE GENERATION ({len(results)} pages)")
+    print('='*60)
+    for result in results:
+        if 'error' in result:
+            print(f"  [ERROR] {result['page']}: {result['error']}")
+        elif result['changed']:
+            label = '[ERROR] out of date:' if check else '[OK]    regenerated:'
+            print(f"  {label} {result['page']} ({result['regions']} include(s))")
+        elif result['cached']:
+            print(f"  [SKIP]  {result['page']} (unchanged since last run)")
+        else:
+            print(f"  [OK]    {result['page']} (up to date, {result['regions']} include(s))")
+
+    changed = [result for result in results if result.get('changed')]
+    failed = [result for result in results if 'error' in result]
+    cached = sum(1 for result in results if result.get('cached'))
+    print(f"\n{'='*60}")
+    print("SUMMARY")
+    print('='*60)
+    print(f"  Pages: {len(results)} ({cached} unchanged since last run)")
+    print(f"  {'Out of date' if check else 'Regenerated'}: {len(changed)}")
+    if changed and not check:
+        print(f"  Validate them: python tools/check_site.py {' '.join(result['page'] for result in changed)}")
+    print(f"  Time: {wall_time * 1000:.0f} ms")
+    if failed or (check and changed):
+        print(f"\n  STATUS: FAILED")
+    else:
+        print(f"\n  STATUS: PASSED")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Fill the include regions of pages from partials/'
+    )
+    parser.add_argument('files', nargs='*', metavar='file',
+                       help=f"HTML pages, directories or globs (default: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--check', action='store_true',
+                       help="Don't write; exit 1 if a page differs from its partials")
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=True,
+                       help='Skip pages unchanged since the last run, partials included (default: on)')
+
+    args = parser.parse_args()
+
+    pages = find_html_files(args.files) if args.files else default_pages()
+    for page in pages:
+        if not page.exists():
+            print(f"ERROR: File not found: {page}")
+            sys.exit(1)
+
+    manifest = Manifest('generate_pages', sources=[__file__]) if args.incremental else None
+
+    start = time.perf_counter()
+    results = [generate_page(page, manifest, write=not args.check) for page in pages]
+    wall_time = time.perf_counter() - start
+
+    if manifest:
+        manifest.save()
+
+    print_results(results, args.check, wall_time)
+    failed = any('error' in result for result in results)
+    sys.exit(1 if failed or (args.check and any(result['changed'] for result in results)) else 0)
+
+
+if __name__ == '__main__':
+    main()
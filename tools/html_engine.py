@@ -0,0 +1,142 @@
+"""
+HTML Parse Engine
+
+Parses each HTML page once into a compact event stream that any number
+of analyzers can consume. validate_html.py, check_links.py and
+check_site.py all read pages through here, so a page checked by several
+tools in one process is read and tokenized only once.
+
+An analyzer is any object with HTMLParser-style handler methods
+(handle_decl, handle_starttag, handle_endtag, handle_data). HTMLParser
+subclasses such as HTMLValidator and LinkExtractor work unchanged.
+
+Usage:
+    from html_engine import parse_document
+
+    document = parse_document(Path('index.html'))
+    document.replay(HTMLValidator(), LinkExtractor())
+"""
+
+import glob
+from pathlib import Path
+from html.parser import HTMLParser
+
+# Directories of page fragments, not pages (tools/generate_pages.py)
+FRAGMENT_DIRS = {'partials'}
+
+
+class EventRecorder(HTMLParser):
+    """Record the parse events analyzers care about, in document order."""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def handle_decl(self, decl):
+        self.events.append(('decl', decl))
+
+    def handle_starttag(self, tag, attrs):
+        self.events.append(('start', tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        # Same as HTMLParser's default: a self-closing tag opens and closes
+        self.events.append(('start', tag, attrs))
+        self.events.append(('end', tag))
+
+    def handle_endtag(self, tag):
+        self.events.append(('end', tag))
+
+    def handle_data(self, data):
+        # Whitespace between tags carries nothing analyzers use
+        if data.strip():
+            self.events.append(('data', data))
+
+
+class Analyzer:
+    """Base class for analyzers that only need some of the handlers."""
+
+    def handle_decl(self, decl):
+        pass
+
+    def handle_starttag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        pass
+
+    def handle_data(self, data):
+        pass
+
+
+class Document:
+    """A parsed HTML page: its path and recorded event stream."""
+
+    def __init__(self, path: Path, events: list):
+        self.path = path
+        self.events = events
+
+    def replay(self, *analyzers):
+        """Feed the event stream to every analyzer in a single pass."""
+        handlers = [
+            {
+                'decl': analyzer.handle_decl,
+                'start': analyzer.handle_starttag,
+                'end': analyzer.handle_endtag,
+                'data': analyzer.handle_data
+            }
+            for analyzer in analyzers
+        ]
+        for kind, *args in self.events:
+            for handler in handlers:
+                handler[kind](*args)
+        return analyzers
+
+
+def display_path(path: Path) -> str:
+    """Show a path relative to the working directory when possible."""
+    try:
+        return str(path.relative_to(Path.cwd()))
+    except ValueError:
+        return str(path)
+
+
+_documents = {}  # Resolved path -> Document, for the life of the process
+
+
+def parse_document(path: Path) -> Document:
+    """Parse an HTML file, reusing the result if it was already parsed."""
+    path = path.resolve()
+    if path not in _documents:
+        recorder = EventRecorder()
+        recorder.feed(path.read_text(encoding='utf-8'))
+        recorder.close()
+        _documents[path] = Document(path, recorder.events)
+    return _documents[path]
+
+
+def find_html_files(patterns: list) -> list:
+    """
+    Expand files, directories and glob patterns into a list of HTML files.
+
+    Directories are searched recursively (skipping hidden ones such as
+    .git and .tmp, and FRAGMENT_DIRS). Order follows the arguments;
+    duplicates are dropped.
+    """
+    files = []
+    for pattern in patterns:
+        pattern = str(pattern)
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(
+                match for match in path.rglob('*.html')
+                if not any(part.startswith('.') or part in FRAGMENT_DIRS
+                           for part in match.relative_to(path).parts)
+            )
+        elif glob.has_magic(pattern):
+            matches = sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+        else:
+            matches = [path]  # Plain file: missing ones are reported by the caller
+        for match in matches:
+            if match not in files:
+                files.append(match)
+    return files
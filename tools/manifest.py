@@ -0,0 +1,215 @@
+"""
+Content-Hash Manifest
+
+Remembers each input file's content hash, what it depends on and the
+results of the last run, so tools can skip files that haven't changed.
+Manifests are JSON files in .tmp/ (git-ignored).
+
+A file's stored result is reused only when the file itself and every
+recorded dependency are unchanged. Dependencies come in two kinds:
+- needs:  only existence matters (an image a page links to)
+- reads:  content matters (a page whose ids another page's #fragment uses)
+
+The manifest is also invalidated whenever the tool's own source files
+change, so an upgraded checker never serves results from an older one.
+
+BuildCache does the same for tools that generate files (the image
+pipeline): a build step is skipped when its source, settings and tool
+version are unchanged and its outputs are still on disk, untouched.
+
+Usage:
+    manifest = Manifest('validate_html', sources=[__file__])
+    result = manifest.lookup(path)
+    if result is None:
+        result = expensive_check(path)
+        manifest.record(path, result, needs=[...], reads=[...])
+    manifest.save()
+"""
+
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TMP_DIR = PROJECT_ROOT / '.tmp'
+
+
+def hash_bytes(data: bytes) -> str:
+    """Content hash used throughout the tools."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    """Hash a file's content, or return None if it doesn't exist."""
+    try:
+        return hash_bytes(Path(path).read_bytes())
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
+def manifest_key(path: Path) -> str:
+    """Project-relative POSIX path, so keys match `git diff` output."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def staged_files() -> list:
+    """Project-relative paths staged in git (including deletions)."""
+    output = subprocess.run(
+        ['git', 'diff', '--cached', '--name-only', '--no-renames'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return [line for line in output.splitlines() if line]
+
+
+def changed_files(manifest, suffixes: tuple = ('.html',)) -> list:
+    """
+    Files to re-check for --changed-only: staged files with the given
+    suffixes, plus files whose recorded dependencies were staged (e.g. a
+    page linking to a deleted image). Only files that still exist.
+    """
+    staged = staged_files()
+    keys = [key for key in staged if key.lower().endswith(suffixes)]
+    keys += manifest.dependents(staged)
+
+    files = []
+    for key in keys:
+        path = PROJECT_ROOT / key
+        if path.is_file() and path not in files:
+            files.append(path)
+    return files
+
+
+class Manifest:
+    """Per-file hashes, dependencies and results from the previous run."""
+
+    def __init__(self, name: str, sources: list = ()):
+        self.path = TMP_DIR / f'{name}.json'
+        self.version = hash_bytes(b''.join(Path(source).read_bytes() for source in sources))
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}  # Memoized content hashes for this run
+        self.entries = {}
+
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                data = {}  # Corrupt manifest: start over
+            if data.get('version') == self.version:
+                self.entries = data.get('files', {})
+
+    def hash(self, path: Path) -> str:
+        key = manifest_key(path)
+        if key not in self._hashes:
+            self._hashes[key] = hash_file(path)
+        return self._hashes[key]
+
+    def refresh(self, path: Path):
+        """Forget a file's memoized hash (after the tool itself rewrote it)."""
+        self._hashes.pop(manifest_key(path), None)
+
+    def fingerprint(self, path: Path, content: bool) -> str:
+        """What a dependency looked like: its hash, or just whether it exists."""
+        if content:
+            return self.hash(path) or 'missing'
+        return 'exists' if Path(path).exists() else 'missing'
+
+    def lookup(self, path: Path):
+        """Return the stored result if the file and its dependencies are unchanged."""
+        entry = self.entries.get(manifest_key(path))
+        if entry and entry['hash'] == self.hash(path) and all(
+            self.fingerprint(PROJECT_ROOT / dep, content=state not in ('exists', 'missing'))
+            == state
+            for dep, state in entry['deps'].items()
+        ):
+            self.hits += 1
+            return entry['result']
+        self.misses += 1
+        return None
+
+    def record(self, path: Path, result, needs: list = (), reads: list = ()):
+        """Store a fresh result along with the dependencies it was computed from."""
+        deps = {manifest_key(dep): self.fingerprint(dep, content=False) for dep in needs}
+        deps.update({manifest_key(dep): self.fingerprint(dep, content=True) for dep in reads})
+        self.entries[manifest_key(path)] = {
+            'hash': self.hash(path),
+            'deps': deps,
+            'result': result
+        }
+
+    def dependents(self, paths: list) -> list:
+        """Files whose recorded dependencies include any of `paths` (project-relative)."""
+        paths = set(paths)
+        return [key for key, entry in self.entries.items() if paths & set(entry['deps'])]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'version': self.version, 'files': self.entries}
+        self.path.write_text(json.dumps(data, indent=1, sort_keys=True), encoding='utf-8')
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class BuildCache:
+    """
+    Content-addressed record of generated outputs.
+
+    Each build step is keyed by a hash of its source content, its settings
+    and the tool's own source. The step can be skipped when the key is
+    unchanged and every output it wrote still exists with the recorded
+    hash (so a hand-edited or deleted output is rebuilt).
+    """
+
+    def __init__(self, name: str, sources: list = ()):
+        self.path = TMP_DIR / f'{name}.json'
+        self.version = hash_bytes(b''.join(Path(source).read_bytes() for source in sources))
+        self.cached = 0
+        self.rebuilt = 0
+        self.entries = {}
+
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except (ValueError, OSError):
+                self.entries = {}  # Corrupt cache: start over
+
+    def key(self, source: Path, **settings) -> str:
+        """Hash of (source content, settings, tool version)."""
+        payload = json.dumps(
+            {'source': hash_file(source), 'settings': settings, 'version': self.version},
+            sort_keys=True, default=str
+        )
+        return hash_bytes(payload.encode('utf-8'))
+
+    def lookup(self, target: Path, key: str):
+        """Return the stored result if `target` was built from `key` and is untouched."""
+        entry = self.entries.get(manifest_key(target))
+        if entry and entry['key'] == key and all(
+            hash_file(PROJECT_ROOT / output) == digest
+            for output, digest in entry['outputs'].items()
+        ):
+            self.cached += 1
+            return entry['result']
+        self.rebuilt += 1
+        return None
+
+    def record(self, target: Path, key: str, result, outputs: list = None):
+        """Store a build result and the hashes of the outputs it wrote (default: target)."""
+        self.entries[manifest_key(target)] = {
+            'key': key,
+            'outputs': {manifest_key(output): hash_file(output) for output in outputs or [target]},
+            'result': result
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True), encoding='utf-8')
+
+    def stats(self) -> dict:
+        return {'cached': self.cached, 'rebuilt': self.rebuilt}
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+HTML / CSS / JS Minifiers
+
+Conservative, dependency-free minifiers used by build.py (and by
+critical_css.py for the inlined rules). They only drop bytes that can't
+change what the browser does:
+
+- CSS: comments (except /*! ... */), whitespace (outside strings) collapsed
+  and removed around { } ; , > and a block's last ';'
+- JS: comments (except /*! ... */) and indentation. Line breaks are kept
+  except after { ( , ; and before } ) ] , ;, so automatic semicolon
+  insertion behaves as before. Strings, template literals and regex
+  literals are copied untouched.
+- HTML: comments (except conditional ones) removed, whitespace collapsed,
+  and dropped between block-level tags. <pre> and <textarea> are copied
+  as-is, <style> and <script> go through the CSS / JS minifiers, JSON-LD
+  is re-serialized compactly. Attributes, their values and their quotes
+  are kept exactly as written.
+
+Usage:
+    python tools/minify.py style.css               # Print the minified file
+    python tools/minify.py index.html -o /tmp/index.min.html
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+# --- CSS ---
+
+CSS_STRING = r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'
+CSS_COMMENT = re.compile(CSS_STRING + r'|/\*(?!!)[\s\S]*?\*/')
+CSS_SPACE = re.compile(CSS_STRING + r'|\s+')
+CSS_PUNCTUATION = re.compile(CSS_STRING + r'|\s*([{};,>])\s*')
+CSS_LAST_SEMICOLON = re.compile(CSS_STRING + r'|;}')
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace outside strings."""
+    css = CSS_COMMENT.sub(lambda m: m.group(1) or ' ', css)
+    css = CSS_SPACE.sub(lambda m: m.group(1) or ' ', css)
+    css = CSS_PUNCTUATION.sub(lambda m: m.group(1) or m.group(2), css)
+    return CSS_LAST_SEMICOLON.sub(lambda m: m.group(1) or '}', css).strip()
+
+
+# --- JS ---
+
+# After these, a '/' starts a regex literal rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else'}
+
+# A space next to one of these can go (both sides are never merged into a longer operator)
+JS_SEPARATORS = set('{}()[];,:=<>?!&|')
+NEWLINE_AFTER = set('{(,;')
+NEWLINE_BEFORE = set('})],;')
+
+
+def skip_js_string(js: str, i: int) -> int:
+    """Index just past the '...' or "..." string starting at js[i]."""
+    quote = js[i]
+    i += 1
+    while i < len(js) and js[i] != quote and js[i] != '\n':
+        i += 2 if js[i] == '\\' else 1
+    return i + 1
+
+
+def skip_template(js: str, i: int) -> int:
+    """Index just past the `...` template literal starting at js[i] (with ${} expressions)."""
+    i += 1
+    while i < len(js):
+        if js[i] == '\\':
+            i += 2
+        elif js[i] == '`':
+            return i + 1
+        elif js.startswith('${', i):
+            depth = 0
+            i += 1
+            while i < len(js):
+                if js[i] in '"\'':
+                    i = skip_js_string(js, i)
+                    continue
+                if js[i] == '`':
+                    i = skip_template(js, i)
+                    continue
+                if js[i] == '{':
+                    depth += 1
+                elif js[i] == '}':
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            i += 1
+        else:
+            i += 1
+    return i
+
+
+def skip_regex(js: str, i: int) -> int:
+    """Index just past the /.../flags regex literal starting at js[i]."""
+    i += 1
+    in_class = False
+    while i < len(js) and js[i] != '\n':
+        if js[i] == '\\':
+            i += 2
+            continue
+        if js[i] == '[':
+            in_class = True
+        elif js[i] == ']':
+            in_class = False
+        elif js[i] == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(js) and (js[i].isalnum() or js[i] == '_'):
+        i += 1
+    return i
+
+
+def minify_js(js: str) -> str:
+    """Drop comments and indentation; keep line breaks that ASI may need."""
+    out = []
+    pending = ''  # Whitespace seen since the last token: '', ' ' or '\n'
+    last_word = ''
+    i = 0
+
+    def emit(token: str):
+        nonlocal pending
+        if pending and out:
+            previous, following = out[-1][-1], token[0]
+            if pending == '\n' and (previous in NEWLINE_AFTER or following in NEWLINE_BEFORE):
+                pending = ''
+            elif pending == ' ' and (previous in JS_SEPARATORS or following in JS_SEPARATORS):
+                pending = ''
+            if pending:
+                out.append(pending)
+        pending = ''
+        out.append(token)
+
+    while i < len(js):
+        char = js[i]
+        if char in ' \t\r\n\f\v':
+            end = i
+            while end < len(js) and js[end] in ' \t\r\n\f\v':
+                end += 1
+            if '\n' in js[i:end] or pending == '\n':
+                pending = '\n'
+            else:
+                pending = pending or ' '
+            i = end
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = len(js) if end == -1 else end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            end = len(js) if end == -1 else end + 2
+            if js.startswith('/*!', i):
+                emit(js[i:end])
+            elif '\n' in js[i:end]:
+                pending = '\n'
+            else:
+                pending = pending or ' '
+            i = end
+        elif char in '"\'':
+            end = skip_js_string(js, i)
+            emit(js[i:end])
+            last_word = ''
+            i = end
+        elif char == '`':
+            end = skip_template(js, i)
+            emit(js[i:end])
+            last_word = ''
+            i = end
+        elif char == '/' and (not out or last_word in REGEX_KEYWORDS
+                              or (not last_word and out[-1][-1] in REGEX_PRECEDERS)):
+            end = skip_regex(js, i)
+            emit(js[i:end])
+            last_word = ''
+            i = end
+        elif char.isalnum() or char in '_$':
+            end = i
+            while end < len(js) and (js[end].isalnum() or js[end] in '_$'):
+                end += 1
+            emit(js[i:end])
+            last_word = js[i:end]
+            i = end
+        else:
+            emit(char)
+            last_word = ''
+            i += 1
+
+    return ''.join(out)
+
+
+# --- HTML ---
+
+# Tags around which whitespace never renders (with the site's CSS); list items
+# and table cells are left out since inline-block lists do show it
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'base', 'script', 'style', 'noscript',
+    'div', 'p', 'main', 'header', 'footer', 'nav', 'section', 'article', 'aside',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'dl', 'table', 'thead', 'tbody',
+    'tfoot', 'tr', 'form', 'fieldset', 'figure', 'figcaption', 'blockquote', 'hr', 'br',
+    'address', 'details', 'summary', 'dialog', 'template', 'picture', 'source', 'svg'
+}
+
+QUOTED = r'(?:[^>"\']|"[^"]*"|\'[^\']*\')*'
+HTML_TOKEN = re.compile(
+    r'(?P<comment><!--[\s\S]*?-->)'
+    r'|(?P<raw><(?P<raw_tag>pre|textarea|script|style)\b' + QUOTED + r'>)'
+    r'|(?P<tag></?[a-zA-Z][\w:-]*' + QUOTED + r'>|<!' + QUOTED + r'>)',
+    re.IGNORECASE
+)
+TAG_NAME = re.compile(r'</?([a-zA-Z][\w:-]*)')
+TAG_SPACE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+SCRIPT_TYPE = re.compile(r'\stype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+JSON_TYPES = {'application/ld+json', 'application/json', 'importmap'}
+JS_TYPES = {'', 'text/javascript', 'application/javascript', 'module'}
+
+
+def minify_tag(tag: str) -> str:
+    """Collapse whitespace between attributes; values are left alone."""
+    tag = TAG_SPACE.sub(lambda m: m.group(1) or ' ', tag)
+    return re.sub(r'\s+>$', '>', tag)
+
+
+def minify_json(text: str) -> str:
+    """Compact JSON for an inline <script>; unparseable JSON is only trimmed."""
+    try:
+        compact = json.dumps(json.loads(text), separators=(',', ':'), ensure_ascii=False)
+    except ValueError:
+        return text.strip()
+    return compact.replace('</', '<\\/')
+
+
+def minify_raw(tag_name: str, open_tag: str, content: str) -> str:
+    """Content of <pre>, <textarea>, <script> and <style>."""
+    if tag_name == 'style':
+        return minify_css(content)
+    if tag_name == 'script' and content.strip():
+        match = SCRIPT_TYPE.search(open_tag)
+        script_type = match.group(1).lower() if match else ''
+        if script_type in JSON_TYPES:
+            return minify_json(content)
+        if script_type in JS_TYPES:
+            return minify_js(content)
+    return content
+
+
+def is_block(token: str) -> bool:
+    """True if whitespace next to this token never renders."""
+    if token is None or token.startswith('<!'):
+        return True
+    match = TAG_NAME.match(token)
+    return bool(match) and match.group(1).lower() in BLOCK_TAGS
+
+
+def minify_html(html: str) -> str:
+    """Minify a page: see the module docstring for what is kept."""
+    pieces = []  # (kind, text): kind 'text' or 'tag'
+    i = 0
+    while i < len(html):
+        match = HTML_TOKEN.search(html, i)
+        if not match:
+            pieces.append(('text', html[i:]))
+            break
+        if match.start() > i:
+            pieces.append(('text', html[i:match.start()]))
+
+        if match.group('comment'):
+            if match.group('comment').startswith('<!--[if'):
+                pieces.append(('tag', match.group('comment')))
+            i = match.end()
+        elif match.group('raw'):
+            tag_name = match.group('raw_tag').lower()
+            close = re.compile(r'</' + tag_name + r'\s*>', re.IGNORECASE).search(html, match.end())
+            content_end = close.start() if close else len(html)
+            open_tag = minify_tag(match.group('raw'))
+            content = minify_raw(tag_name, open_tag, html[match.end():content_end])
+            closing = close.group(0) if close else ''
+            pieces.append(('tag', open_tag + content + closing))
+            i = close.end() if close else len(html)
+        else:
+            pieces.append(('tag', minify_tag(match.group('tag'))))
+            i = match.end()
+
+    # Merge text runs split by removed comments
+    merged = []
+    for kind, text in pieces:
+        if kind == 'text' and merged and merged[-1][0] == 'text':
+            merged[-1] = ('text', merged[-1][1] + text)
+        else:
+            merged.append((kind, text))
+
+    out = []
+    for n, (kind, text) in enumerate(merged):
+        if kind == 'tag':
+            out.append(text)
+            continue
+        text = re.sub(r'\s+', ' ', text)
+        before = merged[n - 1][1] if n > 0 else None
+        after = merged[n + 1][1] if n + 1 < len(merged) else None
+        if is_block(before):
+            text = text.lstrip()
+        if is_block(after):
+            text = text.rstrip()
+        out.append(text)
+    return ''.join(out)
+
+
+MINIFIERS = {'.html': minify_html, '.htm': minify_html, '.css': minify_css, '.js': minify_js, '.mjs': minify_js}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Minify an HTML, CSS or JS file'
+    )
+    parser.add_argument('input', type=Path, help='File to minify')
+    parser.add_argument('--output', '-o', type=Path, default=None,
+                       help='Write here instead of printing')
+
+    args = parser.parse_args()
+
+    minifier = MINIFIERS.get(args.input.suffix.lower())
+    if not minifier:
+        print(f"ERROR: Don't know how to minify {args.input.suffix or args.input.name} files")
+        sys.exit(1)
+    if not args.input.exists():
+        print(f"ERROR: File not found: {args.input}")
+        sys.exit(1)
+
+    minified = minifier(args.input.read_text(encoding='utf-8'))
+    if args.output:
+        args.output.write_text(minified, encoding='utf-8')
+    else:
+        sys.stdout.write(minified)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,27 +2,120 @@
 """
 Image Optimizer Tool
 
-Resizes and compresses images for web use.
+Resizes and compresses images for web use, and encodes WebP/AVIF copies
+that are kept when they beat the original format (for <picture>). PNGs are
+analyzed and written as a palette PNG, a lossless PNG or a JPEG, whichever
+is smallest while still looking the same. Every image is normalized first
+(EXIF orientation applied, colour profile converted to sRGB, metadata
+dropped), here and in resize_logos.py.
 
 Usage:
     python tools/optimize_images.py input.jpg
     python tools/optimize_images.py input.png --max-width 800 --quality 85
     python tools/optimize_images.py input.jpg --output ./images/
+    python tools/optimize_images.py images/screenshots/ images/profile/ --jobs 4
+    python tools/optimize_images.py 'assets/originals/*.jpeg' --output ./images/profile/
+    python tools/optimize_images.py images/screenshots/ --no-cache
+    python tools/optimize_images.py images/screenshots/ --widths 480,768,1200
+    python tools/optimize_images.py images/profile/sacha-delcourt.jpg --densities 1,2 --display-width 80
+    python tools/optimize_images.py images/screenshots/ --no-modern
+    python tools/optimize_images.py images/screenshots/ --target-ssim 0.985
+    python tools/optimize_images.py images/profile/ --max-bytes 100KB
+    python tools/optimize_images.py images/logos/raw/ --no-dither
 
 Requirements:
     pip install Pillow
+    pip install pillow-avif-plugin  # Optional: AVIF on Pillow builds without it
+    pip install numpy               # Optional: needed for --target-ssim
 """
 
 import argparse
+import glob
+import io
+import json
+import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from manifest import PROJECT_ROOT, BuildCache, manifest_key
+
 try:
-    from PIL import Image
+    import PIL
+    from PIL import Image, ImageOps
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
+try:
+    from PIL import ImageCms
+    IMAGECMS_AVAILABLE = True
+except ImportError:
+    IMAGECMS_AVAILABLE = False  # Pillow built without LittleCMS: profiles are kept, not converted
+
+try:
+    import pillow_avif  # noqa: F401 - registers AVIF on older Pillow builds
+except ImportError:
+    pass
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: no peak RSS reporting
+
+SUPPORTED_FORMATS = ['.jpg', '.jpeg', '.png', '.webp', '.gif']
+
+# Modern formats tried alongside the original, in <picture> preference order
+MODERN_FORMATS = {'.avif': 'image/avif', '.webp': 'image/webp'}
+
+# Image manifest: src/srcset/<picture> sources per source image. Written
+# next to the outputs (--output, else images/); not deployed by build.py
+MANIFEST_NAME = 'image-manifest.json'
+IMAGE_MANIFEST = PROJECT_ROOT / 'images' / MANIFEST_NAME
+
+# Quality search (--target-ssim / --max-bytes)
+QUALITY_RANGE = (30, 95)  # Lowest and highest quality the search will pick
+SEARCHABLE_FORMATS = ['.jpg', '.jpeg', '.webp']  # Lossy outputs with a quality knob
+# SSIM as in Wang et al. (2004): 11x11 Gaussian window, sigma 1.5, at full
+# resolution, on Y, Cb and Cr combined 6:1:1 so chroma damage counts too
+SSIM_WINDOW = 11
+SSIM_SIGMA = 1.5
+SSIM_WEIGHTS = (6, 1, 1)
+
+# Encoder settings beyond quality, per lossy format. AVIF speed 6 is about
+# 6x faster than 4 for ~8% more bytes, which matters once quality is searched
+ENCODER_OPTIONS = {'.webp': {'method': 6}, '.avif': {'speed': 6}}
+
+# PNG analysis
+MAX_COUNTED_COLORS = 65536  # Colour counts stop here ("more than")
+QUANTIZE_MAX_COLORS = 2048  # Above this (photos, screenshots) no lossy palette is tried
+PNG_MIN_SSIM = 0.99  # A lossy PNG encoding must score this (colour and alpha) to count as equivalent
+
+# Responsive image sets
+VARIANT_NAME = re.compile(r'-\d+w$')  # Stem of a generated variant, e.g. "hero-768w"
+
+# Downscaling: JPEGs are decoded at the smallest 1/2, 1/4 or 1/8 scale
+# (in the DCT domain) that is still at least the target size, so peak
+# memory follows the output size rather than the source; reduce() +
+# LANCZOS then finish the job (at 3x the reduce step is indistinguishable
+# from a full resample).
+DRAFT_GAP = 1.0
+REDUCING_GAP = 3.0
+
+# Normalization
+ORIENTATION_TAG = 0x0112  # EXIF Orientation
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)  # Orientations that swap width and height
+ESSENTIAL_INFO = ('transparency', 'background', 'duration', 'loop')  # Info kept on output
+
 
 def check_pillow():
     """Check if Pillow is installed."""
@@ -40,10 +133,9 @@ def get_output_path(input_path: Path, output_dir: Path, suffix: str = '') -> Pat
     stem = input_path.stem
     ext = input_path.suffix.lower()
 
-    # Convert PNG to JPG if not transparent
-    if ext == '.png':
-        ext = '.png'  # Keep PNG for now, could add transparency detection
-    elif ext in ['.jpeg', '.jpg']:
+    # PNGs keep their extension here: optimize_image() may still write a
+    # JPEG once it has looked at the pixels (see choose_png_encoding)
+    if ext in ['.jpeg', '.jpg']:
         ext = '.jpg'
 
     if suffix:
@@ -51,36 +143,90 @@ def get_output_path(input_path: Path, output_dir: Path, suffix: str = '') -> Pat
     return output_dir / f"{stem}_optimized{ext}"
 
 
-def optimize_image(
-    input_path: Path,
-    output_path: Path,
-    max_width: int = 1200,
-    max_height: int = None,
-    quality: int = 85
-) -> dict:
+def reset_peak_rss():
+    """Start a new peak-memory measurement (Linux; elsewhere peaks only grow)."""
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+    except OSError:
+        pass
+
+
+def peak_rss() -> int:
+    """Peak resident memory of this process in bytes, since reset_peak_rss() on Linux."""
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # macOS reports bytes, Linux KB
+
+
+def display_size(img) -> tuple:
+    """(width, height) as displayed, i.e. after EXIF orientation."""
+    if img.getexif().get(ORIENTATION_TAG, 1) in ROTATED_ORIENTATIONS:
+        return img.height, img.width
+    return img.size
+
+
+def metadata_bytes(img) -> int:
+    """Bytes of metadata in an opened image: EXIF (with thumbnail), XMP, ICC, comments, PNG text."""
+    return sum(
+        len(value) for key, value in img.info.items()
+        if key not in ESSENTIAL_INFO and isinstance(value, (bytes, str))
+    )
+
+
+def normalize_image(img) -> tuple:
     """
-    Optimize an image for web use.
+    First stage for every image (optimize_images.py and resize_logos.py).
 
-    Returns dict with stats about the optimization.
+    Applies the EXIF orientation, converts pixels with an embedded non-sRGB
+    colour profile to sRGB, and drops all metadata outputs don't need (only
+    ESSENTIAL_INFO survives, so no EXIF, XMP, ICC or text is written).
+    Returns (image, report) where report has 'metadata_bytes' removed,
+    'orientation' and the converted 'profile' description (or None).
     """
-    check_pillow()
+    removed = metadata_bytes(img)
+    orientation = img.getexif().get(ORIENTATION_TAG, 1)
+    if orientation != 1:
+        img = ImageOps.exif_transpose(img)
 
-    # Open image
-    img = Image.open(input_path)
-    original_size = input_path.stat().st_size
-    original_dimensions = img.size
+    converted = None
+    profile = img.info.get('icc_profile')
+    keep_profile = False
+    if profile and IMAGECMS_AVAILABLE:
+        try:
+            source = ImageCms.ImageCmsProfile(io.BytesIO(profile))
+            description = ImageCms.getProfileDescription(source).strip()
+            if 'srgb' not in description.lower():
+                if img.mode not in ('RGB', 'RGBA', 'CMYK'):
+                    img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+                img = ImageCms.profileToProfile(
+                    img, source, ImageCms.createProfile('sRGB'),
+                    outputMode='RGBA' if img.mode == 'RGBA' else 'RGB'
+                )
+                converted = description
+        except (ImageCms.PyCMSError, OSError, ValueError):
+            keep_profile = True  # Unreadable profile: keep it rather than shift colours
+    elif profile:
+        keep_profile = True
 
-    # Convert RGBA to RGB for JPEG (remove alpha channel)
-    if img.mode == 'RGBA' and output_path.suffix.lower() in ['.jpg', '.jpeg']:
-        # Create white background
-        background = Image.new('RGB', img.size, (255, 255, 255))
-        background.paste(img, mask=img.split()[3])  # 3 is the alpha channel
-        img = background
-    elif img.mode != 'RGB' and output_path.suffix.lower() in ['.jpg', '.jpeg']:
-        img = img.convert('RGB')
+    info = {key: img.info[key] for key in ESSENTIAL_INFO if key in img.info}
+    if keep_profile:
+        info['icc_profile'] = profile
+        removed -= len(profile)
+    img.info = info
+
+    return img, {'metadata_bytes': removed, 'orientation': orientation, 'profile': converted}
 
-    # Calculate new dimensions maintaining aspect ratio
-    width, height = img.size
+
+def fit_size(size: tuple, max_width: int = None, max_height: int = None) -> tuple:
+    """Largest (width, height) within the limits, keeping the aspect ratio."""
+    width, height = size
 
     if max_width and width > max_width:
         ratio = max_width / width
@@ -92,19 +238,395 @@ def optimize_image(
         height = max_height
         width = int(width * ratio)
 
-    # Resize if needed
-    if (width, height) != img.size:
-        img = img.resize((width, height), Image.Resampling.LANCZOS)
+    return width, height
 
-    # Save optimized image
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if output_path.suffix.lower() in ['.jpg', '.jpeg']:
-        img.save(output_path, 'JPEG', quality=quality, optimize=True)
-    elif output_path.suffix.lower() == '.png':
-        img.save(output_path, 'PNG', optimize=True)
+def draft_for(img, size: tuple):
+    """
+    Let a JPEG decode at reduced scale when only `size` is needed.
+
+    `size` is in display orientation (see display_size). Must be called
+    before the pixels are loaded; a no-op for other formats and when the
+    target is too close to the source size.
+    """
+    if img.format == 'JPEG' and size != display_size(img):
+        if display_size(img) != img.size:
+            size = size[::-1]  # Draft works on the stored, unrotated pixels
+        img.draft(None, (int(size[0] * DRAFT_GAP), int(size[1] * DRAFT_GAP)))
+    return img
+
+
+def downscale(img, size: tuple):
+    """Resize with reduce() first (cheap box reduction), then LANCZOS."""
+    if size == img.size:
+        return img
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def prepare_for_format(img, ext: str):
+    """Convert an image to a mode the output format can store."""
+    # Convert RGBA to RGB for JPEG (remove alpha channel)
+    if img.mode == 'RGBA' and ext in ['.jpg', '.jpeg']:
+        # Create white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])  # 3 is the alpha channel
+        img = background
+    elif img.mode != 'RGB' and ext in ['.jpg', '.jpeg']:
+        img = img.convert('RGB')
+    return img
+
+
+def encode_image(img, ext: str, quality: int = 85) -> bytes:
+    """Encode an image with the encoder settings for its format."""
+    buffer = io.BytesIO()
+    if ext in ['.jpg', '.jpeg']:
+        img.save(buffer, 'JPEG', quality=quality, optimize=True)
+    elif ext == '.png':
+        img.save(buffer, 'PNG', optimize=True)
     else:
-        img.save(output_path, quality=quality, optimize=True)
+        options = ENCODER_OPTIONS.get(ext, {'optimize': True})
+        img.save(buffer, Image.registered_extensions()[ext], quality=quality, **options)
+    return buffer.getvalue()
+
+
+def save_image(img, output_path: Path, quality: int = 85):
+    """Save an image with the encoder settings for its format."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(encode_image(img, output_path.suffix.lower(), quality))
+
+
+def metric_planes(img) -> list:
+    """Y, Cb and Cr planes of an image as float32, at full resolution."""
+    if img.mode not in ('RGB', 'YCbCr'):
+        img = img.convert('RGB')
+    return [np.asarray(plane, dtype=np.float32) for plane in img.convert('YCbCr').split()]
+
+
+def gaussian_mean(plane):
+    """Gaussian-weighted mean over every SSIM_WINDOW x SSIM_WINDOW window (separable)."""
+    offsets = np.arange(SSIM_WINDOW) - SSIM_WINDOW // 2
+    weights = np.exp(-offsets ** 2 / (2 * SSIM_SIGMA ** 2))
+    weights = (weights / weights.sum()).tolist()  # Python floats keep the planes float32
+    rows = plane.shape[0] - SSIM_WINDOW + 1
+    plane = sum(weight * plane[i:i + rows] for i, weight in enumerate(weights))
+    columns = plane.shape[1] - SSIM_WINDOW + 1
+    return sum(weight * plane[:, i:i + columns] for i, weight in enumerate(weights))
+
+
+def plane_ssim(reference, candidate) -> float:
+    """Mean SSIM of two same-sized planes (1.0 = identical)."""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    if min(reference.shape) < SSIM_WINDOW:
+        return 1.0 if np.array_equal(reference, candidate) else 0.0
+
+    mu_a, mu_b = gaussian_mean(reference), gaussian_mean(candidate)
+    var_a = gaussian_mean(reference * reference) - mu_a ** 2
+    var_b = gaussian_mean(candidate * candidate) - mu_b ** 2
+    covariance = gaussian_mean(reference * candidate) - mu_a * mu_b
+
+    score = ((2 * mu_a * mu_b + c1) * (2 * covariance + c2)) / (
+        (mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2)
+    )
+    return float(score.mean())
+
+
+def ssim(reference, candidate) -> float:
+    """SSIM of two images' metric_planes(), Y/Cb/Cr weighted by SSIM_WEIGHTS (1.0 = identical)."""
+    weights = SSIM_WEIGHTS if len(reference) == len(SSIM_WEIGHTS) else [1] * len(reference)
+    scores = [plane_ssim(a, b) for a, b in zip(reference, candidate)]
+    return sum(weight * score for weight, score in zip(weights, scores)) / sum(weights)
+
+
+def search_quality(img, ext: str, target_ssim: float = None, max_bytes: int = None, reference=None) -> dict:
+    """
+    Binary-search the encoder quality for one image.
+
+    With `target_ssim`, finds the lowest quality in QUALITY_RANGE whose
+    SSIM against `img` reaches the target. With `max_bytes`, the result
+    must also fit (the byte cap wins if both can't be met). Returns
+    {'quality', 'data', 'bytes', 'ssim', 'trials', 'met'}; 'ssim' is None
+    when numpy isn't available. `reference` is metric_planes(img), if
+    already computed.
+    """
+    lo, hi = QUALITY_RANGE
+    encoded = {}
+    scores = {}
+    if reference is None and NUMPY_AVAILABLE:
+        reference = metric_planes(img)
+
+    def encode(quality):
+        if quality not in encoded:
+            encoded[quality] = encode_image(img, ext, quality)
+        return encoded[quality]
+
+    def score(quality):
+        if quality not in scores:
+            scores[quality] = ssim(reference, metric_planes(Image.open(io.BytesIO(encode(quality)))))
+        return scores[quality]
+
+    def lowest(passes, low, high):
+        """Lowest quality in [low, high] that passes, or None (passes is monotonic)."""
+        found = None
+        while low <= high:
+            mid = (low + high) // 2
+            if passes(mid):
+                found, high = mid, mid - 1
+            else:
+                low = mid + 1
+        return found
+
+    met = True
+    quality = hi
+    if target_ssim is not None:
+        quality = lowest(lambda q: score(q) >= target_ssim, lo, hi)
+        if quality is None:
+            quality, met = hi, False
+
+    if max_bytes is not None and len(encode(quality)) > max_bytes:
+        # Highest quality that still fits: one below the lowest that doesn't
+        too_big = lowest(lambda q: len(encode(q)) > max_bytes, lo, quality)
+        quality = max(lo, too_big - 1)
+        met = len(encode(quality)) <= max_bytes and target_ssim is None
+
+    return {
+        'quality': quality,
+        'data': encode(quality),
+        'bytes': len(encode(quality)),
+        'ssim': round(score(quality), 5) if NUMPY_AVAILABLE else None,
+        'trials': len(encoded),
+        'met': met
+    }
+
+
+def save_searched(img, output_path: Path, quality: int, target_ssim: float = None, max_bytes: int = None) -> dict:
+    """
+    Save an image, searching for its quality when a target is set.
+
+    Returns the search stats ({} when quality was fixed or the format is
+    lossless); their 'quality' is what modern formats should use too.
+    """
+    if (target_ssim is None and max_bytes is None) or output_path.suffix.lower() not in SEARCHABLE_FORMATS:
+        save_image(img, output_path, quality)
+        return {}
+
+    result = search_quality(img, output_path.suffix.lower(), target_ssim, max_bytes)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(result.pop('data'))
+    return result
+
+
+def modern_formats() -> list:
+    """MODERN_FORMATS extensions this Pillow build can encode."""
+    extensions = Image.registered_extensions()
+    return [ext for ext in MODERN_FORMATS if extensions.get(ext) in Image.SAVE]
+
+
+def encode_alternatives(img, output_path: Path, quality: int = 85, formats: list = ()) -> list:
+    """
+    Encode `img` next to `output_path` in each modern format.
+
+    Lossy outputs (JPEG/WebP) are matched on visual quality, not on the
+    quality number: each format gets the lowest quality whose SSIM reaches
+    that of the written output (without numpy, the same quality setting
+    is used). Lossless ones (PNG) only get lossless WebP, since AVIF here
+    has no lossless mode. An encoding is kept only if it is smaller than
+    the original-format output; others are deleted. Returns
+    [{'type', 'path', 'bytes', 'quality'}], smallest first ('quality' is
+    None for lossless).
+    """
+    ext = output_path.suffix.lower()
+    if ext == '.gif':
+        return []  # Animation isn't carried over
+    lossless = ext == '.png'
+    original_bytes = output_path.stat().st_size
+
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+    reference = target = None
+    if not lossless and NUMPY_AVAILABLE:
+        reference = metric_planes(img)
+        with Image.open(output_path) as written:
+            target = ssim(reference, metric_planes(written))
+
+    kept = []
+    for alt_ext in formats:
+        alt_path = output_path.with_suffix(alt_ext)
+        if alt_ext == ext:
+            continue
+        if alt_ext == '.avif' and lossless:
+            alt_path.unlink(missing_ok=True)  # Drop a stale copy from an earlier lossy run
+            continue
+
+        alt_quality = None
+        if lossless:
+            img.save(alt_path, lossless=True, method=6)
+        elif target is not None:
+            search = search_quality(img, alt_ext, target, reference=reference)
+            if not search['met']:
+                alt_path.unlink(missing_ok=True)  # Can't look as good as the output at any quality
+                continue
+            alt_quality = search['quality']
+            alt_path.write_bytes(search['data'])
+        else:
+            alt_quality = quality
+            alt_path.write_bytes(encode_image(img, alt_ext, quality))
+
+        size = alt_path.stat().st_size
+        if size < original_bytes:
+            kept.append({'type': MODERN_FORMATS[alt_ext], 'path': manifest_key(alt_path),
+                         'bytes': size, 'quality': alt_quality})
+        else:
+            alt_path.unlink()
+
+    return sorted(kept, key=lambda alt: alt['bytes'])
+
+
+def analyze_png(img) -> dict:
+    """
+    Transparency and colour count of an image.
+
+    Both come from Pillow's C routines (alpha extrema, getcolors), so no
+    Python code runs per pixel. 'colors' is None above MAX_COUNTED_COLORS.
+    """
+    rgba = img.convert('RGBA')
+    colors = rgba.getcolors(maxcolors=MAX_COUNTED_COLORS)
+    return {
+        'transparent': rgba.getchannel('A').getextrema()[0] < 255,
+        'colors': len(colors) if colors else None
+    }
+
+
+def looks_equivalent(reference, candidate, transparent: bool) -> bool:
+    """
+    True if `candidate` is pixel-identical to `reference`, or (with numpy)
+    scores at least PNG_MIN_SSIM on the visible colours and on alpha.
+    """
+    mode = 'RGBA' if transparent else 'RGB'
+    reference, candidate = reference.convert(mode), candidate.convert(mode)
+    if reference.tobytes() == candidate.tobytes():
+        return True
+    if not NUMPY_AVAILABLE:
+        return False
+
+    if transparent:
+        # Compare what's visible (over white), then the alpha itself
+        background = Image.new('RGBA', reference.size, (255, 255, 255, 255))
+        alpha = [np.asarray(image.getchannel('A'), dtype=np.float32) for image in (reference, candidate)]
+        if plane_ssim(*alpha) < PNG_MIN_SSIM:
+            return False
+        reference = Image.alpha_composite(background, reference)
+        candidate = Image.alpha_composite(background, candidate)
+    return ssim(metric_planes(reference), metric_planes(candidate)) >= PNG_MIN_SSIM
+
+
+def choose_png_encoding(img, quality: int = 85, dither: bool = True) -> dict:
+    """
+    Pick the smallest equivalent encoding for an image bound for PNG.
+
+    Candidates: lossless PNG (always allowed), a palette PNG (exact when
+    there are at most 256 colours; quantized, with optional Floyd-Steinberg
+    dithering, only up to QUANTIZE_MAX_COLORS) and, for fully opaque
+    images, a JPEG.
+    Lossy candidates must pass looks_equivalent(). Returns the analysis
+    plus 'encoding' ('lossless', 'palette' or 'jpeg') and its 'data'.
+    """
+    analysis = analyze_png(img)
+    transparent = analysis['transparent']
+    base = img.convert('RGBA' if transparent else 'RGB')
+
+    colors = analysis['colors']
+    exact_palette = colors is not None and colors <= 256
+    candidates = [('lossless', encode_image(img, '.png'))]
+    if colors is not None and colors <= QUANTIZE_MAX_COLORS:
+        palette = base.quantize(
+            colors=colors if exact_palette else 256,
+            method=Image.Quantize.FASTOCTREE if transparent else Image.Quantize.MEDIANCUT,
+            dither=Image.Dither.FLOYDSTEINBERG if dither and not exact_palette else Image.Dither.NONE
+        )
+        candidates.append(('palette', encode_image(palette, '.png')))
+    if not transparent:
+        candidates.append(('jpeg', encode_image(base, '.jpg', quality)))
+
+    best = candidates[0]
+    for encoding, data in sorted(candidates[1:], key=lambda candidate: len(candidate[1])):
+        if len(data) < len(best[1]) and looks_equivalent(base, Image.open(io.BytesIO(data)), transparent):
+            best = (encoding, data)
+            break
+
+    return dict(analysis, encoding=best[0], data=best[1])
+
+
+def save_output(
+    img,
+    output_path: Path,
+    quality: int = 85,
+    target_ssim: float = None,
+    max_bytes: int = None,
+    dither: bool = True
+) -> tuple:
+    """
+    Save an optimized image; returns (path written, search stats, PNG analysis).
+
+    PNG outputs go through choose_png_encoding() and may be written as a
+    JPEG next to the PNG path. Other formats go through save_searched().
+    """
+    if output_path.suffix.lower() != '.png':
+        return output_path, save_searched(img, output_path, quality, target_ssim, max_bytes), {}
+
+    png = choose_png_encoding(img, quality, dither)
+    data = png.pop('data')
+    if png['encoding'] == 'jpeg':
+        output_path.unlink(missing_ok=True)  # Stale PNG output from an earlier run
+        output_path = output_path.with_suffix('.jpg')
+        search = save_searched(prepare_for_format(img, '.jpg'), output_path, quality, target_ssim, max_bytes)
+        return output_path, search, png
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(data)
+    return output_path, {}, png
+
+
+def optimize_image(
+    input_path: Path,
+    output_path: Path,
+    max_width: int = 1200,
+    max_height: int = None,
+    quality: int = 85,
+    formats: list = (),
+    target_ssim: float = None,
+    max_bytes: int = None,
+    dither: bool = True
+) -> dict:
+    """
+    Optimize an image for web use.
+
+    `formats` are modern formats to try as well (see encode_alternatives).
+    With `target_ssim` / `max_bytes`, the quality is searched per image
+    instead of using `quality` (see search_quality). PNGs may be written
+    as palette PNGs or JPEGs (see choose_png_encoding); 'output' is the
+    file actually written.
+    Returns dict with stats about the optimization.
+    """
+    check_pillow()
+
+    # Open image (header only: pixels are decoded after draft_for)
+    img = Image.open(input_path)
+    original_size = input_path.stat().st_size
+    original_dimensions = display_size(img)
+
+    # Calculate new dimensions maintaining aspect ratio
+    width, height = fit_size(original_dimensions, max_width, max_height)
+
+    # Decode large JPEGs at reduced scale, normalize, then resize if needed
+    img = draft_for(img, (width, height))
+    img, metadata = normalize_image(img)
+    img = prepare_for_format(img, output_path.suffix.lower())
+    img = downscale(img, (width, height))
+
+    # Save optimized image
+    output_path, search, png = save_output(img, output_path, quality, target_ssim, max_bytes, dither)
+    quality = search.get('quality', quality)
 
     new_size = output_path.stat().st_size
 
@@ -115,10 +637,299 @@ def optimize_image(
         'new_size': new_size,
         'original_dimensions': original_dimensions,
         'new_dimensions': (width, height),
-        'reduction': round((1 - new_size / original_size) * 100, 1)
+        'reduction': round((1 - new_size / original_size) * 100, 1),
+        'search': search,
+        'png': png,
+        'metadata': metadata,
+        'alternatives': encode_alternatives(img, output_path, quality, formats)
+    }
+
+
+def parse_ladder(widths: str = None, densities: str = None, display_width: int = None) -> list:
+    """
+    Turn --widths / --densities into [(pixel width, srcset descriptor)].
+
+    "480,768,1200" gives width descriptors for fluid images; densities
+    "1,2" with a display width of 80 gives 80px/1x and 160px/2x.
+    """
+    if widths:
+        return [(int(width), f'{int(width)}w') for width in widths.split(',')]
+    return [
+        (round(display_width * float(density)), f'{density.strip()}x')
+        for density in densities.split(',')
+    ]
+
+
+def generate_variants(
+    input_path: Path,
+    output_dir: Path,
+    ladder: list,
+    quality: int = 85,
+    formats: list = (),
+    target_ssim: float = None,
+    max_bytes: int = None,
+    dither: bool = True
+) -> dict:
+    """
+    Write one resized copy of an image per ladder step, from a single decode.
+
+    Variants are named "<stem>-<width>w<ext>". Images are never upscaled:
+    width steps beyond the source collapse into one source-width variant,
+    density steps beyond it are dropped (the 1x is kept at source width).
+    Each variant also gets its modern-format `alternatives`, its own
+    quality search when a target is set and, for PNGs, its own encoding
+    choice. Returns the image manifest entry.
+    """
+    check_pillow()
+
+    img = Image.open(input_path)
+    original_size = input_path.stat().st_size
+    original_dimensions = source_width, source_height = display_size(img)
+
+    # Decode once, only as large as the widest step needs; every variant is resized from this copy
+    widest = min(max(width for width, _ in ladder), source_width)
+    img = draft_for(img, (widest, max(1, round(source_height * widest / source_width))))
+    img, metadata = normalize_image(img)
+    img.load()
+
+    ext = get_output_path(input_path, output_dir).suffix
+    img = prepare_for_format(img, ext)
+
+    variants = []
+    for width, descriptor in sorted(ladder):
+        if width > source_width:
+            if descriptor.endswith('x') and variants:
+                continue
+            width = source_width
+        if descriptor.endswith('w'):
+            descriptor = f'{width}w'
+        if any(variant['width'] == width for variant in variants):
+            continue
+        height = max(1, round(source_height * width / source_width))
+
+        variant = downscale(img, (width, height))
+        output_path = output_dir / f"{input_path.stem}-{width}w{ext}"
+        output_path, search, png = save_output(variant, output_path, quality, target_ssim, max_bytes, dither)
+
+        variants.append({
+            'path': manifest_key(output_path),
+            'width': width,
+            'height': height,
+            'bytes': output_path.stat().st_size,
+            'descriptor': descriptor,
+            'search': search,
+            'png': png,
+            'alternatives': encode_alternatives(variant, output_path, search.get('quality', quality), formats)
+        })
+
+    # Fallback src: the 1x variant for fixed-size images, the widest otherwise
+    fallback = next((variant for variant in variants if variant['descriptor'] == '1x'), variants[-1])
+
+    return {
+        'input': str(input_path),
+        'source': manifest_key(input_path),
+        'original_size': original_size,
+        'original_dimensions': original_dimensions,
+        'new_size': sum(variant['bytes'] for variant in variants),
+        'src': fallback['path'],
+        'width': fallback['width'],
+        'height': fallback['height'],
+        'srcset': ', '.join(f"{variant['path']} {variant['descriptor']}" for variant in variants),
+        'metadata': metadata,
+        'variants': variants
     }
 
 
+def picture_sources(images: list) -> list:
+    """
+    <source> entries for a set of images (variants, or a single output).
+
+    A format is offered only if every image in the set was kept in it, so
+    a <source> never mixes formats. Smallest total first, which is the
+    order <picture> should list them in.
+    """
+    by_type = {}
+    for image in images:
+        for alt in image['alternatives']:
+            by_type.setdefault(alt['type'], []).append((image, alt))
+
+    sources = []
+    for mime, pairs in by_type.items():
+        if len(pairs) != len(images):
+            continue
+        sources.append({
+            'type': mime,
+            'srcset': ', '.join(
+                f"{alt['path']} {image['descriptor']}" if image.get('descriptor') else alt['path']
+                for image, alt in pairs
+            ),
+            'bytes': sum(alt['bytes'] for _, alt in pairs)
+        })
+    return sorted(sources, key=lambda source: source['bytes'])
+
+
+def written_files(stats: dict) -> list:
+    """Every file a result wrote (outputs, variants and alternatives), for the build cache."""
+    images = stats.get('variants', [stats])
+    files = [PROJECT_ROOT / variant['path'] for variant in stats.get('variants', [])]
+    if 'output' in stats:
+        files.append(Path(stats['output']))
+    for image in images:
+        files += [PROJECT_ROOT / alt['path'] for alt in image.get('alternatives', [])]
+    return files
+
+
+def write_image_manifest(results: list, path: Path = IMAGE_MANIFEST):
+    """Merge results into the JSON manifest pages take src/srcset/<source> from."""
+    manifest = {}
+    if path.exists():
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+
+    for entry in results:
+        if 'error' in entry:
+            continue
+        if 'variants' in entry:
+            manifest[entry['source']] = {
+                key: entry[key] for key in ('src', 'width', 'height', 'srcset', 'variants')
+            }
+            manifest[entry['source']]['sources'] = picture_sources(entry['variants'])
+        else:
+            width, height = entry['new_dimensions']
+            manifest[manifest_key(entry['input'])] = {
+                'src': manifest_key(entry['output']),
+                'width': width,
+                'height': height,
+                'sources': picture_sources([entry])
+            }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+
+def find_images(patterns: list, suffix: str = '') -> list:
+    """
+    Expand files, directories and glob patterns into supported image files.
+
+    Directories are searched recursively. Files that already carry the
+    output `suffix`, generated "-<width>w" variants and modern-format
+    copies of another image are skipped so re-running over a folder
+    doesn't optimize earlier outputs again.
+    """
+    images = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.rglob('*'))
+        elif glob.has_magic(str(pattern)):
+            matches = sorted(Path(match) for match in glob.glob(str(pattern), recursive=True))
+        else:
+            matches = [path]
+        for match in matches:
+            if match.suffix.lower() not in SUPPORTED_FORMATS or not match.is_file():
+                continue
+            if (suffix and match.stem.endswith(suffix)) or VARIANT_NAME.search(match.stem):
+                continue
+            if match.suffix.lower() in MODERN_FORMATS and any(
+                match.with_suffix(ext).exists() for ext in SUPPORTED_FORMATS if ext != match.suffix.lower()
+            ):
+                continue
+            if match not in images:
+                images.append(match)
+    return images
+
+
+def open_cache() -> BuildCache:
+    """Output cache for this tool (.tmp/optimize_images.json)."""
+    return BuildCache('optimize_images', sources=[__file__])
+
+
+def cache_key(cache: BuildCache, input_path: Path, output_path: Path, **options) -> str:
+    """Key an optimization by source content, settings, output format and tool version."""
+    return cache.key(
+        input_path,
+        format=output_path.suffix.lower(),
+        pillow=PIL.__version__,
+        **options
+    )
+
+
+def optimize_job(paths: tuple, ladder: list = None, **options) -> dict:
+    """
+    Optimize one (input, output) pair of a batch (runs in pool workers).
+
+    With a `ladder`, writes the responsive variants next to the output
+    instead. Adds 'seconds' and 'peak_rss' (bytes) for this image. Never
+    raises: a failure is returned as {'input', 'error'} so one bad file
+    doesn't stop the rest of the batch.
+    """
+    input_path, output_path = paths
+    reset_peak_rss()
+    start = time.perf_counter()
+    try:
+        if ladder:
+            stats = generate_variants(input_path, output_path.parent, ladder, **{
+                key: value for key, value in options.items() if key not in ('max_width', 'max_height')
+            })
+        else:
+            stats = optimize_image(input_path, output_path, **options)
+    except Exception as e:
+        return {'input': str(input_path), 'error': str(e), 'seconds': time.perf_counter() - start}
+    stats['seconds'] = time.perf_counter() - start
+    stats['peak_rss'] = peak_rss()
+    return stats
+
+
+def optimize_batch(
+    inputs: list,
+    output_dir: Path = None,
+    suffix: str = '_optimized',
+    jobs: int = None,
+    cache: BuildCache = None,
+    ladder: list = None,
+    **options
+) -> list:
+    """
+    Optimize many images across a process pool; results follow input order.
+
+    With a `ladder`, each image becomes a responsive set (see
+    generate_variants). With a `cache`, images whose source, settings and
+    outputs are unchanged since they were last built are skipped and
+    reported as cached.
+    """
+    paths = [
+        (input_path, get_output_path(input_path, output_dir or input_path.parent, suffix))
+        for input_path in inputs
+    ]
+
+    # Cache lookups and records stay in this process; workers only encode
+    results = {}
+    keys = {}
+    for input_path, output_path in paths:
+        if cache:
+            keys[output_path] = cache_key(cache, input_path, output_path, ladder=ladder, **options)
+            stored = cache.lookup(output_path, keys[output_path])
+            if stored is not None:
+                results[output_path] = dict(stored, cached=True, seconds=0.0)
+    pending = [pair for pair in paths if pair[1] not in results]
+
+    jobs = jobs or os.cpu_count() or 1
+    job = partial(optimize_job, ladder=ladder, **options)
+    if jobs <= 1 or len(pending) <= 1:
+        fresh = [job(pair) for pair in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            fresh = list(pool.map(job, pending))
+
+    for (input_path, output_path), stats in zip(pending, fresh):
+        if cache and 'error' not in stats:
+            cache.record(output_path, keys[output_path],
+                         {key: value for key, value in stats.items() if key not in ('seconds', 'peak_rss')},
+                         outputs=written_files(stats))
+        results[output_path] = stats
+
+    return [results[output_path] for _, output_path in paths]
+
+
 def format_size(bytes_size: int) -> str:
     """Format bytes to human readable string."""
     for unit in ['B', 'KB', 'MB']:
@@ -140,14 +951,174 @@ def print_results(stats: dict):
     print(f"  Optimized: {stats['new_dimensions'][0]}x{stats['new_dimensions'][1]} "
           f"({format_size(stats['new_size'])})")
     print(f"\n  Size reduction: {stats['reduction']}%")
+    if stats.get('search'):
+        print(f"  Searched: {format_search(stats['search'])}")
+    if stats.get('png'):
+        print(f"  {format_png(stats['png'])}")
+    if stats.get('metadata') and format_metadata(stats['metadata']):
+        print(f"  Normalized: {format_metadata(stats['metadata'])}")
+    for alt in stats.get('alternatives', []):
+        print(f"  {alt['type']}: {format_size(alt['bytes'])} "
+              f"({(1 - alt['bytes'] / stats['new_size']) * 100:.0f}% smaller) - {alt['path']}")
+    if 'seconds' in stats:
+        print(f"\n  Cost: {format_cost(stats)}")
     print('='*50)
 
 
+def format_cost(stats: dict) -> str:
+    """Time and peak memory spent on one image."""
+    if stats.get('cached'):
+        return 'cached'
+    rss = format_size(stats['peak_rss']) if stats.get('peak_rss') else 'n/a'
+    return f"{stats['seconds'] * 1000:.0f} ms, peak RSS {rss}"
+
+
+def format_search(search: dict) -> str:
+    """One-line summary of a quality search."""
+    metric = f", SSIM {search['ssim']:.4f}" if search['ssim'] is not None else ''
+    status = '' if search['met'] else ' - target missed'
+    return f"quality {search['quality']}{metric} ({search['trials']} trials){status}"
+
+
+def format_metadata(metadata: dict) -> str:
+    """One-line summary of what normalization changed, or '' if nothing."""
+    changes = []
+    if metadata['metadata_bytes']:
+        changes.append(f"metadata -{format_size(metadata['metadata_bytes'])}")
+    if metadata['orientation'] != 1:
+        changes.append(f"EXIF orientation {metadata['orientation']} applied")
+    if metadata['profile']:
+        changes.append(f"{metadata['profile']} -> sRGB")
+    return ', '.join(changes)
+
+
+def format_png(png: dict) -> str:
+    """One-line summary of a PNG encoding choice."""
+    colors = png['colors'] if png['colors'] is not None else f">{MAX_COUNTED_COLORS}"
+    transparency = ', transparent' if png['transparent'] else ''
+    return f"PNG as {png['encoding']} ({colors} colors{transparency})"
+
+
+def parse_size(value: str) -> int:
+    """Byte count from '150000', '150KB' or '1.5MB'."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KM]?)B?\s*', value.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    return int(float(match.group(1)) * {'': 1, 'K': 1024, 'M': 1024 ** 2}[match.group(2)])
+
+
+def format_alternatives(alternatives: list) -> str:
+    """One-line summary of the modern-format copies that were kept."""
+    return ', '.join(
+        f"{alt['type'].split('/')[1]} {format_size(alt['bytes'])}"
+        + (f" q{alt['quality']}" if alt.get('quality') else '')
+        for alt in alternatives
+    )
+
+
+def print_batch_results(results: list, wall_time: float):
+    """Print an aggregated report for a batch run."""
+    done = [stats for stats in results if 'error' not in stats]
+    failed = [stats for stats in results if 'error' in stats]
+
+    print(f"\n{'='*70}")
+    print(f"IMAGE OPTIMIZATION RESULTS ({len(results)} files)")
+    print('='*70)
+    for stats in results:
+        name = Path(stats['input']).name
+        if 'error' in stats:
+            print(f"  [FAIL]  {name}")
+            print(f"          {stats['error']}")
+            continue
+        width, height = stats['new_dimensions']
+        print(f"  [OK]    {name[:28]:28} {width:>5}x{height:<5} "
+              f"{format_size(stats['original_size']):>9} -> {format_size(stats['new_size']):>9} "
+              f"({stats['reduction']:>5}%)")
+        print(f"          {format_cost(stats)}")
+        if stats.get('search'):
+            print(f"          {format_search(stats['search'])}")
+        if stats.get('png'):
+            print(f"          {format_png(stats['png'])}")
+        if stats.get('metadata') and format_metadata(stats['metadata']):
+            print(f"          {format_metadata(stats['metadata'])}")
+        if stats.get('alternatives'):
+            print(f"          {format_alternatives(stats['alternatives'])}")
+
+    original = sum(stats['original_size'] for stats in done)
+    optimized = sum(stats['new_size'] for stats in done)
+
+    print(f"\n{'='*70}")
+    print("SUMMARY")
+    print('='*70)
+    cached = sum(1 for stats in done if stats.get('cached'))
+    print(f"  Optimized: {len(done)} ({cached} cached, {len(done) - cached} rebuilt)")
+    print(f"  Failed: {len(failed)}")
+    print(f"  Total: {format_size(original)} -> {format_size(optimized)} "
+          f"(saved {format_size(original - optimized)})")
+    best = sum(min([stats['new_size']] + [alt['bytes'] for alt in stats.get('alternatives', [])])
+               for stats in done)
+    print(f"  Best format per image: {format_size(best)}")
+    stripped = sum(stats['metadata']['metadata_bytes'] for stats in done if 'metadata' in stats)
+    print(f"  Metadata removed: {format_size(stripped)}")
+    print(f"  Wall time: {wall_time:.2f}s "
+          f"({sum(stats['seconds'] for stats in results):.2f}s of work)")
+    print_peak_rss(results)
+    print('='*70)
+
+
+def print_peak_rss(results: list):
+    """Summary line for the most memory-hungry image of a run."""
+    measured = [stats for stats in results if stats.get('peak_rss')]
+    if measured:
+        worst = max(measured, key=lambda stats: stats['peak_rss'])
+        print(f"  Peak RSS: {format_size(worst['peak_rss'])} ({Path(worst['input']).name})")
+
+
+def print_variant_results(results: list, wall_time: float):
+    """Print the responsive sets generated by a batch run."""
+    done = [entry for entry in results if 'error' not in entry]
+
+    print(f"\n{'='*70}")
+    print(f"RESPONSIVE IMAGE SETS ({len(results)} files)")
+    print('='*70)
+    for entry in results:
+        name = Path(entry['input']).name
+        if 'error' in entry:
+            print(f"  [FAIL]  {name}")
+            print(f"          {entry['error']}")
+            continue
+        width, height = entry['original_dimensions']
+        print(f"  [OK]    {name} ({width}x{height}, {format_size(entry['original_size'])}) - {format_cost(entry)}")
+        if entry.get('metadata') and format_metadata(entry['metadata']):
+            print(f"          {format_metadata(entry['metadata'])}")
+        for variant in entry['variants']:
+            alternatives = variant.get('alternatives')
+            print(f"          {variant['descriptor']:>6}  {variant['width']:>5}x{variant['height']:<5} "
+                  f"{format_size(variant['bytes']):>9}  {Path(variant['path']).name}"
+                  + (f"  ({format_alternatives(alternatives)})" if alternatives else ''))
+            if variant.get('search'):
+                print(f"                  {format_search(variant['search'])}")
+            if variant.get('png'):
+                print(f"                  {format_png(variant['png'])}")
+
+    cached = sum(1 for entry in done if entry.get('cached'))
+    print(f"\n{'='*70}")
+    print("SUMMARY")
+    print('='*70)
+    print(f"  Sets: {len(done)} ({cached} cached, {len(done) - cached} rebuilt)")
+    print(f"  Failed: {len(results) - len(done)}")
+    print(f"  Variants: {sum(len(entry['variants']) for entry in done)}")
+    print(f"  Wall time: {wall_time:.2f}s")
+    print_peak_rss(results)
+    print('='*70)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Optimize images for web use'
     )
-    parser.add_argument('input', type=Path, help='Input image file')
+    parser.add_argument('inputs', nargs='+', metavar='input',
+                       help='Input image files, directories or glob patterns')
     parser.add_argument('--output', '-o', type=Path, default=None,
                        help='Output directory (default: same as input)')
     parser.add_argument('--max-width', '-w', type=int, default=1200,
@@ -156,17 +1127,102 @@ def main():
                        help='Maximum height in pixels')
     parser.add_argument('--quality', '-q', type=int, default=85,
                        help='JPEG quality 1-100 (default: 85)')
+    parser.add_argument('--target-ssim', type=float, default=None,
+                       help='Search per image for the lowest quality reaching this SSIM, e.g. 0.985 (needs numpy)')
+    parser.add_argument('--max-bytes', type=parse_size, default=None,
+                       help='Search per image for the highest quality fitting this size, e.g. 150KB')
+    parser.add_argument('--dither', action=argparse.BooleanOptionalAction, default=True,
+                       help='Dither PNGs quantized to a palette (default: on)')
     parser.add_argument('--suffix', '-s', type=str, default='_optimized',
                        help='Suffix for output filename (default: _optimized)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Worker processes for batches (default: CPU count)')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=True,
+                       help='Skip images whose source, settings and output are unchanged (default: on)')
+    parser.add_argument('--widths', type=str, default=None,
+                       help='Responsive set for fluid images, e.g. 480,768,1200 (srcset w descriptors)')
+    parser.add_argument('--densities', type=str, default=None,
+                       help='Responsive set for fixed-size images, e.g. 1,2 (needs --display-width)')
+    parser.add_argument('--display-width', type=int, default=None,
+                       help='CSS width of a fixed-size image, for --densities')
+    parser.add_argument('--modern', action=argparse.BooleanOptionalAction, default=True,
+                       help='Also encode WebP/AVIF, keeping them where smaller (default: on)')
+    parser.add_argument('--manifest', type=Path, default=None,
+                       help=f'Image manifest to update (default: {MANIFEST_NAME} in --output, '
+                            f'else {IMAGE_MANIFEST.relative_to(PROJECT_ROOT)})')
 
     args = parser.parse_args()
+    args.manifest = args.manifest or (args.output / MANIFEST_NAME if args.output else IMAGE_MANIFEST)
+
+    if args.widths and args.densities:
+        parser.error('use either --widths or --densities, not both')
+    if args.densities and not args.display_width:
+        parser.error('--densities needs --display-width')
+    if args.target_ssim is not None and not NUMPY_AVAILABLE:
+        parser.error('--target-ssim needs numpy (pip install numpy)')
+    if args.target_ssim is not None and not 0 < args.target_ssim <= 1:
+        parser.error('--target-ssim must be between 0 and 1')
+    ladder = None
+    if args.widths or args.densities:
+        try:
+            ladder = parse_ladder(args.widths, args.densities, args.display_width)
+        except ValueError:
+            parser.error('--widths/--densities take comma-separated numbers')
+
+    check_pillow()
+    formats = modern_formats() if args.modern else []
+    if args.modern and '.avif' not in formats:
+        print("\nNote: this Pillow build can't write AVIF; only WebP will be tried.")
+        print("Install with: pip install pillow-avif-plugin")
+
+    # Batches: directories, globs, several files or a responsive set
+    if ladder or len(args.inputs) > 1 or Path(args.inputs[0]).is_dir() or glob.has_magic(args.inputs[0]):
+        inputs = find_images(args.inputs, args.suffix)
+        if not inputs:
+            print(f"ERROR: No supported images found in: {' '.join(args.inputs)}")
+            sys.exit(1)
+
+        print(f"\nOptimizing {len(inputs)} image(s)...")
+
+        cache = open_cache() if args.cache else None
+
+        start = time.perf_counter()
+        results = optimize_batch(
+            inputs,
+            output_dir=args.output,
+            suffix=args.suffix,
+            jobs=args.jobs,
+            cache=cache,
+            ladder=ladder,
+            max_width=args.max_width,
+            max_height=args.max_height,
+            quality=args.quality,
+            formats=formats,
+            target_ssim=args.target_ssim,
+            max_bytes=args.max_bytes,
+            dither=args.dither
+        )
+        if cache:
+            cache.save()
+
+        write_image_manifest(results, args.manifest)
+        if ladder:
+            print_variant_results(results, time.perf_counter() - start)
+        else:
+            print_batch_results(results, time.perf_counter() - start)
+        print(f"\nManifest: {args.manifest}")
+
+        # One bad file doesn't stop the batch, but still fails the run
+        sys.exit(1 if any('error' in stats for stats in results) else 0)
+
+    args.input = Path(args.inputs[0])
 
     # Validate input
     if not args.input.exists():
         print(f"ERROR: Input file not found: {args.input}")
         sys.exit(1)
 
-    if not args.input.suffix.lower() in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
+    if not args.input.suffix.lower() in SUPPORTED_FORMATS:
         print(f"ERROR: Unsupported image format: {args.input.suffix}")
         print("Supported formats: JPG, PNG, WebP, GIF")
         sys.exit(1)
@@ -177,14 +1233,34 @@ def main():
 
     print(f"\nOptimizing: {args.input}")
 
+    options = {
+        'max_width': args.max_width,
+        'max_height': args.max_height,
+        'quality': args.quality,
+        'formats': formats,
+        'target_ssim': args.target_ssim,
+        'max_bytes': args.max_bytes,
+        'dither': args.dither
+    }
+    cache = open_cache() if args.cache else None
+    key = cache_key(cache, args.input, output_path, **options) if cache else None
+
+    stats = cache.lookup(output_path, key) if cache else None
+    if stats is not None:
+        print_results(stats)
+        print("\nUp to date (cached) - use --no-cache to rebuild.")
+        return
+
     try:
-        stats = optimize_image(
-            args.input,
-            output_path,
-            max_width=args.max_width,
-            max_height=args.max_height,
-            quality=args.quality
-        )
+        reset_peak_rss()
+        start = time.perf_counter()
+        stats = optimize_image(args.input, output_path, **options)
+        if cache:
+            cache.record(output_path, key, stats, outputs=written_files(stats))
+            cache.save()
+        stats['seconds'] = time.perf_counter() - start
+        stats['peak_rss'] = peak_rss()
+        write_image_manifest([stats], args.manifest)
         print_results(stats)
         print("\nSuccess!")
 
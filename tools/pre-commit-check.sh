@@ -25,34 +25,36 @@ cd "$PROJECT_ROOT"
 # Track if any checks fail
 CHECKS_FAILED=0
 
-# Check 1: Validate main HTML file
-echo "📄 Validating index.html..."
-if python3 tools/validate_html.py index.html; then
-    echo "✓ index.html passed validation"
+# As a git hook, only re-check staged pages (and pages depending on staged files);
+# with nothing staged (manual runs, CI) check everything
+CHANGED_ONLY=""
+if ! git diff --cached --quiet 2>/dev/null; then
+    CHANGED_ONLY="--changed-only"
+fi
+
+# Check 0: Shared header/footer blocks match partials/
+echo "🧩 Checking shared blocks against partials/..."
+if python3 tools/generate_pages.py --check > /dev/null; then
+    echo "✓ Pages match their partials"
 else
-    echo "✗ index.html validation failed"
+    echo "✗ Pages out of date with partials/ (run: python3 tools/generate_pages.py)"
     CHECKS_FAILED=1
 fi
 echo ""
 
-# Check 2: Validate project detail pages
-echo "📄 Validating project pages..."
-for file in projects/*.html; do
-    if [ -f "$file" ]; then
-        echo "  Checking $(basename $file)..."
-        if python3 tools/validate_html.py "$file" > /dev/null 2>&1; then
-            echo "  ✓ $(basename $file) passed"
-        else
-            echo "  ✗ $(basename $file) failed validation"
-            CHECKS_FAILED=1
-        fi
-    fi
-done
+# Check 1+2: Validate every page and check local links/anchors (one process, one parse per page)
+echo "📄 Validating pages and local links..."
+if python3 tools/check_site.py --no-external $CHANGED_ONLY; then
+    echo "✓ All pages passed validation"
+else
+    echo "✗ Page validation failed"
+    CHECKS_FAILED=1
+fi
 echo ""
 
-# Check 3: Check for broken links (soft check - many sites block automated requests)
-echo "🔗 Checking links..."
-if python3 tools/check_links.py index.html > /dev/null 2>&1; then
+# Check 3: Check external links (soft check - many sites block automated requests)
+echo "🔗 Checking external links..."
+if python3 tools/check_links.py index.html projects/*.html services/*.html privacy-policy.html --crawl > /dev/null 2>&1; then
     echo "✓ All links valid"
 else
     echo "⚠️  Warning: Some external links may be inaccessible (LinkedIn, Google Fonts often block automated checks)"
@@ -60,7 +62,17 @@ else
 fi
 echo ""
 
-# Check 4: Check for large unoptimized images
+# Check 4: Page weight budgets (tools/budgets.json)
+echo "⚖️  Checking page weight budgets..."
+if python3 tools/check_budget.py > /dev/null; then
+    echo "✓ All pages within budget"
+else
+    echo "✗ Pages over budget (run: python3 tools/check_budget.py)"
+    CHECKS_FAILED=1
+fi
+echo ""
+
+# Check 5: Check for large unoptimized images
 echo "🖼️  Checking for large images..."
 LARGE_IMAGES=$(find images -type f \( -name "*.jpg" -o -name "*.jpeg" -o -name "*.png" \) -size +500k 2>/dev/null || true)
 if [ -n "$LARGE_IMAGES" ]; then
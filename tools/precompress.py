@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Asset Precompressor
+
+Writes .gz and .br siblings (style.css -> style.css.gz, style.css.br) for
+every compressible site file, at maximum level, so the host can serve
+them as-is instead of compressing on the fly (nginx gzip_static /
+brotli_static, Caddy `precompressed`, Apache rewrite rules).
+
+- gzip level 9; brotli quality 11 (needs `pip install brotli`)
+- Files are compressed in parallel across a process pool
+- Unchanged files are skipped (content-hash cache in .tmp/precompress.json)
+- A sibling is only written if it saves at least --min-saving percent;
+  otherwise any stale sibling is removed
+- Prints a per-file ratio table
+
+Usage:
+    python tools/precompress.py                  # Whole site
+    python tools/precompress.py index.html style.css
+    python tools/precompress.py --min-saving 20 --no-brotli
+
+Requirements (optional, for .br):
+    pip install brotli
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+from manifest import PROJECT_ROOT, BuildCache, manifest_key
+from optimize_images import format_size
+
+# Files worth compressing (images other than SVG/ICO are already compressed)
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.mjs', '.svg', '.json', '.xml', '.txt', '.webmanifest', '.map'}
+COMPRESSIBLE_EXTENSIONS = TEXT_EXTENSIONS | {'.ico'}
+
+# Not deployed (build.py leaves them out of dist/ too)
+EXCLUDED_DIRS = {'.git', '.github', '.tmp', '.vscode', 'dist', 'partials', 'tools', 'workflows', '__pycache__'}
+
+MIN_SAVING = 10  # Percent a sibling must save over the original to be written
+
+
+def compress_gzip(data: bytes, text: bool) -> bytes:
+    # mtime=0 keeps output identical across runs for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data: bytes, text: bool) -> bytes:
+    return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT if text else brotli.MODE_GENERIC)
+
+
+COMPRESSORS = {'.gz': compress_gzip, '.br': compress_brotli}
+
+
+def find_assets(inputs: list) -> list:
+    """
+    Compressible files among the inputs (files or directories).
+
+    Directories are walked recursively, skipping hidden directories and,
+    at the top of the walk, EXCLUDED_DIRS (images/tools/ is part of the site).
+    """
+    assets = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                top = Path(root) == path
+                dirs[:] = sorted(d for d in dirs if not (top and d in EXCLUDED_DIRS) and not d.startswith('.'))
+                assets += [Path(root) / name for name in sorted(files)
+                           if Path(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS]
+        elif path.suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+            assets.append(path)
+
+    unique = []
+    for path in assets:
+        if path not in unique:
+            unique.append(path)
+    return unique
+
+
+def compress_job(path: Path, formats: list = (), min_saving: float = MIN_SAVING) -> dict:
+    """
+    Compress one file into each format (runs in pool workers).
+
+    Returns {'input', 'original_size', 'outputs': {ext: {'bytes', 'path', 'kept'}}}.
+    Never raises: a failure is returned as {'input', 'error'}.
+    """
+    try:
+        data = path.read_bytes()
+        text = path.suffix.lower() in TEXT_EXTENSIONS
+        stats = {'input': manifest_key(path), 'original_size': len(data), 'outputs': {}}
+        for ext in formats:
+            compressed = COMPRESSORS[ext](data, text)
+            target = path.with_name(path.name + ext)
+            kept = len(compressed) <= len(data) * (1 - min_saving / 100)
+            if kept:
+                target.write_bytes(compressed)
+            else:
+                target.unlink(missing_ok=True)  # Stale sibling from an earlier run
+            stats['outputs'][ext] = {'bytes': len(compressed), 'path': manifest_key(target), 'kept': kept}
+    except OSError as e:
+        return {'input': manifest_key(path), 'error': str(e)}
+    return stats
+
+
+def written_files(stats: dict) -> list:
+    """Siblings a result wrote (for the build cache)."""
+    return [PROJECT_ROOT / output['path'] for output in stats['outputs'].values() if output['kept']]
+
+
+def precompress_batch(
+    paths: list,
+    formats: list,
+    min_saving: float = MIN_SAVING,
+    jobs: int = None,
+    cache: BuildCache = None
+) -> list:
+    """
+    Compress many files across a process pool; results follow input order.
+
+    With a `cache`, files whose content, settings and siblings are
+    unchanged since the last run are skipped and reported as cached.
+    """
+    results = {}
+    keys = {}
+    for path in paths:
+        if cache:
+            keys[path] = cache.key(path, formats=formats, min_saving=min_saving,
+                                   brotli=brotli.__version__ if BROTLI_AVAILABLE else None)
+            stored = cache.lookup(path, keys[path])
+            if stored is not None:
+                results[path] = dict(stored, cached=True)
+    pending = [path for path in paths if path not in results]
+
+    jobs = jobs or os.cpu_count() or 1
+    job = partial(compress_job, formats=formats, min_saving=min_saving)
+    if jobs <= 1 or len(pending) <= 1:
+        fresh = [job(path) for path in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            fresh = list(pool.map(job, pending))
+
+    for path, stats in zip(pending, fresh):
+        if cache and 'error' not in stats:
+            cache.record(path, keys[path], stats, outputs=written_files(stats) or [path])
+        results[path] = stats
+
+    return [results[path] for path in paths]
+
+
+def format_output(output: dict, original_size: int) -> str:
+    """Table cell: compressed size and ratio, starred if not written."""
+    if output is None:
+        return f"{'-':>16}"
+    ratio = output['bytes'] / original_size if original_size else 1
+    mark = ' ' if output['kept'] else '*'
+    return f"{format_size(output['bytes']):>10} {ratio:>4.0%}{mark}"
+
+
+def print_results(results: list, formats: list, min_saving: float, wall_time: float):
+    """Print the per-file ratio table and totals."""
+    done = [stats for stats in results if 'error' not in stats]
+    failed = [stats for stats in results if 'error' in stats]
+    cached = sum(1 for stats in done if stats.get('cached'))
+
+    print(f"\n{'='*60}")
+    print(f"PRECOMPRESSION ({len(results)} files, {cached} cached)")
+    print('='*60)
+    header = ''.join(f"{ext:>17}" for ext in formats)
+    print(f"  {'File':36} {'Original':>10}{header}")
+    for stats in done:
+        cells = ''.join(' ' + format_output(stats['outputs'].get(ext), stats['original_size']) for ext in formats)
+        name = stats['input'] if len(stats['input']) <= 36 else '...' + stats['input'][-33:]
+        print(f"  {name:36} {format_size(stats['original_size']):>10}{cells}")
+
+    for stats in failed:
+        print(f"  [ERROR] {stats['input']}: {stats['error']}")
+
+    # What a client is sent: the sibling if written, the original otherwise
+    original = sum(stats['original_size'] for stats in done)
+    print(f"\n  Total: {format_size(original)} original")
+    for ext in formats:
+        served = sum(
+            stats['outputs'][ext]['bytes'] if stats['outputs'][ext]['kept'] else stats['original_size']
+            for stats in done
+        )
+        written = sum(1 for stats in done if stats['outputs'][ext]['kept'])
+        print(f"         {format_size(served)} served as {ext} ({served / original:.0%}, "
+              f"{written} written)" if original else f"         {ext}: nothing to compress")
+    print(f"  * not written: saves less than {min_saving:g}%")
+    print(f"  Time: {wall_time:.1f}s")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write .gz and .br siblings for compressible site files'
+    )
+    parser.add_argument('inputs', nargs='*', metavar='input',
+                       help='Files or directories (default: the whole site)')
+    parser.add_argument('--gzip', action=argparse.BooleanOptionalAction, default=True,
+                       help='Write .gz siblings (default: on)')
+    parser.add_argument('--brotli', action=argparse.BooleanOptionalAction, default=True,
+                       help='Write .br siblings (default: on, needs the brotli package)')
+    parser.add_argument('--min-saving', type=float, default=MIN_SAVING,
+                       help=f'Only write a sibling that saves at least this percent (default: {MIN_SAVING})')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                       help='Parallel worker processes (default: CPU count)')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=True,
+                       help='Skip files unchanged since the last run (default: on)')
+
+    args = parser.parse_args()
+
+    formats = []
+    if args.gzip:
+        formats.append('.gz')
+    if args.brotli:
+        if BROTLI_AVAILABLE:
+            formats.append('.br')
+        else:
+            print("[WARN] brotli not installed: writing .gz only (pip install brotli)")
+    if not formats:
+        parser.error('nothing to write: both --no-gzip and --no-brotli given')
+
+    paths = find_assets(args.inputs or [PROJECT_ROOT])
+    if not paths:
+        print(f"ERROR: No compressible files found in: {' '.join(args.inputs)}")
+        sys.exit(1)
+
+    cache = BuildCache('precompress', sources=[__file__]) if args.cache else None
+
+    start = time.perf_counter()
+    results = precompress_batch(paths, formats, args.min_saving, args.jobs, cache)
+    wall_time = time.perf_counter() - start
+
+    if cache:
+        cache.save()
+
+    print_results(results, formats, args.min_saving, wall_time)
+    sys.exit(1 if any('error' in stats for stats in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
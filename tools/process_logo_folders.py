@@ -2,24 +2,37 @@
 """
 Extract logos from nested folders and organize them.
 
-Prioritizes:
+Picks the best file in each company folder by real quality:
 1. SVG files (vector, best quality)
-2. PNG files (raster, good for complex logos)
-3. WebP/AVIF (modern formats)
+2. The raster with the most pixels (PNG, WebP, AVIF, JPEG)
+3. Format priority breaks ties: PNG > WebP > AVIF > JPEG
 
 Outputs to images/logos/ with clean, lowercase names.
+- The source folder is listed once; files are hashed and copied in parallel
+- Outputs that already have the same content are not copied again
+- The same logo under several company names is written for each name and reported
 """
 
-import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from manifest import hash_file
+
 SOURCE_DIR = Path("images/logos/raw/Logos tools")
 OUTPUT_DIR = Path("images/logos")
 
-# Format priority: SVG > PNG > WebP > AVIF
-FORMAT_PRIORITY = ['.svg', '.png', '.webp', '.avif']
+# Format priority: SVG > PNG > WebP > AVIF > JPEG (rasters are ranked by pixels first)
+FORMAT_PRIORITY = ['.svg', '.png', '.webp', '.avif', '.jpg', '.jpeg']
+
+JOBS = 8  # Threads for hashing and copying (I/O bound)
 
 def clean_filename(name: str) -> str:
     """Convert company name to clean lowercase filename."""
@@ -33,26 +46,74 @@ def clean_filename(name: str) -> str:
         name = name.replace('--', '-')
     return name.strip('-')
 
-def find_best_logo(folder_path: Path) -> Optional[Path]:
-    """Find the best quality logo in a folder (prefer SVG)."""
-    if not folder_path.is_dir():
+def logo_quality(path: Path) -> tuple:
+    """
+    Sort key for a logo file: any vector beats any raster, then more pixels,
+    then FORMAT_PRIORITY. Without Pillow, rasters are ranked by format only.
+    """
+    suffix = path.suffix.lower()
+    priority = -FORMAT_PRIORITY.index(suffix)
+    if suffix == '.svg':
+        return (1, 0, priority)
+
+    pixels = 0
+    if PIL_AVAILABLE:
+        try:
+            with Image.open(path) as img:  # Only reads the header
+                pixels = img.width * img.height
+        except (OSError, ValueError, Image.DecompressionBombError):
+            pass  # Unreadable: rank below every readable raster
+    return (0, pixels, priority)
+
+def find_best_logo(candidates: list) -> Optional[Path]:
+    """Find the best quality logo among candidate files (prefer SVG)."""
+    if not candidates:
         return None
-
-    # Get all image files in the folder
-    logo_files = {}
-    for ext in FORMAT_PRIORITY:
-        matches = list(folder_path.glob(f"*{ext}"))
-        if matches:
-            logo_files[ext] = matches[0]  # Take first match
-
-    # Return highest priority format available
-    for ext in FORMAT_PRIORITY:
-        if ext in logo_files:
-            return logo_files[ext]
-
-    return None
-
-def process_logos():
+    return max(sorted(candidates), key=logo_quality)
+
+def scan_sources(source_dir: Path) -> tuple:
+    """
+    List the source folder once. Each company folder and each loose file
+    becomes a (name, candidate files) group.
+
+    Returns (groups, names of folders without logos).
+    """
+    groups = []
+    empty = []
+    for item in sorted(source_dir.iterdir()):
+        if item.is_dir():
+            candidates = [f for f in item.iterdir()
+                          if f.is_file() and f.suffix.lower() in FORMAT_PRIORITY]
+            if candidates:
+                groups.append((item.name, candidates))
+            else:
+                empty.append(item.name)
+        elif item.suffix.lower() in FORMAT_PRIORITY:
+            groups.append((item.stem, [item]))
+    return groups, empty
+
+def inspect_logo(group: tuple) -> dict:
+    """Pick and hash the best file of a (name, candidates) group."""
+    name, candidates = group
+    best = find_best_logo(candidates)
+    suffix = best.suffix.lower()
+    return {
+        'name': name,
+        'source': best,
+        'format': suffix,
+        'hash': hash_file(best),
+        'size': best.stat().st_size / 1024,  # KB
+        'output': OUTPUT_DIR / f"{clean_filename(name)}{suffix}"
+    }
+
+def copy_logo(logo: dict) -> bool:
+    """Copy a logo unless its output already has the same content. Returns True if copied."""
+    if hash_file(logo['output']) == logo['hash']:
+        return False
+    shutil.copy2(logo['source'], logo['output'])
+    return True
+
+def process_logos(jobs: int = JOBS):
     """Extract and organize logos from nested folders."""
 
     if not SOURCE_DIR.exists():
@@ -61,54 +122,50 @@ def process_logos():
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    processed = []
-    skipped = []
-
-    # Process company folders
-    for item in sorted(SOURCE_DIR.iterdir()):
-        if item.is_dir():
-            company_name = item.name
-            best_logo = find_best_logo(item)
-
-            if best_logo:
-                # Create clean output filename
-                clean_name = clean_filename(company_name)
-                output_file = OUTPUT_DIR / f"{clean_name}{best_logo.suffix}"
-
-                # Copy logo
-                shutil.copy2(best_logo, output_file)
-
-                file_size = output_file.stat().st_size / 1024  # KB
-                processed.append({
-                    'name': company_name,
-                    'format': best_logo.suffix,
-                    'size': file_size,
-                    'output': output_file.name
-                })
+    groups, skipped = scan_sources(SOURCE_DIR)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        logos = list(pool.map(inspect_logo, groups))
+
+        # One copy per output name; the same logo under another name is still
+        # written for that name, so pages can reference it, and reported
+        by_hash = {}
+        by_output = {}
+        processed = []
+        duplicates = []
+        clashes = []
+        for logo in logos:
+            if logo['output'] in by_output:
+                if by_output[logo['output']]['hash'] != logo['hash']:
+                    clashes.append((logo, by_output[logo['output']]))
+                continue
+            if logo['hash'] in by_hash:
+                duplicates.append((logo, by_hash[logo['hash']]))
             else:
-                skipped.append(company_name)
-
-    # Also process loose files in the root
-    for item in SOURCE_DIR.iterdir():
-        if item.is_file() and item.suffix.lower() in ['.svg', '.png', '.jpg', '.webp', '.avif']:
-            clean_name = clean_filename(item.stem)
-            output_file = OUTPUT_DIR / f"{clean_name}{item.suffix}"
-            shutil.copy2(item, output_file)
-
-            file_size = output_file.stat().st_size / 1024
-            processed.append({
-                'name': item.stem,
-                'format': item.suffix,
-                'size': file_size,
-                'output': output_file.name
-            })
+                by_hash[logo['hash']] = logo
+            by_output[logo['output']] = logo
+            processed.append(logo)
+
+        copied = list(pool.map(copy_logo, processed))
 
     # Print summary
-    print(f"🎨 Processed {len(processed)} logos:\n")
+    print(f"🎨 Processed {len(processed)} logos ({sum(copied)} copied, "
+          f"{len(copied) - sum(copied)} unchanged):\n")
 
-    for logo in processed:
+    for logo, was_copied in zip(processed, copied):
         format_emoji = "📄" if logo['format'] == '.svg' else "🖼️"
-        print(f"  {format_emoji} {logo['name']:20} → {logo['output']:30} ({logo['size']:.1f}KB)")
+        status = "" if was_copied else " unchanged"
+        print(f"  {format_emoji} {logo['name']:20} → {logo['output'].name:30} ({logo['size']:.1f}KB){status}")
+
+    if duplicates:
+        print(f"\n♻️  {len(duplicates)} duplicate logos (identical content, written under each name):")
+        for logo, original in duplicates:
+            print(f"  - {logo['output'].name} is the same logo as {original['output'].name}")
+
+    if clashes:
+        print(f"\n⚠️  {len(clashes)} logos not copied (output name already used by a different logo):")
+        for logo, original in clashes:
+            print(f"  - {logo['name']} ({logo['source'].name}) → {logo['output'].name} is {original['name']}")
 
     if skipped:
         print(f"\n⚠️  Skipped {len(skipped)} folders (no logos found):")
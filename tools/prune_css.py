@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Unused CSS Pruner
+
+Writes a copy of a stylesheet without the rules no page can match.
+
+What counts as used (across every page, parsed once through html_engine):
+- element names, classes, ids and attribute names in the HTML
+- classes and attributes the pages' scripts add at runtime
+  (classList.add/toggle/..., className =, setAttribute)
+- anything in the safelist (tools/css_safelist.json)
+
+A selector is kept unless it names a class, id, element or attribute that
+is never used. Combinators aren't checked, and arguments of pseudo-classes
+such as :not() / :has() are ignored, so the result errs on the side of
+keeping rules. Selector lists are trimmed to their used selectors, empty
+@media/@supports blocks are dropped, and @keyframes no kept rule animates
+with are removed. Kept rules keep their comments and formatting, so the
+savings reported are the unused CSS itself (minify.py handles the rest).
+
+Usage:
+    python tools/prune_css.py                        # style.css -> style.pruned.css
+    python tools/prune_css.py --dry-run --verbose    # Report only, list every removed rule
+    python tools/prune_css.py --css style.css --output dist/style.css index.html projects/*.html
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from check_links import categorize_link, resolve_internal
+from check_site import DEFAULT_PAGES, default_pages
+from html_engine import Analyzer, find_html_files, parse_document
+from manifest import PROJECT_ROOT, manifest_key
+from optimize_images import format_size
+
+DEFAULT_CSS = PROJECT_ROOT / 'style.css'
+SAFELIST_FILE = Path(__file__).parent / 'css_safelist.json'
+SAFELIST_KEYS = ['classes', 'ids', 'elements', 'attributes', 'patterns']
+
+# At-rules whose blocks hold style rules (pruned inside); others are kept whole
+GROUPING_AT_RULES = {'media', 'supports', 'layer', 'container', 'document'}
+
+# Comments (except /*! ones) with strings skipped, so '/*' inside a string survives
+COMMENT = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*(?!!)[\s\S]*?\*/')
+
+# Selector parts
+IDENT = r'(?:\\.|[\w-])+'
+ATTRIBUTE_SELECTOR = re.compile(r'\[\s*(' + IDENT + r')[^\]]*\]')
+PSEUDO = re.compile(r'::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?')
+CLASS_OR_ID = re.compile(r'([.#])(' + IDENT + ')')
+ELEMENT = re.compile(r'(?<![\w\\-])([a-zA-Z][\w-]*)')
+
+# Runtime changes in scripts
+CLASS_LIST_CALL = re.compile(r'classList\.(?:add|remove|toggle|replace|contains)\(([^)]*)\)')
+CLASS_NAME_SET = re.compile(r'className\s*\+?=\s*([\'"`])(.*?)\1')
+SET_ATTRIBUTE = re.compile(r'setAttribute\(\s*([\'"])([\w-]+)\1\s*,\s*(?:([\'"])(.*?)\3)?')
+STRING_LITERAL = re.compile(r'([\'"])(.*?)\1')
+
+
+class SelectorIndex(Analyzer):
+    """Element names, classes, ids and attribute names used by pages."""
+
+    def __init__(self):
+        self.elements = set()
+        self.classes = set()
+        self.ids = set()
+        self.attributes = set()
+        self.scripts = []  # Local script URLs, relative to the page being replayed
+
+    def handle_starttag(self, tag, attrs):
+        self.elements.add(tag.lower())
+        for name, value in attrs:
+            self.attributes.add(name.lower())
+            if name == 'class' and value:
+                self.classes.update(value.split())
+            elif name == 'id' and value:
+                self.ids.add(value)
+        src = dict(attrs).get('src')
+        if tag == 'script' and src and categorize_link(src) == 'internal':
+            self.scripts.append(src)
+
+    def add_script(self, source: str):
+        """Add what a script sets at runtime: classes and attribute names."""
+        for args in CLASS_LIST_CALL.findall(source):
+            for _, name in STRING_LITERAL.findall(args):
+                self.classes.update(name.split())
+        for _, names in CLASS_NAME_SET.findall(source):
+            self.classes.update(name for name in names.split() if '$' not in name)
+        for _, attribute, _, value in SET_ATTRIBUTE.findall(source):
+            self.attributes.add(attribute.lower())
+            if attribute == 'class':
+                self.classes.update(value.split())
+            elif attribute == 'id' and value:
+                self.ids.add(value)
+
+    def add_safelist(self, safelist: dict):
+        self.classes.update(safelist.get('classes', []))
+        self.ids.update(safelist.get('ids', []))
+        self.elements.update(name.lower() for name in safelist.get('elements', []))
+        self.attributes.update(name.lower() for name in safelist.get('attributes', []))
+
+
+def index_pages(pages: list, safelist: dict = None) -> tuple:
+    """Build the SelectorIndex for pages and their scripts; returns (index, scripts)."""
+    index = SelectorIndex()
+    scripts = []
+    for page in pages:
+        index.scripts = []
+        parse_document(page).replay(index)
+        for url in index.scripts:
+            script = resolve_internal(url, page)
+            if script not in scripts and script.is_file():
+                scripts.append(script)
+
+    for script in scripts:
+        index.add_script(script.read_text(encoding='utf-8', errors='replace'))
+    if safelist:
+        index.add_safelist(safelist)
+    return index, scripts
+
+
+def load_safelist(path: Path) -> dict:
+    """Read the safelist: {"classes": [...], "ids": [...], ..., "patterns": [regex, ...]}."""
+    if not path.exists():
+        return {}
+    safelist = json.loads(path.read_text(encoding='utf-8'))
+    for key in safelist:
+        if key not in SAFELIST_KEYS and not key.startswith('_'):
+            raise ValueError(f"Unknown safelist key '{key}' (expected one of: {', '.join(SAFELIST_KEYS)})")
+    safelist['patterns'] = [re.compile(pattern) for pattern in safelist.get('patterns', [])]
+    return safelist
+
+
+def unescape(name: str) -> str:
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def selector_used(selector: str, index: SelectorIndex, patterns: list = ()) -> bool:
+    """
+    False only if the selector needs a class, id, element or attribute
+    that no page (or script, or safelist entry) has.
+    """
+    if any(pattern.search(selector) for pattern in patterns):
+        return True
+
+    text = PSEUDO.sub(' ', selector)  # Before attributes: :not([x]) requires nothing
+    attributes = ATTRIBUTE_SELECTOR.findall(text)
+    text = ATTRIBUTE_SELECTOR.sub(' ', text)
+    if any(unescape(name).lower() not in index.attributes for name in attributes):
+        return False
+
+    for kind, name in CLASS_OR_ID.findall(text):
+        names = index.classes if kind == '.' else index.ids
+        if unescape(name) not in names:
+            return False
+
+    elements = ELEMENT.findall(CLASS_OR_ID.sub(' ', text))
+    return all(element.lower() in index.elements for element in elements)
+
+
+def skip_string(css: str, i: int) -> int:
+    """Index just past the string starting at css[i]."""
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def matching_brace(css: str, i: int) -> int:
+    """Index of the '}' closing the '{' at css[i]."""
+    depth = 0
+    while i < len(css):
+        if css[i] in '"\'':
+            i = skip_string(css, i)
+            continue
+        if css[i] == '{':
+            depth += 1
+        elif css[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def split_statements(css: str, start: int, end: int) -> list:
+    """
+    Top-level statements between start and end:
+    [(prelude, body start, body end, prelude offset)], body None for '@x ...;'.
+    """
+    statements = []
+    i = statement_start = start
+    while i < end:
+        char = css[i]
+        if char in '"\'':
+            i = skip_string(css, i)
+        elif char == '{':
+            close = matching_brace(css, i)
+            statements.append((css[statement_start:i], i + 1, close, statement_start))
+            i = statement_start = close + 1
+        elif char == ';':
+            statements.append((css[statement_start:i], None, None, statement_start))
+            i = statement_start = i + 1
+        else:
+            i += 1
+    return statements
+
+
+def split_selectors(prelude: str) -> list:
+    """Split a selector list on top-level commas."""
+    selectors, depth, current = [], 0, ''
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            selectors.append(current.strip())
+            current = ''
+        else:
+            current += char
+    selectors.append(current.strip())
+    return [selector for selector in selectors if selector]
+
+
+def prune_css(css: str, index: SelectorIndex, patterns: list = ()) -> dict:
+    """
+    Remove unused rules from a stylesheet. Everything kept (rules, comments,
+    formatting) is left as written; a removed rule takes the whitespace
+    before it along.
+
+    Returns {'css', 'rules', 'removed': [{'selector', 'line', 'bytes'}],
+    'trimmed', 'keyframes': [names removed], 'pruned_bytes'}, where
+    pruned_bytes counts the removed rules, selectors and @keyframes
+    themselves, without the whitespace between them.
+    """
+    original = css
+    # Blank out comments with spaces, keeping newlines, so offsets and line numbers still match
+    css = COMMENT.sub(lambda m: m.group(1) or re.sub(r'[^\n]', ' ', m.group(0)), css)
+    stats = {'rules': 0, 'removed': [], 'trimmed': 0}
+    edits = []  # (start, end, replacement) in the original text
+    keyframes = []  # (name, edit removing the block), applied if nothing uses the name
+
+    def line_of(offset: int) -> int:
+        return css.count('\n', 0, offset) + 1
+
+    def size(text: str) -> int:
+        return len(text.encode('utf-8'))
+
+    def cut(start: int, end: int, first: bool = False) -> tuple:
+        """Edit removing original[start:end] and the whitespace before it (after it, if first in its block)."""
+        if first:
+            while end < len(original) and original[end].isspace():
+                end += 1
+        else:
+            while start > 0 and original[start - 1].isspace():
+                start -= 1
+        return start, end, ''
+
+    def process(start: int, end: int) -> bool:
+        """Record the edits for statements between start and end; True if any is kept."""
+        kept = False  # Also: whether a kept statement precedes the current one
+        for prelude, body_start, body_end, offset in split_statements(css, start, end):
+            offset += len(prelude) - len(prelude.lstrip())
+            prelude = prelude.strip()
+            if not prelude:
+                continue
+            if body_start is None:
+                kept = True
+                continue
+
+            if prelude.startswith('@'):
+                name = re.match(r'@([\w-]+)', prelude).group(1).lower()
+                if name in GROUPING_AT_RULES:
+                    mark = len(edits)
+                    if process(body_start, body_end):
+                        kept = True
+                    else:
+                        del edits[mark:]
+                        edits.append(cut(offset, body_end + 1, not kept))
+                    continue
+                if name.endswith('keyframes'):
+                    keyframes.append((prelude.split(None, 1)[1].strip(), cut(offset, body_end + 1, not kept)))
+                kept = True
+                continue
+
+            stats['rules'] += 1
+            selectors = split_selectors(prelude)
+            used = [selector for selector in selectors if selector_used(selector, index, patterns)]
+            if not used:
+                edits.append(cut(offset, body_end + 1, not kept))
+                stats['removed'].append({'selector': ' '.join(prelude.split()), 'line': line_of(offset),
+                                         'bytes': size(original[offset:body_end + 1])})
+                continue
+            kept = True
+            if len(used) < len(selectors):
+                stats['trimmed'] += 1
+                edits.append((offset, offset + len(prelude), ', '.join(used)))
+        return kept
+
+    def apply(changes: list) -> str:
+        out, position = [], 0
+        for start, end, replacement in sorted(changes):
+            out += [original[position:start], replacement]
+            position = end
+        return ''.join(out) + original[position:]
+
+    process(0, len(css))
+
+    # Keyframes survive only if something kept (other than the @keyframes blocks) names them
+    used_text = apply(edits + [edit for _, edit in keyframes])
+    unused = [(name, edit) for name, edit in keyframes
+              if not re.search(r'(?<![\w-])' + re.escape(name) + r'(?![\w-])', used_text)]
+    stats['keyframes'] = [name for name, _ in unused]
+    edits += [edit for _, edit in unused]
+    stats['css'] = apply(edits)
+    stats['pruned_bytes'] = (
+        sum(rule['bytes'] for rule in stats['removed'])
+        + sum(size(original[start:end]) - size(replacement) for start, end, replacement in edits if replacement)
+        + sum(size(original[start:end].lstrip()) for _, (start, end, _) in unused)
+    )
+    return stats
+
+
+def print_results(results: dict, verbose: bool = False):
+    """Print what was removed and the bytes saved."""
+    removed = results['removed']
+
+    print(f"\n{'='*60}")
+    print(f"UNUSED CSS ({results['stylesheet']}, {results['pages']} pages, {results['scripts']} scripts)")
+    print('='*60)
+
+    shown = removed if verbose else removed[:15]
+    if shown:
+        print(f"\nREMOVED RULES ({len(removed)})")
+        print('-'*60)
+        for rule in shown:
+            print(f"  [line {rule['line']:>4}] {rule['selector'][:60]}")
+        if len(shown) < len(removed):
+            print(f"  ... {len(removed) - len(shown)} more (--verbose to list all)")
+    if results['keyframes']:
+        print(f"\n  Unused @keyframes removed: {', '.join(results['keyframes'])}")
+
+    saved = results['original_size'] - results['new_size']
+    print(f"\n{'='*60}")
+    print("SUMMARY")
+    print('='*60)
+    print(f"  Rules: {results['rules']} -> {results['rules'] - len(removed)} "
+          f"({len(removed)} removed, {results['trimmed']} selector lists trimmed)")
+    print(f"  Size:  {format_size(results['original_size'])} -> {format_size(results['new_size'])} "
+          f"(saved {format_size(saved)}, {saved / results['original_size']:.0%})")
+    print(f"         {format_size(results['pruned_bytes'])} of unused CSS, "
+          f"{format_size(saved - results['pruned_bytes'])} of whitespace around it")
+    print(f"  Time:  {results['seconds'] * 1000:.0f} ms")
+    if results.get('output'):
+        print(f"  Output: {results['output']}")
+    print('='*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write a stylesheet without the rules no page uses'
+    )
+    parser.add_argument('files', nargs='*', metavar='file',
+                       help=f"HTML pages, directories or globs (default: {' '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--css', type=Path, default=DEFAULT_CSS,
+                       help=f'Stylesheet to prune (default: {manifest_key(DEFAULT_CSS)})')
+    parser.add_argument('--output', '-o', type=Path, default=None,
+                       help='Pruned stylesheet (default: <name>.pruned.css next to the input)')
+    parser.add_argument('--safelist', type=Path, default=SAFELIST_FILE,
+                       help=f'Safelist config (default: {manifest_key(SAFELIST_FILE)})')
+    parser.add_argument('--dry-run', '-n', action='store_true',
+                       help='Report without writing the pruned stylesheet')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='List every removed rule')
+
+    args = parser.parse_args()
+
+    if not args.css.exists():
+        print(f"ERROR: File not found: {args.css}")
+        sys.exit(1)
+
+    try:
+        safelist = load_safelist(args.safelist)
+    except (OSError, ValueError, re.error) as e:
+        print(f"ERROR: Can't read safelist from {args.safelist}: {e}")
+        sys.exit(1)
+
+    pages = find_html_files(args.files) if args.files else default_pages()
+    for page in pages:
+        if not page.exists():
+            print(f"ERROR: File not found: {page}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    index, scripts = index_pages(pages, safelist)
+    original = args.css.read_text(encoding='utf-8')
+    results = prune_css(original, index, safelist.get('patterns', []))
+    seconds = time.perf_counter() - start
+
+    output = args.output or args.css.with_name(f'{args.css.stem}.pruned.css')
+    if not args.dry_run:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(results['css'], encoding='utf-8')
+
+    results.update({
+        'stylesheet': manifest_key(args.css),
+        'pages': len(pages),
+        'scripts': len(scripts),
+        'original_size': len(original.encode('utf-8')),
+        'new_size': len(results['css'].encode('utf-8')),
+        'seconds': seconds,
+        'output': None if args.dry_run else manifest_key(output)
+    })
+    print_results(results, args.verbose)
+
+
+if __name__ == '__main__':
+    main()
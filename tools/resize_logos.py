@@ -5,48 +5,78 @@ Logo Resizer and Optimizer
 Processes logos from images/logos/raw/ and outputs optimized versions to images/logos/
 - Resizes to consistent dimensions (max 120px height for PNG/JPG)
 - Optimizes file size
-- Preserves SVG files as-is (they're already vector)
+- Minifies SVG files (svg_optimizer.py) without changing how they render
 - Keeps originals in raw/ folder
+- Normalizes like optimize_images.py: EXIF orientation, sRGB, no metadata
+- Adds WebP/AVIF copies where smaller, listed in images/image-manifest.json
+- Skips logos whose source, settings and output are unchanged (cache in .tmp/)
 """
 
 import os
 import sys
+import time
 from pathlib import Path
+import xml.etree.ElementTree as ET
+import PIL
 from PIL import Image
 
+from manifest import BuildCache
+from svg_optimizer import optimize_bytes
+from optimize_images import (
+    IMAGE_MANIFEST, display_size, downscale, draft_for, encode_alternatives, format_cost,
+    format_metadata, modern_formats, normalize_image, peak_rss, reset_peak_rss, written_files,
+    write_image_manifest
+)
+
 # Configuration
 RAW_DIR = Path("images/logos/raw")
 OUTPUT_DIR = Path("images/logos")
 MAX_HEIGHT = 120  # Maximum height in pixels for raster images
 QUALITY = 85  # JPEG/PNG quality (1-100)
 
-def optimize_logo(input_path: Path, output_path: Path):
-    """Resize and optimize a logo image."""
+def optimize_logo(input_path: Path, output_path: Path, formats: list = ()):
+    """
+    Resize and optimize a logo image.
+
+    Returns the result for the image manifest (None on failure).
+    """
 
-    # Skip SVG files - they're already optimized vectors
+    # SVG files are vectors: minify instead of resizing
     if input_path.suffix.lower() == '.svg':
-        print(f"  📄 {input_path.name} → Copying SVG as-is")
-        output_path.write_bytes(input_path.read_bytes())
-        return
+        original = input_path.read_bytes()
+        try:
+            optimized = optimize_bytes(original)
+        except (ET.ParseError, ValueError) as e:
+            print(f"  📄 {input_path.name} → Copying SVG as-is (can't minify: {e})")
+            optimized = original
+        else:
+            print(f"  📄 {input_path.name}")
+            print(f"     Minified: {len(original) / 1024:.1f}KB → {len(optimized) / 1024:.1f}KB")
+        output_path.write_bytes(optimized)
+        return {'input': str(input_path), 'output': str(output_path)}
 
     try:
         # Open image
         img = Image.open(input_path)
 
-        # Get original dimensions
-        original_size = img.size
+        # Get original dimensions (as displayed, after EXIF orientation)
+        original_size = display_size(img)
         original_file_size = input_path.stat().st_size / 1024  # KB
 
         # Calculate new dimensions maintaining aspect ratio
-        if img.height > MAX_HEIGHT:
-            aspect_ratio = img.width / img.height
+        if original_size[1] > MAX_HEIGHT:
+            aspect_ratio = original_size[0] / original_size[1]
             new_height = MAX_HEIGHT
             new_width = int(MAX_HEIGHT * aspect_ratio)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            img, metadata = normalize_image(draft_for(img, (new_width, new_height)))
+            img = downscale(img, (new_width, new_height))
             print(f"  🔄 {input_path.name}")
             print(f"     Resized: {original_size[0]}x{original_size[1]} → {new_width}x{new_height}")
         else:
+            img, metadata = normalize_image(img)
             print(f"  ✓ {input_path.name} (already optimal size)")
+        if format_metadata(metadata):
+            print(f"     Normalized: {format_metadata(metadata)}")
 
         # Convert RGBA to RGB if saving as JPEG
         if output_path.suffix.lower() in ['.jpg', '.jpeg']:
@@ -74,8 +104,22 @@ def optimize_logo(input_path: Path, output_path: Path):
         reduction = ((original_file_size - new_file_size) / original_file_size) * 100
         print(f"     Size: {original_file_size:.1f}KB → {new_file_size:.1f}KB ({reduction:.0f}% reduction)")
 
+        # Modern formats, kept only where they beat the saved file
+        alternatives = encode_alternatives(img, output_path, QUALITY, formats)
+        for alt in alternatives:
+            print(f"     {alt['type']}: {alt['bytes'] / 1024:.1f}KB")
+
+        return {
+            'input': str(input_path),
+            'output': str(output_path),
+            'new_dimensions': img.size,
+            'metadata': metadata,
+            'alternatives': alternatives
+        }
+
     except Exception as e:
         print(f"  ❌ Error processing {input_path.name}: {e}")
+        return None
 
 def main():
     """Process all logos in the raw directory."""
@@ -98,12 +142,41 @@ def main():
 
     print(f"🎨 Processing {len(raw_files)} logo(s)...\n")
 
-    # Process each logo
+    # Process each logo, skipping ones already built from the same source and settings
+    formats = modern_formats()
+    cache = BuildCache('resize_logos', sources=[__file__])
+    results = []
     for raw_file in raw_files:
         output_file = OUTPUT_DIR / raw_file.name
-        optimize_logo(raw_file, output_file)
-
+        key = cache.key(
+            raw_file,
+            max_height=MAX_HEIGHT,
+            quality=QUALITY,
+            format=output_file.suffix.lower(),
+            formats=formats,
+            pillow=PIL.__version__
+        )
+        result = cache.lookup(output_file, key)
+        if result is not None:
+            print(f"  ✓ {raw_file.name} (cached)")
+        else:
+            reset_peak_rss()
+            start = time.perf_counter()
+            result = optimize_logo(raw_file, output_file, formats)
+            if result is None:
+                continue
+            print(f"     Cost: {format_cost({'seconds': time.perf_counter() - start, 'peak_rss': peak_rss()})}")
+            cache.record(output_file, key, result, outputs=written_files(result))
+        results.append(result)
+    cache.save()
+
+    # Raster logos can be served through <picture>; SVGs are used as-is
+    write_image_manifest([result for result in results if 'alternatives' in result])
+
+    stats = cache.stats()
     print(f"\n✅ Done! Optimized logos saved to {OUTPUT_DIR}/")
+    print(f"   {stats['cached']} cached, {stats['rebuilt']} rebuilt")
+    print(f"   <picture> sources listed in {IMAGE_MANIFEST}")
     print(f"   Original files remain in {RAW_DIR}/")
 
 if __name__ == "__main__":
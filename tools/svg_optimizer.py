@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+SVG Optimizer
+
+Minifies SVG logos exported from design tools without changing how they
+render. Pure Python (standard library only).
+
+- Drops comments, <metadata>, editor namespaces (Illustrator, Inkscape,
+  Sketch) and attributes browsers ignore (version, root x/y, enable-background)
+- Drops ids nothing references
+- Rounds path data and coordinates to --precision decimals. Each path
+  segment is written absolute or relative, whichever is shorter, measured
+  from the rounded previous point so rounding errors never accumulate
+- Unwraps <g> elements without attributes and removes empty containers
+- Shortens colors (#FFFFFF -> #fff) and collapses whitespace
+
+resize_logos.py runs every SVG logo through optimize_bytes().
+
+Usage:
+    python tools/svg_optimizer.py images/tools/
+    python tools/svg_optimizer.py images/tools/canva.svg --precision 2
+    python tools/svg_optimizer.py images/tools/ --dry-run
+"""
+
+import argparse
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+XML_NS = 'http://www.w3.org/XML/1998/namespace'
+KEPT_NAMESPACES = {SVG_NS, XLINK_NS, XML_NS}
+
+DEFAULT_PRECISION = 3  # Decimal places kept in coordinates
+
+# Attributes holding a single coordinate or length, rounded like path data
+COORDINATE_ATTRIBUTES = {
+    'x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry', 'fx', 'fy',
+    'width', 'height', 'stroke-width'
+}
+COLOR_ATTRIBUTES = {'fill', 'stroke', 'stop-color', 'color', 'flood-color', 'lighting-color'}
+DROPPED_ROOT_ATTRIBUTES = {'version', 'x', 'y', 'enable-background', 'data-name'}
+REMOVABLE_WHEN_EMPTY = {'g', 'defs', 'style'}
+TEXT_ELEMENTS = {'text', 'tspan', 'textPath'}
+
+# Path data: argument roles per command ('x'/'y' coordinate, 'n' plain
+# number, 'f' arc flag). The last x and y of a segment are its end point.
+PATH_ARGUMENTS = {
+    'M': 'xy', 'L': 'xy', 'T': 'xy', 'H': 'x', 'V': 'y',
+    'C': 'xyxyxy', 'S': 'xyxy', 'Q': 'xyxy', 'A': 'nnnffxy', 'Z': ''
+}
+NUMBER = re.compile(r'[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?')
+HEX_COLOR = re.compile(r'(?<![(\'"])#([0-9a-fA-F]{6})\b')  # Not url(#id)
+CSS_COLOR = re.compile(r'(:\s*)#([0-9a-fA-F]{6})\b')
+CSS_STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+# A ':' followed by ';', '}' or the end before any '{' is in a declaration, not a selector
+DECLARATION_COLON = re.compile(r'\s*:\s*(?=[^{};]*(?:[;}]|$))')
+ID_REFERENCE = re.compile(r'url\(\s*[\'"]?#([^\'")\s]+)|^#(.+)$')
+
+
+def local_name(name: str) -> tuple:
+    """Split '{namespace}name' into (namespace, name)."""
+    if name.startswith('{'):
+        namespace, _, name = name[1:].partition('}')
+        return namespace, name
+    return None, name
+
+
+def format_number(value: float, precision: int) -> str:
+    """Shortest text for a rounded number: 0.50 -> .5, -0.0 -> 0, 3.0 -> 3."""
+    text = f"{round(value, precision):.{precision}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def join_numbers(values: list) -> str:
+    """Join number strings with separators only where they are needed."""
+    text = ''
+    previous = None
+    for value in values:
+        if previous is not None and not (
+            value.startswith('-') or (value.startswith('.') and ('.' in previous or 'e' in previous))
+        ):
+            text += ' '
+        text += value
+        previous = value
+    return text
+
+
+def parse_path(data: str) -> list:
+    """Parse path data into [(command, [args])]; None if it isn't valid."""
+    commands = []
+    position = 0
+    while position < len(data):
+        char = data[position]
+        if char in ' \t\r\n,':
+            position += 1
+        elif char.upper() in PATH_ARGUMENTS:
+            commands.append((char, []))
+            position += 1
+        elif not commands:
+            return None
+        else:
+            command, args = commands[-1]
+            roles = PATH_ARGUMENTS[command.upper()]
+            if not roles:
+                return None
+            if roles[len(args) % len(roles)] == 'f':
+                # Arc flags are single characters and may be written without separators
+                if char not in '01':
+                    return None
+                args.append(char)
+                position += 1
+                continue
+            match = NUMBER.match(data, position)
+            if not match:
+                return None
+            args.append(float(match.group()))
+            position = match.end()
+
+    for command, args in commands:
+        roles = PATH_ARGUMENTS[command.upper()]
+        if (roles and (not args or len(args) % len(roles))) or (not roles and args):
+            return None
+    return commands
+
+
+def absolute_segments(commands: list) -> list:
+    """
+    Flatten parsed path data into (COMMAND, values) segments with every
+    coordinate absolute. Extra coordinate pairs after M become L segments.
+    """
+    segments = []
+    x = y = start_x = start_y = 0.0
+    for command, args in commands:
+        upper = command.upper()
+        roles = PATH_ARGUMENTS[upper]
+        if not roles:
+            segments.append(('Z', []))
+            x, y = start_x, start_y
+            continue
+
+        for offset in range(0, len(args), len(roles)):
+            values = []
+            for role, value in zip(roles, args[offset:offset + len(roles)]):
+                if command != upper and role in 'xy':
+                    value += x if role == 'x' else y
+                values.append(value)
+            letter = 'L' if upper == 'M' and offset else upper
+            segments.append((letter, values))
+
+            if 'x' in roles:
+                x = values[roles.rfind('x')]
+            if 'y' in roles:
+                y = values[roles.rfind('y')]
+            if letter == 'M':
+                start_x, start_y = x, y
+    return segments
+
+
+def optimize_path(data: str, precision: int) -> str:
+    """
+    Round and compact path data; returns `data` unchanged if it can't be parsed.
+
+    Relative values are taken from the rounded point the previous segment
+    really ends at, so every point is within rounding of its true position.
+    Repeated command letters are left implicit.
+    """
+    commands = parse_path(data)
+    if commands is None:
+        return data
+
+    runs = []  # [command, values] with the command written once
+    x = y = start_x = start_y = 0.0  # Rounded current point and subpath start
+    for letter, values in absolute_segments(commands):
+        roles = PATH_ARGUMENTS[letter]
+        if letter == 'Z':
+            runs.append(['z', []])
+            x, y = start_x, start_y
+            continue
+
+        candidates = []
+        for relative in (False, True):
+            written = []
+            for role, value in zip(roles, values):
+                if role == 'f':
+                    written.append(value)
+                elif role == 'n':
+                    written.append(format_number(value, precision))
+                else:
+                    origin = (x if role == 'x' else y) if relative else 0.0
+                    written.append(format_number(value - origin, precision))
+            candidates.append((len(join_numbers(written)), relative, written))
+        _, relative, written = min(candidates)
+
+        command = letter.lower() if relative else letter
+        origin_x, origin_y = (x, y) if relative else (0.0, 0.0)
+        if 'x' in roles:
+            x = origin_x + float(written[roles.rfind('x')])
+        if 'y' in roles:
+            y = origin_y + float(written[roles.rfind('y')])
+        if letter == 'M':
+            start_x, start_y = x, y
+
+        previous = runs[-1][0] if runs else None
+        if (previous == command and command not in 'Mm') or (previous, command) in (('M', 'L'), ('m', 'l')):
+            runs[-1][1].extend(written)
+        else:
+            runs.append([command, written])
+
+    return ''.join(command + join_numbers(values) for command, values in runs)
+
+
+def optimize_numbers(value: str, precision: int) -> str:
+    """Round a plain number list (points, single coordinates); unchanged if not numeric."""
+    numbers = NUMBER.findall(value)
+    if not numbers or re.sub(r'[\s,]+', '', NUMBER.sub('', value)):
+        return value  # Units, percentages or keywords: leave as written
+    return join_numbers([format_number(float(number), precision) for number in numbers])
+
+
+def short_hex(digits: str) -> str:
+    """#RRGGBB digits as the shortest hex color: 'FFFFFF' -> '#fff'."""
+    digits = digits.lower()
+    if digits[0::2] == digits[1::2]:
+        digits = digits[0::2]
+    return '#' + digits
+
+
+def optimize_css(text: str) -> str:
+    """
+    Collapse whitespace in a stylesheet or style attribute and shorten colors.
+
+    String literals are set aside first and left untouched. Whitespace around
+    ':' only goes inside declarations: in a selector, '.logo :hover' and
+    '.logo:hover' match different elements.
+    """
+    strings = []
+
+    def set_aside(match):
+        strings.append(match.group(0))
+        return f'\0{len(strings) - 1}\0'
+
+    text = CSS_STRING.sub(set_aside, text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'\s*([{};,])\s*', r'\1', text)
+    text = DECLARATION_COLON.sub(':', text)
+    text = re.sub(r'(^|[;{])enable-background:[^;}]*;?', r'\1', text)
+    text = text.replace(';}', '}').strip(';')
+    text = CSS_COLOR.sub(lambda match: match.group(1) + short_hex(match.group(2)), text)
+    return re.sub(r'\0(\d+)\0', lambda match: strings[int(match.group(1))], text)
+
+
+def referenced_ids(root) -> set:
+    """Ids used by url(#id), href="#id" or a #id selector in a <style>."""
+    ids = set()
+    for element in root.iter():
+        for value in element.attrib.values():
+            for match in ID_REFERENCE.finditer(value.strip()):
+                ids.add(match.group(1) or match.group(2))
+        if local_name(element.tag)[1] == 'style' and element.text:
+            ids.update(re.findall(r'#([\w-]+)', element.text))
+    return ids
+
+
+def clean_element(element, keep_ids: set, precision: int, has_text: bool, is_root: bool = False):
+    """Clean one element's attributes in place."""
+    for name, value in list(element.attrib.items()):
+        namespace, attribute = local_name(name)
+        if namespace not in (None, *KEPT_NAMESPACES):
+            del element.attrib[name]  # Editor data (i:extraneous, sodipodi:docname, ...)
+        elif is_root and attribute in DROPPED_ROOT_ATTRIBUTES and namespace is None:
+            del element.attrib[name]
+        elif namespace == XML_NS and attribute == 'space' and not has_text:
+            del element.attrib[name]
+        elif attribute == 'id' and value not in keep_ids:
+            del element.attrib[name]
+        elif attribute == 'd':
+            element.attrib[name] = optimize_path(value, precision)
+        elif attribute == 'points' or (attribute in COORDINATE_ATTRIBUTES and not is_root):
+            element.attrib[name] = optimize_numbers(value, precision)
+        elif attribute in COLOR_ATTRIBUTES:
+            element.attrib[name] = HEX_COLOR.sub(lambda match: short_hex(match.group(1)), value.strip())
+        elif attribute == 'style':
+            style = optimize_css(value)
+            if style:
+                element.attrib[name] = style
+            else:
+                del element.attrib[name]
+
+
+def clean_children(parent, keep_ids: set, precision: int, has_text: bool):
+    """Clean a subtree: drop editor elements, unwrap plain groups, remove empty containers."""
+    children = []
+    for child in list(parent):
+        namespace, tag = local_name(child.tag)
+        if not isinstance(child.tag, str) or namespace not in KEPT_NAMESPACES or tag == 'metadata':
+            continue
+
+        clean_element(child, keep_ids, precision, has_text)
+        if tag in TEXT_ELEMENTS:
+            children.append(child)
+            continue
+
+        clean_children(child, keep_ids, precision, has_text)
+        if tag == 'style' and child.text:
+            child.text = optimize_css(child.text)
+            child.attrib.pop('type', None)  # text/css is the default
+        elif child.text and not child.text.strip():
+            child.text = None
+
+        if tag in REMOVABLE_WHEN_EMPTY and not len(child) and not (child.text or '').strip():
+            continue
+        if tag == 'g' and not child.attrib:
+            children.extend(child)  # Plain group: its children take its place
+            continue
+        children.append(child)
+
+    for child in list(parent):
+        parent.remove(child)
+    for child in children:
+        if local_name(child.tag)[1] not in TEXT_ELEMENTS and child.tail and not child.tail.strip():
+            child.tail = None
+        parent.append(child)
+
+
+def optimize_svg(text: str, precision: int = DEFAULT_PRECISION) -> str:
+    """Return a minified copy of an SVG document (see module docstring)."""
+    root = ET.fromstring(text)  # Comments and processing instructions are not kept
+    if local_name(root.tag) != (SVG_NS, 'svg'):
+        raise ValueError('not an SVG document')
+
+    has_text = any(local_name(element.tag)[1] in TEXT_ELEMENTS for element in root.iter())
+    keep_ids = referenced_ids(root)
+    clean_element(root, keep_ids, precision, has_text, is_root=True)
+    clean_children(root, keep_ids, precision, has_text)
+    if root.text and not root.text.strip():
+        root.text = None
+
+    ET.register_namespace('', SVG_NS)
+    ET.register_namespace('xlink', XLINK_NS)
+    # ElementTree escapes '>' in text and attributes, so ' />' only ends empty tags
+    return ET.tostring(root, encoding='unicode').replace(' />', '/>')
+
+
+def optimize_bytes(original: bytes, precision: int = DEFAULT_PRECISION) -> bytes:
+    """Minified SVG file content, or `original` if minifying doesn't make it smaller."""
+    optimized = optimize_svg(original.decode('utf-8'), precision).encode('utf-8')
+    return optimized if len(optimized) < len(original) else original
+
+
+def optimize_file(path: Path, precision: int = DEFAULT_PRECISION, dry_run: bool = False) -> dict:
+    """Optimize an SVG file in place; returns its before/after sizes."""
+    original = path.read_bytes()
+    optimized = optimize_bytes(original, precision)
+    if not dry_run and optimized != original:
+        path.write_bytes(optimized)
+    return {'file': str(path), 'original_size': len(original), 'new_size': len(optimized)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Minify SVG files in place without changing how they render'
+    )
+    parser.add_argument('inputs', nargs='+', metavar='input',
+                       help='SVG files or directories')
+    parser.add_argument('--precision', '-p', type=int, default=DEFAULT_PRECISION,
+                       help=f'Decimal places kept in coordinates (default: {DEFAULT_PRECISION})')
+    parser.add_argument('--dry-run', '-n', action='store_true',
+                       help='Report savings without writing files')
+
+    args = parser.parse_args()
+
+    files = []
+    for item in args.inputs:
+        path = Path(item)
+        files.extend(sorted(path.glob('*.svg')) if path.is_dir() else [path])
+
+    if not files:
+        print(f"ERROR: No SVG files found in: {' '.join(args.inputs)}")
+        sys.exit(1)
+
+    results = []
+    failed = 0
+    print(f"\n{'='*60}")
+    print(f"SVG OPTIMIZATION ({len(files)} files{', dry run' if args.dry_run else ''})")
+    print('='*60)
+    for path in files:
+        try:
+            stats = optimize_file(path, args.precision, args.dry_run)
+        except (ET.ParseError, ValueError, OSError) as e:
+            print(f"  [ERROR] {path.name}: {e}")
+            failed += 1
+            continue
+        results.append(stats)
+        saved = stats['original_size'] - stats['new_size']
+        print(f"  [OK]    {path.name:28} {stats['original_size']:>8,} B -> {stats['new_size']:>8,} B "
+              f"(-{saved / stats['original_size'] * 100:.0f}%)")
+
+    original = sum(stats['original_size'] for stats in results)
+    optimized = sum(stats['new_size'] for stats in results)
+    print(f"\n  Total: {original:,} B -> {optimized:,} B (saved {original - optimized:,} B)")
+    print('='*60)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,19 +5,31 @@ HTML Validator Tool
 Validates HTML files for:
 - Basic HTML5 structure
 - Accessibility issues (missing alt tags, heading hierarchy)
+- Image problems (missing dimensions, broken srcset candidates)
 - Common problems
 
 Usage:
     python tools/validate_html.py index.html
     python tools/validate_html.py path/to/file.html --verbose
+    python tools/validate_html.py index.html projects/ services/*.html
+    python tools/validate_html.py . --jobs 4
+    python tools/validate_html.py --changed-only
 """
 
 import argparse
+import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from html.parser import HTMLParser
 
+from html_engine import Analyzer, display_path, find_html_files, parse_document
+from manifest import Manifest, changed_files
+
+TOOL_SOURCES = [__file__, Path(__file__).parent / 'html_engine.py']  # Manifest version
+
 
 class HTMLValidator(HTMLParser):
     def __init__(self):
@@ -141,21 +153,152 @@ class HTMLValidator(HTMLParser):
         }
 
 
+class ImageAnalyzer(Analyzer):
+    """Check <img>/<source> elements for layout and responsive-image problems."""
+
+    def __init__(self, filepath: Path):
+        self.base_dir = filepath.parent
+        self.needs = []  # Local files whose existence the results depend on
+        self.errors = []
+        self.warnings = []
+        self.info = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in ('img', 'source'):
+            return
+        attrs_dict = dict(attrs)
+        src = attrs_dict.get('src', '')
+
+        if tag == 'img':
+            if not (attrs_dict.get('width') and attrs_dict.get('height')):
+                self.warnings.append(f"Image without width/height (causes layout shift): {src}")
+            if 'loading' not in attrs_dict:
+                self.info.append(f"Image without loading attribute: {src}")
+
+        # Every local srcset candidate must exist
+        for candidate in attrs_dict.get('srcset', '').split(','):
+            url = candidate.strip().split(' ')[0]
+            if not url or url.startswith(('http://', 'https://', '//', 'data:')):
+                continue
+            candidate_path = self.base_dir / url.split('?')[0].lstrip('/')
+            self.needs.append(candidate_path)
+            if not candidate_path.exists():
+                self.errors.append(f"srcset candidate not found: {url}")
+
+    def merge_into(self, results: dict) -> dict:
+        """Add this analyzer's findings to HTMLValidator.validate() results."""
+        results['errors'].extend(self.errors)
+        results['warnings'].extend(self.warnings)
+        results['info'].extend(self.info)
+        results['needs'] = [str(path) for path in self.needs]
+        return results
+
+
 def validate_file(filepath: Path, verbose: bool = False) -> dict:
     """Validate an HTML file."""
 
     if not filepath.exists():
         return {'errors': [f"File not found: {filepath}"], 'warnings': [], 'info': [], 'stats': {}}
 
-    content = filepath.read_text(encoding='utf-8')
-
-    validator = HTMLValidator()
     try:
-        validator.feed(content)
+        document = parse_document(filepath)
     except Exception as e:
         return {'errors': [f"Parse error: {e}"], 'warnings': [], 'info': [], 'stats': {}}
 
-    return validator.validate()
+    validator, images = document.replay(HTMLValidator(), ImageAnalyzer(filepath))
+    return images.merge_into(validator.validate())
+
+
+def validate_timed(filepath: Path) -> dict:
+    """Validate a file and record how long it took (runs in pool workers)."""
+    start = time.perf_counter()
+    results = validate_file(filepath)
+    results['seconds'] = time.perf_counter() - start
+    return results
+
+
+def validate_files(files: list, jobs: int = None, manifest: Manifest = None) -> dict:
+    """
+    Validate many files, across worker processes when jobs > 1.
+
+    Returns display path -> results, in the order of `files`. Use jobs=1
+    when the same process will go on to reuse the parses (check_site.py).
+    With a `manifest`, files unchanged since the last run (along with any
+    srcset files they reference) reuse their stored results.
+    """
+    reports = {}
+    if manifest:
+        for filepath in files:
+            stored = manifest.lookup(filepath)
+            if stored is not None:
+                reports[filepath] = dict(stored, cached=True)
+    pending = [filepath for filepath in files if filepath not in reports]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(pending) <= 1:
+        fresh = [validate_timed(filepath) for filepath in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            fresh = list(pool.map(validate_timed, pending))
+
+    for filepath, results in zip(pending, fresh):
+        needs = results.pop('needs', [])
+        if manifest:
+            stored = {key: value for key, value in results.items() if key != 'seconds'}
+            manifest.record(filepath, stored, needs=needs)
+        reports[filepath] = results
+
+    return {display_path(filepath.resolve()): reports[filepath] for filepath in files}
+
+
+def print_report(reports: dict, verbose: bool = False, wall_time: float = None):
+    """Print an aggregated report for several validated files."""
+
+    print(f"\n{'='*50}")
+    print(f"VALIDATION REPORT ({len(reports)} files)")
+    print('='*50)
+
+    for page, results in reports.items():
+        errors = results['errors']
+        warnings = results['warnings']
+
+        if errors:
+            line = f"  [FAIL]  {page} ({len(errors)} error(s), {len(warnings)} warning(s))"
+        elif warnings:
+            line = f"  [PASS]  {page} ({len(warnings)} warning(s))"
+        else:
+            line = f"  [PASS]  {page}"
+        if results.get('cached'):
+            line = f"{line:<62} {'cached':>9}"
+        elif 'seconds' in results:
+            line = f"{line:<62} {results['seconds'] * 1000:6.1f} ms"
+        print(line)
+
+        for error in errors:
+            print(f"          [ERROR] {error}")
+        for warning in warnings:
+            print(f"          [WARN]  {warning}")
+        if verbose:
+            for item in results['info']:
+                print(f"          [INFO]  {item}")
+
+    failed = sum(1 for results in reports.values() if results['errors'])
+
+    print(f"\n{'='*50}")
+    print("TOTALS")
+    print('='*50)
+    print(f"  Files: {len(reports)} ({failed} failed)")
+    print(f"  Errors: {sum(len(results['errors']) for results in reports.values())}")
+    print(f"  Warnings: {sum(len(results['warnings']) for results in reports.values())}")
+    for stat in ('images', 'links', 'headings'):
+        total = sum(results['stats'].get(stat, 0) for results in reports.values())
+        print(f"  {stat.capitalize()}: {total}")
+    cached = sum(1 for results in reports.values() if results.get('cached'))
+    if cached:
+        print(f"  Incremental: {cached} file(s) unchanged, {len(reports) - cached} re-validated")
+    if wall_time is not None:
+        busy = sum(results.get('seconds', 0) for results in reports.values())
+        print(f"  Time: {busy * 1000:.1f} ms validating, {wall_time * 1000:.1f} ms wall")
 
 
 def print_results(results: dict, verbose: bool = False):
@@ -214,19 +357,76 @@ def main():
     parser = argparse.ArgumentParser(
         description='Validate HTML files for structure and accessibility'
     )
-    parser.add_argument('file', type=Path, help='HTML file to validate')
+    parser.add_argument('files', nargs='*', metavar='file',
+                       help='HTML files, directories or glob patterns to validate')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                       help='Worker processes for multiple files (default: CPU count)')
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=True,
+                       help='Reuse results for files unchanged since the last run (default: on)')
+    parser.add_argument('--changed-only', action='store_true',
+                       help='Validate only HTML files staged in git, plus files depending on staged files')
     parser.add_argument('-v', '--verbose', action='store_true',
                        help='Show detailed output including info messages')
 
     args = parser.parse_args()
 
-    print(f"\nValidating: {args.file}")
+    if args.changed_only and args.files:
+        parser.error('--changed-only takes its files from git; do not list files')
+    if not args.changed_only and not args.files:
+        parser.error('at least one file is required')
+
+    manifest = None
+    if args.incremental or args.changed_only:
+        manifest = Manifest('validate_html', sources=TOOL_SOURCES)
+
+    if args.changed_only:
+        files = changed_files(manifest)
+        if not files:
+            print("\nNo staged HTML changes (or dependents) to validate.")
+            sys.exit(0)
+    else:
+        files = find_html_files(args.files)
+        if not files:
+            print(f"ERROR: No HTML files match: {' '.join(args.files)}")
+            sys.exit(1)
+    if not args.incremental:
+        manifest = None
+
+    # A single file keeps the detailed single-page report
+    if len(files) == 1:
+        print(f"\nValidating: {files[0]}")
+
+        results = validate_files(files, manifest=manifest)[display_path(files[0].resolve())]
+        if manifest:
+            manifest.save()
+        print_results(results, args.verbose)
 
-    results = validate_file(args.file, args.verbose)
-    print_results(results, args.verbose)
+        # Exit with error code if there are errors
+        sys.exit(1 if results['errors'] else 0)
+
+    print(f"\nValidating {len(files)} files")
+
+    start = time.perf_counter()
+    reports = validate_files(files, args.jobs, manifest)
+    if manifest:
+        manifest.save()
+    print_report(reports, args.verbose, wall_time=time.perf_counter() - start)
+
+    errors = sum(len(results['errors']) for results in reports.values())
+    warnings = sum(len(results['warnings']) for results in reports.values())
+
+    print(f"\n{'='*50}")
+    if not errors:
+        if warnings:
+            print(f"PASSED with {warnings} warning(s)")
+        else:
+            print("PASSED - No issues found")
+    else:
+        print(f"FAILED - {errors} error(s), {warnings} warning(s)")
+    print('='*50)
 
-    # Exit with error code if there are errors
-    sys.exit(1 if results['errors'] else 0)
+    # Exit with error code if any file has errors
+    sys.exit(1 if errors else 0)
 
 
 if __name__ == '__main__':